@@ -0,0 +1,120 @@
+"""
+Per-event overhead of EventLoop dispatch, with no-op components.
+    python -m scripts.bench_event_loop --bars 200000 [--logging off|sync|async] [--fmt text|jsonl] [--latency]
+Logging goes to a temp directory (no console); --sample N keeps 1 in N per-event INFO records.
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import tempfile
+import time
+from typing import Optional
+
+import numpy as np
+
+from src.core.events import (
+    EventType, FillEvent, MarketEvent, OrderEvent, OrderType, SignalEvent, SignalType, Side,
+)
+from src.data.array_handler import ArrayDataHandler
+from src.data.bars import BarArrays
+from src.engine.event_loop import EventLoop
+from src.utils.latency import LatencyRecorder
+from src.utils.logging import setup_logging, shutdown_logging
+
+
+class _EveryN:
+    """Emits a LONG signal every n bars."""
+    def __init__(self, n: int) -> None:
+        self.n = n
+        self.i = 0
+
+    def on_market(self, event: MarketEvent) -> Optional[SignalEvent]:
+        self.i += 1
+        if self.i % self.n:
+            return None
+        return SignalEvent(type=EventType.SIGNAL, timestamp_ms=event.timestamp_ms, symbol=event.symbol,
+                           signal=SignalType.LONG)
+
+
+class _Portfolio:
+    def on_market(self, event: MarketEvent) -> None:
+        pass
+
+    def on_signal(self, event: SignalEvent) -> Optional[OrderEvent]:
+        return OrderEvent(type=EventType.ORDER, timestamp_ms=event.timestamp_ms, symbol=event.symbol,
+                          client_order_id="b", side=Side.BUY, order_type=OrderType.MKT, qty=1)
+
+    def on_fill(self, event: FillEvent) -> None:
+        pass
+
+
+class _Execution:
+    def on_market_price(self, symbol: str, price: float) -> None:
+        pass
+
+    def on_order(self, event: OrderEvent) -> Optional[FillEvent]:
+        return FillEvent(type=EventType.FILL, timestamp_ms=event.timestamp_ms, symbol=event.symbol,
+                         client_order_id=event.client_order_id, gateway_order_id="g", side=event.side,
+                         fill_qty=event.qty, fill_price=1.0, commission=0.0)
+
+
+def synthetic_bars(n: int) -> BarArrays:
+    close = np.linspace(100.0, 110.0, n)
+    return BarArrays(
+        timestamp_ms=np.arange(n, dtype=np.int64) * 60_000,
+        open=close, high=close, low=close, close=close, volume=np.ones(n),
+    )
+
+
+def run_once(bars: BarArrays, signal_every: int, latency: bool = False) -> tuple[float, int]:
+    loop = EventLoop(
+        data=ArrayDataHandler(bars=bars, symbol="BENCH", lookback=1),
+        strategy=_EveryN(signal_every),
+        portfolio=_Portfolio(),
+        execution=_Execution(),
+        latency=LatencyRecorder() if latency else None,
+    )
+    t0 = time.perf_counter()
+    loop.run_until_data_end()
+    elapsed = time.perf_counter() - t0
+    signals = len(bars) // signal_every
+    return elapsed, len(bars) + 3 * signals  # market + signal/order/fill
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--bars", type=int, default=200_000)
+    parser.add_argument("--signal-every", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--logging", choices=("off", "sync", "async"), default="off")
+    parser.add_argument("--fmt", choices=("text", "jsonl"), default="text")
+    parser.add_argument("--sample", type=int, default=0)
+    parser.add_argument("--fast-records", action="store_true",
+                        help="skip caller/thread/process lookups on every LogRecord (process-wide)")
+    parser.add_argument("--latency", action="store_true", help="enable per-stage latency histograms")
+    args = parser.parse_args()
+
+    bars = synthetic_bars(args.bars)
+    with tempfile.TemporaryDirectory() as log_dir:
+        if args.logging == "off":
+            logging.getLogger().setLevel(logging.WARNING)
+        else:
+            sample = None
+            if args.sample > 1:
+                sample = {k: args.sample for k in ("SIGNAL_EMIT", "ORDER_EMIT", "FILL_EMIT", "PORTFOLIO_APPLY_FILL")}
+            setup_logging(run_id="bench", log_dir=log_dir, mode=args.logging, fmt=args.fmt,
+                          console=False, sample=sample, fast_records=args.fast_records)
+
+        best = min(run_once(bars, args.signal_every, args.latency) for _ in range(args.repeat))
+        t0 = time.perf_counter()
+        shutdown_logging()
+        flush_s = time.perf_counter() - t0
+
+    elapsed, events = best
+    print(f"logging={args.logging} fmt={args.fmt} latency={args.latency} events={events} best_s={elapsed:.3f} "
+          f"ns_per_event={elapsed / events * 1e9:.0f} shutdown_flush_s={flush_s:.3f}")
+
+
+if __name__ == "__main__":
+    main()
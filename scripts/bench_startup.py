@@ -0,0 +1,65 @@
+"""
+Cold-start cost of the entry points, measured in fresh interpreters.
+    python -m scripts.bench_startup [--runs 7] [--config configs/demo.yaml] [--top 10]
+- import: `python -X importtime -c "import <module>"`, cumulative microseconds of the module itself
+- run: wall time of `python -m src.backtest.engine --config <config>` (logging left as configured)
+--top lists the slowest imports (self time) pulled in by src.backtest.engine.
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+MODULES = ("src.backtest.engine", "src.engine.sweep", "src.engine.walk_forward")
+
+
+def import_times(module: str) -> Dict[str, Tuple[int, int]]:
+    """module -> (self_us, cumulative_us) from one -X importtime run."""
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True,
+    ).stderr
+    times: Dict[str, Tuple[int, int]] = {}
+    for line in out.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cum_us, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(self_us), int(cum_us))
+    return times
+
+
+def run_wall(config: str) -> float:
+    t0 = time.perf_counter()
+    subprocess.run([sys.executable, "-m", "src.backtest.engine", "--config", config],
+                   capture_output=True, check=True)
+    return time.perf_counter() - t0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Import-time / cold-start benchmark")
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--config", default="configs/demo.yaml")
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    for module in MODULES:
+        samples: List[int] = [import_times(module)[module][1] for _ in range(args.runs)]
+        modules = len(import_times(module))
+        print(f"import {module:<28} median {statistics.median(samples) / 1e3:7.1f} ms  ({modules} modules)")
+
+    walls = [run_wall(args.config) for _ in range(args.runs)]
+    print(f"run    {args.config:<28} median {statistics.median(walls) * 1e3:7.1f} ms")
+
+    if args.top:
+        times = import_times(MODULES[0])
+        print(f"slowest imports under {MODULES[0]} (self time):")
+        for name, (self_us, _) in sorted(times.items(), key=lambda kv: -kv[1][0])[:args.top]:
+            print(f"  {self_us / 1e3:7.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
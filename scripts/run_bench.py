@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+
+from src.backtest.bench import BENCHMARKS, compare_to_baseline, format_results, run_suite
+from src.data.synthetic import SyntheticSpec
+
+DEFAULT_BASELINE = "benchmarks/baseline.json"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Throughput / peak-memory benchmark suite on synthetic OHLCV")
+    parser.add_argument("--bars", type=int, default=None, help="bars per symbol (default: baseline spec)")
+    parser.add_argument("--symbols", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--only", nargs="*", choices=BENCHMARKS)
+    parser.add_argument("--output", default=None, help="JSON path (default: benchmarks/results/bench-<ts>.json)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--update-baseline", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--check", action="store_true", help="exit 1 when below baseline - tolerance")
+    parser.add_argument("--tolerance", type=float, default=0.5)
+    args = parser.parse_args()
+
+    baseline = None
+    if Path(args.baseline).exists():
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+
+    # 默认沿用 baseline 的规模，保证可比
+    spec_kwargs = dict(baseline["spec"]) if baseline else {}
+    for key in ("bars", "symbols", "seed"):
+        value = getattr(args, key)
+        if value is not None:
+            spec_kwargs[key] = value
+    spec = SyntheticSpec(**spec_kwargs)
+
+    report = run_suite(spec, repeat=args.repeat, only=args.only)
+    print(format_results(report))
+
+    output = Path(args.output or f"benchmarks/results/bench-{datetime.now():%Y%m%d-%H%M%S}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    print(f"Results: {output}")
+
+    if args.update_baseline:
+        Path(args.baseline).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.baseline).write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        print(f"Baseline updated: {args.baseline}")
+    elif baseline is not None:
+        failures = compare_to_baseline(report, baseline, tolerance=args.tolerance)
+        for line in failures:
+            print(f"REGRESSION {line}")
+        if failures and args.check:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
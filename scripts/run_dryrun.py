@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import argparse
+
 from src.utils.logging import setup_logging, get_logger
 from src.data.csv_handler import CSVHandler
 from src.engine.event_loop import EventLoop
@@ -9,11 +11,16 @@ from src.execution.paper import PaperExecution, PaperExecutionConfig
 from src.backtest.engine import DummyStrategy, DummyPortfolio
 
 def main() -> None:
+    parser = argparse.ArgumentParser(description="Dry run over historical bars")
+    parser.add_argument("--speed", type=float, default=0.0,
+                        help="replay speed vs. bar timestamps: 1 = real time, N = N x, 0 = max")
+    args = parser.parse_args()
+
     setup_logging(level="INFO")
     log = get_logger("scripts.run_dryrun")
     log.info("BOOT")
 
-    data = CSVHandler(csv_path="data/sample_AAPL.csv", symbol="AAPL")
+    data = CSVHandler(csv_path="data/sample_AAPL.csv", symbol="AAPL", cache_dir=".cache/bars")
     strategy = DummyStrategy()
     portfolio = DummyPortfolio()
     execution = PaperExecution(PaperExecutionConfig(default_commission=1.0))
@@ -25,7 +32,7 @@ def main() -> None:
         execution=execution,
     )
 
-    mode = DryRunMode(loop=loop, config=DryRunConfig(emit_summary=True))
+    mode = DryRunMode(loop=loop, config=DryRunConfig(emit_summary=True, speed=args.speed))
     mode.run()
 
 if __name__ == "__main__":
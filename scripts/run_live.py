@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+from typing import Any, Dict, Optional
+
+import yaml
+
+from src.core.registry import STRATEGIES, build_execution, build_portfolio
+from src.data.live_feed import SyntheticFeedServer, TcpFeed, TcpFeedConfig
+from src.data.synthetic import SyntheticSpec, generate_universe
+from src.engine.event_loop import EventLoop
+from src.modes.live import LiveConfig, LiveMode
+from src.utils.logging import get_logger, setup_logging, shutdown_logging
+
+
+async def _run(config: Dict[str, Any]) -> Dict[str, Any]:
+    feed_cfg = dict(config.get("feed", {}))
+    server_cfg = config.get("server", {})
+    strat_cfg = config.get("strategy", {})
+
+    server: Optional[SyntheticFeedServer] = None
+    if server_cfg.get("enabled", False):
+        spec = SyntheticSpec(bars=int(server_cfg.get("bars", 10_000)), symbols=int(server_cfg.get("symbols", 1)),
+                             seed=int(server_cfg.get("seed", 42)))
+        server = SyntheticFeedServer(
+            bars=generate_universe(spec),
+            host=feed_cfg.get("host", "127.0.0.1"),
+            port=0,
+            rate=float(server_cfg.get("rate", 0.0)),
+            heartbeat_interval_s=float(server_cfg.get("heartbeat_interval_s", 1.0)),
+        )
+        await server.start()
+        feed_cfg["port"] = server.port
+
+    loop = EventLoop(
+        data=None,  # type: ignore[arg-type]  # 行情由 feed 推送
+        strategy=STRATEGIES.build(strat_cfg.get("name", "SMACross"), **strat_cfg.get("params", {})),
+        portfolio=build_portfolio(config.get("portfolio"), {"name": "zero"}),
+        execution=build_execution(config.get("execution"), {"name": "paper", "commission": 0.0}),
+    )
+    feed = TcpFeed(TcpFeedConfig(**feed_cfg))
+    mode = LiveMode(loop=loop, feed=feed, config=LiveConfig(**config.get("live", {})))
+    try:
+        stats = await mode.run_async()
+    finally:
+        if server is not None:
+            await server.close()
+    stats["wire"] = feed.wire.summary()
+    stats["latency"] = mode.latency.summary()
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Live session over a TCP market data feed")
+    parser.add_argument("--config", default="configs/live.yaml")
+    parser.add_argument("--rate", type=float, default=None, help="synthetic server messages/s (0 = max)")
+    parser.add_argument("--inline", action="store_true",
+                        help="run strategy callbacks on the asyncio loop instead of a worker thread")
+    args = parser.parse_args()
+
+    with open(args.config, "r", encoding="utf-8") as f:
+        config = yaml.safe_load(f) or {}
+    if args.rate is not None:
+        config.setdefault("server", {})["rate"] = args.rate
+    if args.inline:
+        config.setdefault("live", {})["offload"] = False
+
+    log_cfg = config.get("logging", {})
+    setup_logging(
+        run_id="live",
+        level=log_cfg.get("level", "INFO"),
+        mode=log_cfg.get("mode", "sync"),
+        fmt=log_cfg.get("fmt", "text"),
+        console=log_cfg.get("console", True),
+        fast_records=log_cfg.get("fast_records", False),
+    )
+    log = get_logger("scripts.run_live")
+    try:
+        stats = asyncio.run(_run(config))
+        log.info("LIVE_RESULT %s", stats)
+    finally:
+        shutdown_logging()
+
+    print(f"{stats['processed']} msgs in {stats['elapsed_s']:.2f}s = {stats['msgs_per_s']:,.0f} msgs/s "
+          f"(dropped={stats['dropped']} reconnects={stats.get('reconnects', 0)})")
+    for name, s in (("wire", stats["wire"]), *stats["latency"].items()):
+        print(f"  {name:<22} p50={s['p50_us']:8.1f}us p99={s['p99_us']:8.1f}us max={s['max_us']:8.1f}us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import argparse
+
+from src.engine.sweep import load_sweep_config, run_sweep
+from src.utils.logging import get_logger, setup_logging
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Parameter sweep over a process pool")
+    parser.add_argument("--config", default="configs/sweep.yaml")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--no-cache", action="store_true", help="ignore cached results (fresh runs still refresh the cache)")
+    args = parser.parse_args()
+
+    setup_logging(level="INFO")
+    log = get_logger("scripts.run_sweep")
+
+    config = load_sweep_config(args.config)
+    result = run_sweep(config, workers=args.workers, no_cache=args.no_cache)
+
+    output = args.output or config.get("run", {}).get("output", "logs/sweep_results.csv")
+    result.write_csv(output)
+    log.info("SWEEP_WRITTEN path=%s rows=%s", output, len(result.rows))
+
+    total_bars = sum(s["bars"] for s in result.workers)
+    print(f"{len(result.rows)} runs, {result.bars} bars each, {result.elapsed_s:.2f}s wall, "
+          f"{total_bars / result.elapsed_s:,.0f} bars/s aggregate")
+    if result.cache_stats:
+        c = result.cache_stats
+        print(f"  cache: {c['hits']}/{len(result.rows)} hits, {c['misses']} misses, {c['bypassed']} bypassed, "
+              f"{c['writes']} writes, {c['evictions']} evictions")
+    for s in result.workers:
+        print(f"  worker {s['worker_pid']}: runs={s['runs']} cache_hits={s['cache_hits']} "
+              f"bars/s={s['bars_per_s']:,.0f}")
+    print(f"Results: {output}")
+
+
+if __name__ == "__main__":
+    main()
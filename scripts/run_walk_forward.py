@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import argparse
+
+from src.engine.sweep import load_sweep_config
+from src.engine.walk_forward import run_walk_forward
+from src.utils.logging import get_logger, setup_logging
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Walk-forward optimization over rolling or anchored folds")
+    parser.add_argument("--config", default="configs/walk_forward.yaml")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--anchored", action="store_true", default=None)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    setup_logging(level="INFO")
+    log = get_logger("scripts.run_walk_forward")
+
+    config = load_sweep_config(args.config)
+    if args.anchored:
+        config.setdefault("walk_forward", {})["anchored"] = True
+    result = run_walk_forward(config, workers=args.workers)
+
+    output = args.output or config.get("walk_forward", {}).get("output", "logs/walk_forward.csv")
+    result.write_csv(output)
+    log.info("WALK_FORWARD_WRITTEN path=%s folds=%s", output, len(result.folds))
+
+    s = result.summary
+    print(f"{s['folds']} folds, {s['oos_bars']} out-of-sample bars, {result.elapsed_s:.2f}s wall")
+    for row in result.folds:
+        params = {k: v for k, v in row.items() if k in config.get("grid", {})}
+        print(f"  fold {row['fold']}: {params} test_pnl={row['test_pnl']:,.2f}")
+    print(f"OOS: pnl={s['total_pnl']:,.2f} return={s['total_return']:.4%} max_dd={s['max_drawdown']:.4%}")
+    print(f"Results: {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+import contextlib
+import gc
+import io
+import logging
+import platform
+import tempfile
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional
+
+import numpy as np
+
+from src.backtest.performance import PerformanceTracker
+from src.data.csv_handler import CSVHandler
+from src.data.multi_symbol import MultiSymbolHandler
+from src.data.synthetic import SyntheticSpec, generate_universe, write_universe
+from src.engine.event_loop import EventLoop
+from src.execution.paper import PaperExecution, PaperExecutionConfig
+from src.modes.backtest import BacktestConfig, BacktestMode
+from src.portfolio.commission import PercentNotionalCommission
+from src.portfolio.performance_portfolio import PerformancePortfolio
+from src.strategy.sma_cross import SMACross
+
+# prepare() 返回只做被测工作的 run()；准备工作不计时
+Prepare = Callable[[], Callable[[], None]]
+
+
+@dataclass
+class BenchResult:
+    name: str
+    bars: int
+    seconds: float
+    bars_per_s: float
+    peak_mb: float
+
+
+def _measure(name: str, bars: int, prepare: Prepare, repeat: int) -> BenchResult:
+    """
+    Best-of-`repeat` wall time without tracing, then one traced run for peak memory.
+    GC is paused while timing (like timeit) so results don't depend on the host process' heap size.
+    """
+    best = float("inf")
+    for _ in range(max(repeat, 1)):
+        run = prepare()
+        gc.collect()
+        gc.disable()
+        try:
+            t0 = time.perf_counter()
+            run()
+            best = min(best, time.perf_counter() - t0)
+        finally:
+            gc.enable()
+
+    run = prepare()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return BenchResult(name=name, bars=bars, seconds=best, bars_per_s=bars / best if best > 0 else 0.0,
+                       peak_mb=peak / 2**20)
+
+
+def _data_handler(paths: Mapping[str, str]):
+    if len(paths) == 1:
+        symbol, path = next(iter(paths.items()))
+        return CSVHandler(csv_path=path, symbol=symbol, columnar=True)
+    return MultiSymbolHandler(sources=dict(paths))
+
+
+def _loop(data) -> EventLoop:
+    return EventLoop(
+        data=data,
+        strategy=SMACross(fast=10, slow=30),
+        portfolio=PerformancePortfolio(
+            initial_cash=1_000_000.0, commission_model=PercentNotionalCommission(rate=0.0003, min_fee=1.0),
+        ),
+        execution=PaperExecution(PaperExecutionConfig(default_commission=0.0)),
+    )
+
+
+def bench_csv_load(paths: Mapping[str, str], *, columnar: bool) -> Prepare:
+    def prepare() -> Callable[[], None]:
+        def run() -> None:
+            for symbol, path in paths.items():
+                CSVHandler(csv_path=path, symbol=symbol, columnar=columnar)
+        return run
+    return prepare
+
+
+def bench_event_loop(paths: Mapping[str, str]) -> Prepare:
+    """run_until_data_end; several symbols go through MultiSymbolHandler's merge."""
+    def prepare() -> Callable[[], None]:
+        return _loop(_data_handler(paths)).run_until_data_end
+    return prepare
+
+
+def bench_tracker(spec: SyntheticSpec, fill_every: int = 50) -> Prepare:
+    universe = generate_universe(spec)
+    closes = np.concatenate([b.close for b in universe.values()]).tolist()
+    stamps = np.concatenate([b.timestamp_ms for b in universe.values()]).tolist()
+
+    def prepare() -> Callable[[], None]:
+        tracker = PerformanceTracker(initial_cash=1_000_000.0)
+
+        def run() -> None:
+            buy = True
+            for i, (t, c) in enumerate(zip(stamps, closes)):
+                tracker.on_market(t, c)
+                if i % fill_every == 0:
+                    tracker.on_fill(t, "SYN", "BUY" if buy else "SELL", 10, c, 1.0)
+                    buy = not buy
+            tracker.summary()
+        return run
+    return prepare
+
+
+def bench_backtest_e2e(paths: Mapping[str, str]) -> Prepare:
+    """CSV load + one BacktestMode over the whole universe (merged stream, per-symbol position book)."""
+    def prepare() -> Callable[[], None]:
+        def run() -> None:
+            mode = BacktestMode(loop=_loop(_data_handler(paths)), config=BacktestConfig(flatten_on_end=True))
+            with contextlib.redirect_stdout(io.StringIO()):
+                mode.run()
+        return run
+    return prepare
+
+
+BENCHMARKS = ("csv_load_rows", "csv_load_columnar", "event_loop", "tracker", "backtest_e2e")
+
+
+def run_suite(
+    spec: SyntheticSpec,
+    *,
+    repeat: int = 3,
+    only: Optional[Iterable[str]] = None,
+) -> Dict[str, Any]:
+    """Generate the synthetic universe in a temp dir and run the selected benchmarks; INFO logs are muted."""
+    selected = list(only) if only is not None else list(BENCHMARKS)
+    unknown = set(selected) - set(BENCHMARKS)
+    if unknown:
+        raise ValueError(f"unknown benchmarks: {sorted(unknown)}")
+
+    total = spec.bars * spec.symbols
+    root = logging.getLogger()
+    level = root.level
+    root.setLevel(logging.WARNING)
+    try:
+        with tempfile.TemporaryDirectory(prefix="bench-") as tmp:
+            paths = write_universe(spec, tmp)
+            factories: Dict[str, Callable[[], Prepare]] = {
+                "csv_load_rows": lambda: bench_csv_load(paths, columnar=False),
+                "csv_load_columnar": lambda: bench_csv_load(paths, columnar=True),
+                "event_loop": lambda: bench_event_loop(paths),
+                "tracker": lambda: bench_tracker(spec),
+                "backtest_e2e": lambda: bench_backtest_e2e(paths),
+            }
+            results = {name: asdict(_measure(name, total, factories[name](), repeat)) for name in selected}
+    finally:
+        root.setLevel(level)
+
+    return {
+        "meta": {
+            "created_utc": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "repeat": repeat,
+        },
+        "spec": asdict(spec),
+        "results": results,
+    }
+
+
+def compare_to_baseline(
+    current: Mapping[str, Any],
+    baseline: Mapping[str, Any],
+    tolerance: float = 0.5,
+) -> List[str]:
+    """
+    Regressions where bars_per_s fell more than `tolerance` (fraction) below the baseline.
+    Benchmarks missing on either side are ignored; a different spec is reported as a failure.
+    """
+    failures: List[str] = []
+    if current.get("spec") != baseline.get("spec"):
+        return [f"spec mismatch: current={current.get('spec')} baseline={baseline.get('spec')}"]
+    for name, base in baseline.get("results", {}).items():
+        cur = current.get("results", {}).get(name)
+        if cur is None:
+            continue
+        floor = base["bars_per_s"] * (1.0 - tolerance)
+        if cur["bars_per_s"] < floor:
+            failures.append(
+                f"{name}: {cur['bars_per_s']:,.0f} bars/s < {floor:,.0f} "
+                f"(baseline {base['bars_per_s']:,.0f}, tolerance {tolerance:.0%})"
+            )
+    return failures
+
+
+def format_results(report: Mapping[str, Any]) -> str:
+    lines = [f"{'benchmark':<20}{'bars':>10}{'seconds':>10}{'bars/s':>14}{'peak MB':>10}"]
+    for r in report["results"].values():
+        lines.append(f"{r['name']:<20}{r['bars']:>10}{r['seconds']:>10.3f}{r['bars_per_s']:>14,.0f}{r['peak_mb']:>10.1f}")
+    return "\n".join(lines)
@@ -1,14 +1,13 @@
 from __future__ import annotations
 
-import time
 import argparse
-import yaml
 from dataclasses import dataclass, field
+from pathlib import Path
 from queue import SimpleQueue,Empty
-from typing import Protocol, Optional, Iterable
-from src.data.csv_handler import CSVHandler
+from typing import TYPE_CHECKING, Any, Dict, Mapping, Protocol, Optional, Iterable
 from src.utils.logging import setup_logging, get_logger
 from src.engine.event_loop import EventLoop
+from src.core.clock import Clock
 
 from src.core.events import(
     Event, EventType,
@@ -17,16 +16,13 @@ from src.core.events import(
 )
 
 from src.modes.backtest import BacktestMode, BacktestConfig
-from src.portfolio.performance_portfolio import PerformancePortfolio
-from src.portfolio.commission import PercentNotionalCommission
-from src.execution.commission import FixedCommission, CommissionModel
-from pathlib import Path
+from src.core.registry import DATA, STRATEGIES, build_execution, build_portfolio
 
+if TYPE_CHECKING:
+    from src.execution.commission import CommissionModel
+
+# yaml、数据/组合/成本模块都按配置懒加载（src.core.registry），启动只 import 用到的部分
 
-@dataclass
-class BacktestConfig:
-    flatten_on_end: bool = True
-    max_flatten_steps: int = 10
 
 class DataHandler(Protocol):
     def has_next(self) -> bool:
@@ -141,9 +137,15 @@ class DummyPortfolio:
 
 @dataclass
 class DummyExecution:
-    def __init__(self, commission: float = 0.0, commission_model: CommissionModel | None = None, fill_price: float = 0.0):
+    def __init__(self, commission: float = 0.0, commission_model: CommissionModel | None = None, fill_price: float = 0.0,
+                 clock: Clock | None = None):
         self.fill_price = fill_price
-        self.commission_model = commission_model or FixedCommission(per_trade=commission)
+        # gateway id 时间戳：None = 用订单自身（模拟）时间，回放结果可复现
+        self.clock = clock
+        if commission_model is None:
+            from src.execution.commission import FixedCommission
+            commission_model = FixedCommission(per_trade=commission)
+        self.commission_model = commission_model
         self.commission = float(commission)
 
     def calc_commission(self, price: float, qty: int) -> float:
@@ -151,6 +153,9 @@ class DummyExecution:
             return float(self.commission_model.calc(price=price, qty=qty))
         return float(self.commission)
 
+    def _now_ms(self, event: OrderEvent) -> int:
+        return self.clock.now_ms() if self.clock is not None else event.timestamp_ms
+
     def on_order(self, event: OrderEvent) -> Optional[FillEvent]:
         # MKT 用 self.fill_price；LMT 用 event.limit_price（如果你有）
         price = self.fill_price
@@ -164,7 +169,7 @@ class DummyExecution:
             fill_price = price,
             commission=self.calc_commission(price=price, qty=event.qty),
             client_order_id = event.client_order_id,
-            gateway_order_id = f"gw-{event.client_order_id}-{int(time.time()*1000)}",
+            gateway_order_id = f"gw-{event.client_order_id}-{self._now_ms(event)}",
         )
     
 @dataclass
@@ -198,49 +203,120 @@ class BacktestEngine:
         log.info("RUN_DONE final_position=%s", getattr(self.portfolio, "position", None))
         print(f"Done. Final position: {self.portfolio.position}")
 
-def main() -> None:
-    setup_logging(level="INFO")
-    log = get_logger("backtest")
-    log.info("BOOT")
+def _build_data(data_cfg: Mapping[str, Any]) -> Any:
+    params = dict(data_cfg)
+    source = params.pop("source", None)
+    if source == "multi_csv":
+        paths = params.pop("paths", None)
+        directory = params.pop("directory", None)
+        params.pop("symbol", None)
+        cls = DATA.get(source)
+        if paths:
+            return cls(sources=dict(paths), **params)
+        if directory:
+            return cls.from_directory(directory, **params)
+        raise ValueError("config.data.paths or config.data.directory is required when source=multi_csv")
+    if not source or not params.get("symbol"):
+        raise ValueError("config.data.source and config.data.symbol are required")
+    if source == "csv":
+        if not params.get("csv_path"):
+            raise ValueError("config.data.csv_path is required when source=csv")
+        if params.pop("streaming", False):
+            source = "streaming_csv"
+            params.pop("columnar", None)
+            params.pop("cache_dir", None)
+        else:
+            params.pop("chunk_rows", None)
+    return DATA.build(source, **params)
+
+
+def build_loop(config: Mapping[str, Any], data: Any = None) -> EventLoop:
+    """
+    EventLoop from a config; each section names its component (see src.core.registry):
+    - data: {source: demo|csv|multi_csv, ...handler kwargs}
+    - strategy: {name, params} (default Dummy)
+    - portfolio: {name, initial_cash, order_qty, commission: {name, ...}} (default PerformancePortfolio)
+    - execution: {name: dummy|paper|simulated, ...} (default dummy)
+    `data` replaces the handler built from the data section. Only the modules of the named
+    components are imported.
+    """
+    strat_cfg = config.get("strategy") or {}
+    strat_params = dict(strat_cfg.get("params") or {})
+    strategy = STRATEGIES.build(strat_cfg.get("name", "Dummy"), **strat_params)
 
+    port_params: Dict[str, Any] = dict(config.get("portfolio") or {})
+    port_params.setdefault("initial_cash", float(config.get("run", {}).get("initial_cash", 100_000.0)))
+    if "order_qty" not in port_params and strat_params.get("qty"):
+        port_params["order_qty"] = int(strat_params["qty"])  # 策略给的目标仓位
+    portfolio = build_portfolio(port_params, {"name": "percent_notional", "rate": 0.0003, "min_fee": 1.0})
+    execution = build_execution(config.get("execution"), {"name": "dummy"})
+
+    engine_cfg = config.get("engine", {})
+    latency = None
+    if engine_cfg.get("latency", False):
+        from src.utils.latency import LatencyRecorder
+        latency = LatencyRecorder()
+    return EventLoop(
+        data=_build_data(config.get("data", {})) if data is None else data,
+        strategy=strategy,
+        portfolio=portfolio,
+        execution=execution,
+        batch_size=int(engine_cfg.get("batch_size", 0)),
+        latency=latency,
+    )
+
+
+def main() -> None:
     parser = argparse.ArgumentParser()
     parser.add_argument("--config", required=True)
+    parser.add_argument("--no-cache", action="store_true", help="ignore cached results (the fresh run still refreshes the cache)")
     args = parser.parse_args()
 
+    import yaml
+
     with open(Path(args.config), "r", encoding="utf-8") as f:
         config = yaml.safe_load(f) or {}
 
-    data_cfg = config.get("data", {})
-    source = data_cfg.get("source")
-    symbol = data_cfg.get("symbol")
+    # logging: {level, mode: sync|async, fmt: text|jsonl, sample: {EVENT: n}, rate_limit: {EVENT: per_s}}
+    log_cfg = dict(config.get("logging", {}))
+    setup_logging(level=log_cfg.pop("level", "INFO"), **log_cfg)
+    log = get_logger("backtest")
+    log.info("BOOT")
 
-    if not source or not symbol:
-        raise ValueError("config.data.source and config.data.symbol are required")
-    
-    if source == "demo":
-        data_handler = DummyDataHandler(symbol=symbol)
-    elif source == "csv":
-        csv_path = data_cfg.get("csv_path")
-        if not csv_path:
-            raise ValueError("config.data.csv_path is required when source=csv")
-        data_handler = CSVHandler(csv_path=csv_path, symbol=symbol)
-    else:
-        raise ValueError(f"unknown data.source: {source!r}")
-
-    loop = EventLoop(
-        data = data_handler,
-        strategy = DummyStrategy(),
-        portfolio = PerformancePortfolio(
-            initial_cash=100_000.0,
-            commission_model = PercentNotionalCommission(rate = 0.0003, min_fee = 1.0)
-            ),
-        execution=DummyExecution(),
-    )
+    # cache: {directory, max_bytes, arrays, tag, bypass}；要写 results 目录时总是真跑
+    cache = None
+    cache_key = None
+    if config.get("cache") and not config.get("results"):
+        from src.backtest.result_cache import ResultCache, resolved_config
+        cache = ResultCache.from_config(config.get("cache"), bypass=args.no_cache)
+    if cache is not None:
+        cache_key = cache.key(cache.data_fingerprint(config.get("data", {})), resolved_config(config))
+        hit = cache.get(cache_key)
+        if hit is not None:
+            print(f"Done (cached). Final position: {hit.report.get('final_position', 0)}")
+            log.info("PERF_SUMMARY %s", hit.report)
+            return
+
+    loop = build_loop(config)
+    # results: {directory, row_group, format: auto|npz|parquet, compress}
+    results_cfg = config.get("results")
+    sink = None
+    if results_cfg:
+        from src.backtest.results import ResultsSink
+        sink = ResultsSink(**results_cfg)
+        loop.portfolio.attach_sink(sink)
     mode = BacktestMode(
         loop=loop,
-        config=BacktestConfig(flatten_on_end=True, max_flatten_steps=10),
+        config=BacktestConfig(flatten_on_end=bool(config.get("engine", {}).get("flatten_on_end", True)),
+                              max_flatten_steps=10),
     )
     mode.run()
+    if cache_key is not None:
+        tracker = loop.portfolio.tracker
+        cache.put(cache_key, loop.portfolio.report(), tracker.equity_arrays() if cache.arrays else None)
+        log.info("RESULT_CACHE_STATS %s", cache.summary())
+    if sink is not None:
+        sink.close(summary=loop.portfolio.tracker.report(), tracker=loop.portfolio.tracker)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
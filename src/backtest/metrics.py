@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+import math
+from array import array
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+MS_PER_YEAR = 365.25 * 86_400_000
+
+
+class OnlineMetrics:
+    """
+    Streaming risk/return statistics, amortized O(1) per mark and O(1) per fill.
+    - marks are appended to small column buffers and folded with numpy every MARK_CHUNK marks
+      (and before each snapshot), so a mark costs a few array appends
+    - returns are bar-to-bar equity returns (fill marks excluded, so a bar is never counted twice)
+    - annualization uses `periods_per_year`, or when None the observed bars per calendar year
+    - a round trip runs per symbol from flat to flat (a flip closes one trade and opens the next);
+      its PnL is realized PnL net of the commissions paid along the way
+    """
+
+    MARK_CHUNK = 4096
+
+    __slots__ = (
+        "initial_cash", "periods_per_year",
+        "_buf_ts", "_buf_equity", "_buf_flags",
+        "_prev_equity", "_n", "_mean", "_m2", "_down_sq",
+        "_first_ts", "_last_ts", "_bars", "_exposed_bars", "_equity_sum", "_last_equity",
+        "_notional", "_trip_pnl", "_wins", "_losses", "_gross_profit", "_gross_loss",
+        "_peak", "_dd_start_ts", "_dd_start_bar", "_max_dd_ms", "_max_dd_bars",
+    )
+
+    def __init__(self, initial_cash: float, periods_per_year: Optional[float] = None) -> None:
+        self.initial_cash = float(initial_cash)
+        self.periods_per_year = periods_per_year
+        # 未折叠的 mark：flags bit0 = fill mark，bit1 = 有持仓
+        self._buf_ts = array("q")
+        self._buf_equity = array("d")
+        self._buf_flags = array("b")
+        self._prev_equity: Optional[float] = None
+        self._n = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._down_sq = 0.0
+        self._first_ts: Optional[int] = None
+        self._last_ts = 0
+        self._bars = 0
+        self._exposed_bars = 0
+        self._equity_sum = 0.0
+        self._last_equity = self.initial_cash
+        self._notional = 0.0
+        self._trip_pnl: Dict[int, float] = {}
+        self._wins = 0
+        self._losses = 0
+        self._gross_profit = 0.0
+        self._gross_loss = 0.0
+        self._peak = self.initial_cash
+        self._dd_start_ts: Optional[int] = None
+        self._dd_start_bar = 0
+        self._max_dd_ms = 0
+        self._max_dd_bars = 0
+
+    def on_mark(self, timestamp_ms: int, equity: float, open_positions: int, is_fill: bool) -> None:
+        self._buf_ts.append(timestamp_ms)
+        self._buf_equity.append(equity)
+        self._buf_flags.append((2 if open_positions else 0) | is_fill)
+        if len(self._buf_ts) >= self.MARK_CHUNK:
+            self._fold()
+
+    def _fold(self) -> None:
+        """Fold the buffered marks into the running statistics."""
+        if not self._buf_ts:
+            return
+        ts = np.frombuffer(self._buf_ts, dtype=np.int64).copy()
+        equity = np.frombuffer(self._buf_equity, dtype=np.float64).copy()
+        flags = np.frombuffer(self._buf_flags, dtype=np.int8).copy()
+        del self._buf_ts[:], self._buf_equity[:], self._buf_flags[:]
+        self._last_equity = float(equity[-1])
+
+        is_bar = (flags & 1) == 0
+        bars_before = self._bars
+        bar_eq = equity[is_bar]
+        if len(bar_eq):
+            bar_ts = ts[is_bar]
+            self._bars += len(bar_eq)
+            if self._first_ts is None:
+                self._first_ts = int(bar_ts[0])
+            self._last_ts = int(bar_ts[-1])
+            self._equity_sum += float(bar_eq.sum())
+            self._exposed_bars += int(np.count_nonzero(flags[is_bar] & 2))
+            prev = bar_eq[:-1] if self._prev_equity is None else np.concatenate(([self._prev_equity], bar_eq[:-1]))
+            cur = bar_eq[len(bar_eq) - len(prev):]
+            ok = prev != 0.0
+            r = cur[ok] / prev[ok] - 1.0
+            if len(r):
+                # Chan et al. 合并 Welford 状态
+                n_b, mean_b = len(r), float(r.mean())
+                m2_b = float(((r - mean_b) ** 2).sum())
+                n = self._n + n_b
+                delta = mean_b - self._mean
+                self._m2 += m2_b + delta * delta * self._n * n_b / n
+                self._mean += delta * n_b / n
+                self._n = n
+                neg = r[r < 0.0]
+                self._down_sq += float((neg * neg).sum())
+            self._prev_equity = float(bar_eq[-1])
+
+        # 回撤持续时间：从跌破前高到重新创新高（与逐点更新同语义，fill mark 也参与）
+        peak = np.maximum.accumulate(np.concatenate(([self._peak], equity)))
+        under = equity < peak[:-1]
+        self._peak = float(peak[-1])
+        bar_no = bars_before + np.cumsum(is_bar)
+        was_under = np.concatenate(([self._dd_start_ts is not None], under[:-1]))
+        starts = np.flatnonzero(under & ~was_under)
+        ends = np.flatnonzero(~under & was_under)
+        start_ts, start_bar = ts[starts], bar_no[starts]
+        if self._dd_start_ts is not None:
+            start_ts = np.concatenate(([self._dd_start_ts], start_ts))
+            start_bar = np.concatenate(([self._dd_start_bar], start_bar))
+        k = len(ends)
+        if k:
+            self._max_dd_ms = max(self._max_dd_ms, int((ts[ends] - start_ts[:k]).max()))
+            self._max_dd_bars = max(self._max_dd_bars, int((bar_no[ends] - start_bar[:k]).max()))
+        if len(start_ts) > k:
+            self._dd_start_ts, self._dd_start_bar = int(start_ts[k]), int(start_bar[k])
+        else:
+            self._dd_start_ts = None
+
+    def on_fill(
+        self,
+        symbol_id: int,
+        qty: int,
+        price: float,
+        pnl: float,
+        position_before: int,
+        position_after: int,
+    ) -> None:
+        """`pnl` is the fill's realized PnL minus its commission; positions are the symbol's."""
+        self._notional += abs(qty * price)
+        trip = self._trip_pnl.get(symbol_id, 0.0) + pnl
+        if position_before != 0 and (position_after == 0 or (position_after > 0) != (position_before > 0)):
+            self._record_trade(trip)
+            trip = 0.0
+        self._trip_pnl[symbol_id] = trip
+
+    def _record_trade(self, pnl: float) -> None:
+        if pnl > 0.0:
+            self._wins += 1
+            self._gross_profit += pnl
+        else:
+            self._losses += 1
+            self._gross_loss -= pnl
+
+    def _years(self) -> float:
+        if self._first_ts is None:
+            return 0.0
+        return (self._last_ts - self._first_ts) / MS_PER_YEAR
+
+    def snapshot(self, max_drawdown: float) -> Dict[str, Any]:
+        """Current metrics; None where undefined (e.g. no returns yet, zero variance)."""
+        self._fold()
+        years = self._years()
+        ppy = self.periods_per_year
+        if ppy is None and years > 0.0:
+            ppy = self._n / years
+
+        std = math.sqrt(self._m2 / (self._n - 1)) if self._n > 1 else None
+        down = math.sqrt(self._down_sq / self._n) if self._n > 0 else None
+        scale = math.sqrt(ppy) if ppy else None
+
+        sharpe = self._mean / std * scale if std and scale else None
+        sortino = self._mean / down * scale if down and scale else None
+        volatility = std * scale if std is not None and scale else None
+
+        cagr = None
+        if years > 0.0 and self.initial_cash > 0.0 and self._last_equity > 0.0:
+            cagr = (self._last_equity / self.initial_cash) ** (1.0 / years) - 1.0
+        calmar = cagr / max_drawdown if cagr is not None and max_drawdown > 0.0 else None
+
+        max_dd_ms, max_dd_bars = self._max_dd_ms, self._max_dd_bars
+        current_dd_ms = 0
+        if self._dd_start_ts is not None:
+            current_dd_ms = self._last_ts - self._dd_start_ts
+            max_dd_ms = max(max_dd_ms, current_dd_ms)
+            max_dd_bars = max(max_dd_bars, self._bars - self._dd_start_bar)
+
+        avg_equity = self._equity_sum / self._bars if self._bars else 0.0
+        trades = self._wins + self._losses
+        if self._gross_loss > 0.0:
+            profit_factor: Optional[float] = self._gross_profit / self._gross_loss
+        else:
+            profit_factor = math.inf if self._gross_profit > 0.0 else None
+
+        return {
+            "sharpe": sharpe,
+            "sortino": sortino,
+            "volatility": volatility,
+            "cagr": cagr,
+            "calmar": calmar,
+            "turnover": self._notional / avg_equity if avg_equity > 0.0 else None,
+            "exposure": self._exposed_bars / self._bars if self._bars else 0.0,
+            "round_trips": trades,
+            "win_rate": self._wins / trades if trades else None,
+            "profit_factor": profit_factor,
+            "max_drawdown_duration_ms": max_dd_ms,
+            "max_drawdown_duration_bars": max_dd_bars,
+            "current_drawdown_duration_ms": current_dd_ms,
+            "periods_per_year": ppy,
+        }
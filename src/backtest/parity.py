@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List
+
+from src.data.csv_handler import CSVHandler
+from src.engine.event_loop import EventLoop
+from src.execution.paper import PaperExecution, PaperExecutionConfig
+from src.modes.backtest import BacktestConfig, BacktestMode
+from src.modes.vectorized import VectorizedBacktestMode, VectorizedConfig
+from src.portfolio.performance_portfolio import PerformancePortfolio
+
+
+@dataclass
+class ParityReport:
+    event: Dict[str, Any]
+    vectorized: Dict[str, Any]
+    mismatches: List[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.mismatches
+
+
+def compare_summaries(
+    a: Dict[str, Any],
+    b: Dict[str, Any],
+    rel_tol: float = 1e-12,
+    abs_tol: float = 1e-9,
+) -> List[str]:
+    """Key-by-key comparison of two summary dicts; returns human-readable mismatches."""
+    out: List[str] = []
+    for key in sorted(set(a) | set(b)):
+        if key not in a or key not in b:
+            out.append(f"{key}: missing in {'event' if key not in a else 'vectorized'}")
+            continue
+        x, y = a[key], b[key]
+        if isinstance(x, float) or isinstance(y, float):
+            if not math.isclose(float(x), float(y), rel_tol=rel_tol, abs_tol=abs_tol):
+                out.append(f"{key}: {x!r} != {y!r}")
+        elif x != y:
+            out.append(f"{key}: {x!r} != {y!r}")
+    return out
+
+
+def check_parity(
+    csv_path: str,
+    symbol: str,
+    strategy_factory: Callable[[], Any],
+    config: VectorizedConfig | None = None,
+) -> ParityReport:
+    """
+    Run the same strategy through EventLoop + BacktestMode and VectorizedBacktestMode
+    (PerformancePortfolio + PaperExecution semantics) and compare the summaries.
+    """
+    cfg = config or VectorizedConfig()
+
+    loop = EventLoop(
+        data=CSVHandler(csv_path=csv_path, symbol=symbol, columnar=True),
+        strategy=strategy_factory(),
+        portfolio=PerformancePortfolio(
+            initial_cash=cfg.initial_cash,
+            commission_model=cfg.commission_model,
+            order_qty=cfg.order_qty,
+        ),
+        execution=PaperExecution(PaperExecutionConfig(default_commission=cfg.commission_per_trade)),
+    )
+    BacktestMode(loop=loop, config=BacktestConfig(flatten_on_end=cfg.flatten_on_end)).run()
+    event_summary = loop.portfolio.report()  # type: ignore[attr-defined]
+
+    bars = loop.data.bars  # type: ignore[attr-defined]
+    vec = VectorizedBacktestMode(bars=bars, strategy=strategy_factory(), symbol=symbol, config=cfg).run()
+
+    return ParityReport(
+        event=event_summary,
+        vectorized=vec.summary,
+        mismatches=compare_summaries(event_summary, vec.summary),
+    )
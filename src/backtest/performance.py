@@ -1,7 +1,15 @@
 from __future__ import annotations
 
+from array import array
 from dataclasses import dataclass, field
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+
+from src.backtest.metrics import OnlineMetrics
+from src.portfolio.position_book import PositionBook
+
+_MS_PER_DAY = 86_400_000
 
 @dataclass
 class EquityPoint:
@@ -20,28 +28,133 @@ class TradeRecord:
     price: float
     commission: float
 
+@dataclass(frozen=True)
+class CurveSampling:
+    """
+    Which marks go into the stored equity curve (drawdown and summary always see every mark).
+    - "all": every bar and every fill
+    - "every_n": every n-th bar mark, plus every fill mark
+    - "on_change": only marks where equity or position changed since the last stored point
+    - "eod": the last mark of each day; days are cut at UTC midnight shifted by utc_offset_ms
+    """
+    mode: str = "all"
+    n: int = 1
+    utc_offset_ms: int = 0
+
+    def __post_init__(self) -> None:
+        if self.mode not in ("all", "every_n", "on_change", "eod"):
+            raise ValueError(f"unknown curve sampling mode: {self.mode!r}")
+        if self.n <= 0:
+            raise ValueError("n must be > 0")
+
+    @classmethod
+    def every(cls, n: int) -> "CurveSampling":
+        return cls(mode="every_n", n=n)
+
+    @classmethod
+    def on_change(cls) -> "CurveSampling":
+        return cls(mode="on_change")
+
+    @classmethod
+    def end_of_day(cls, utc_offset_hours: float = 0.0) -> "CurveSampling":
+        return cls(mode="eod", utc_offset_ms=int(utc_offset_hours * 3_600_000))
+
 @dataclass
 class PerformanceTracker:
+    """
+    Cash/position bookkeeping plus equity curve and trade log.
+    Positions live in a per-symbol PositionBook; `position` is the net quantity across symbols
+    and equity is cash + the book's incrementally maintained market value.
+    Curve and trades are stored column-wise in typed arrays (8 bytes per field);
+    equity_arrays()/trade_arrays() expose them as NumPy arrays, `equity_curve`/`trades`
+    rebuild the old per-row objects on demand.
+    """
     initial_cash: float = 100_000.0
+    sampling: CurveSampling = field(default_factory=CurveSampling)
+    # metrics() 的年化因子；None 时按实际 bar 频率推断
+    periods_per_year: Optional[float] = None
 
     cash: float = field(init=False)
     position: int = field(init=False, default=0)
     last_price: float = field(init=False, default=0.0)
 
-    equity_curve: List[EquityPoint] = field(init=False, default_factory=list)
-    trades: List[TradeRecord] = field(init=False, default_factory=list)
-
     peak_equity: float = field(init=False)
     max_drawdown: float = field(init=False, default=0.0)
 
     def __post_init__(self) -> None:
         self.cash = float(self.initial_cash)
         self.peak_equity = float(self.initial_cash)
+        self.total_commission = 0
+        self.trade_count = 0
+        self.marks = 0
+        self._last_equity: Optional[float] = None
+        self._last_mark_price: float = 0.0
+
+        # equity curve columns
+        self._eq_ts = array("q")
+        self._eq_equity = array("d")
+        self._eq_cash = array("d")
+        self._eq_pos = array("q")
+        self._eq_price = array("d")
+        # trade log columns; symbols are interned into _symbols
+        self._tr_ts = array("q")
+        self._tr_sym = array("l")
+        self._tr_side = array("b")  # +1 BUY / -1 SELL
+        self._tr_qty = array("q")
+        self._tr_price = array("d")
+        self._tr_comm = array("d")
+        self.book = PositionBook()
+        # on_market() without a symbol marks the first traded symbol (single-instrument callers)
+        self._default_sid: Optional[int] = None
+        # 还没成交过的 symbol 的最新行情价；首笔成交建 book 条目时带过去（0 价成交按它 mark）
+        self._unbooked_price: Dict[str, float] = {}
+
+        self._bar_marks = 0
+        self._pending: Optional[tuple] = None  # eod: latest point of the current day
+        self._last_stored: Optional[tuple] = None
+        # results sink: full row groups are handed over and dropped from memory
+        self._sink: Any = None
+        self._flush_at = 1 << 62
+        self._metrics = OnlineMetrics(self.initial_cash, self.periods_per_year)
+
+    def _store(self, point: tuple) -> None:
+        ts, equity, cash, position, price = point
+        self._eq_ts.append(ts)
+        self._eq_equity.append(equity)
+        self._eq_cash.append(cash)
+        self._eq_pos.append(position)
+        self._eq_price.append(price)
+        self._last_stored = point
+        if len(self._eq_ts) >= self._flush_at:
+            self._flush_curve()
+
+    def _sample(self, point: tuple, is_fill: bool) -> None:
+        mode = self.sampling.mode
+        if mode == "all":
+            self._store(point)
+        elif mode == "every_n":
+            if is_fill:
+                self._store(point)
+            else:
+                if self._bar_marks % self.sampling.n == 0:
+                    self._store(point)
+                self._bar_marks += 1
+        elif mode == "on_change":
+            last = self._last_stored
+            if last is None or point[1] != last[1] or point[3] != last[3]:
+                self._store(point)
+        else:  # eod
+            pending = self._pending
+            if pending is not None:
+                off = self.sampling.utc_offset_ms
+                if (point[0] + off) // _MS_PER_DAY != (pending[0] + off) // _MS_PER_DAY:
+                    self._store(pending)
+            self._pending = point
 
-    def _mark_to_market(self, timestamp_ms: int, price: float) -> None:
-        """内部统一的 mark-to-market：写 equity_curve、更新回撤等。"""
+    def _mark_to_market(self, timestamp_ms: int, price: float, is_fill: bool = False) -> None:
+        """内部统一的 mark-to-market：写 equity curve、更新回撤等。"""
         self.last_price = float(price)
-        equity = self.cash + self.position * self.last_price
+        equity = self.cash + self.book.market_value
 
         if equity > self.peak_equity:
             self.peak_equity = equity
@@ -50,18 +163,25 @@ class PerformanceTracker:
         if dd > self.max_drawdown:
             self.max_drawdown = dd
 
-        self.equity_curve.append(
-            EquityPoint(
-                timestamp_ms=timestamp_ms,
-                equity=equity,
-                cash=self.cash,
-                position=self.position,
-                last_price=float(price),
-            )
-        )
+        self.marks += 1
+        self._last_equity = equity
+        self._last_mark_price = float(price)
+        self._metrics.on_mark(timestamp_ms, equity, self.book.open_count, is_fill)
+        self._sample((timestamp_ms, equity, self.cash, self.position, float(price)), is_fill)
 
-    def on_market(self, timestamp_ms: int, price: float) -> None:
-        self.last_price = float(price)
+    def on_market(self, timestamp_ms: int, price: float, symbol: Optional[str] = None) -> None:
+        """Mark one symbol's price (O(1) in the number of symbols held)."""
+        price = float(price)
+        book = self.book
+        # 没交易过的 symbol 不占 book 条目，价格先记在 _unbooked_price
+        sid = book.find(symbol) if symbol is not None else self._default_sid
+        if sid is not None:
+            if book.qty[sid]:
+                book.mark(sid, price)
+            else:
+                book.last_price[sid] = price
+        elif symbol is not None:
+            self._unbooked_price[symbol] = price
         self._mark_to_market(timestamp_ms, price)
 
     def on_fill(
@@ -80,32 +200,141 @@ class PerformanceTracker:
 
         s = side.upper()
         if s == "BUY":
-            self.position += qty
+            signed = qty
             self.cash -= qty * price + commission
         elif s == "SELL":
-            self.position -= qty
+            signed = -qty
             self.cash += qty * price - commission
         else:
             raise ValueError(f"Unknown side: {side}")
 
-        self.trades.append(
-            TradeRecord(
-                timestamp_ms=timestamp_ms,
-                symbol=symbol,
-                side=s,
-                qty=qty,
-                price=price,
-                commission=commission,
-            )
+        sym_id = self.book.find(symbol)
+        if sym_id is None:
+            sym_id = self.book.symbol_id(symbol)
+            # symbol 未给出的 on_market 只更新了 self.last_price
+            self.book.last_price[sym_id] = self._unbooked_price.pop(symbol, self.last_price)
+        if self._default_sid is None:
+            self._default_sid = sym_id
+        position_before = self.book.qty[sym_id]
+        mtm_price = price if price else self.book.last_price[sym_id]
+        realized = self.book.apply_fill(sym_id, signed, mtm_price)
+        self.position = self.book.net_qty
+
+        self._tr_ts.append(timestamp_ms)
+        self._tr_sym.append(sym_id)
+        self._tr_side.append(1 if s == "BUY" else -1)
+        self._tr_qty.append(qty)
+        self._tr_price.append(price)
+        self._tr_comm.append(commission)
+        if len(self._tr_ts) >= self._flush_at:
+            self._flush_trades()
+        # 与原先 sum(t.commission for t in trades) 同顺序累加，结果逐位一致
+        self.total_commission += commission
+        self.trade_count += 1
+        self._metrics.on_fill(
+            sym_id, qty, price, realized - commission, position_before, self.book.qty[sym_id],
         )
-        mtm_price = float(price) if price else float(getattr(self, "last_price", 0.0))
-        self._mark_to_market(timestamp_ms, mtm_price)
+        self._mark_to_market(timestamp_ms, mtm_price, is_fill=True)
+
+    # --- results sink ------------------------------------------------------------------------
+
+    def attach_sink(self, sink: Any) -> None:
+        """
+        Stream the curve and trade log to `sink` (a ResultsSink) in sink.row_group rows.
+        Flushed rows leave memory: equity_arrays()/trade_arrays() then only hold the unflushed tail,
+        the full series is read back with load_results(). Summary and metrics are unaffected.
+        """
+        self._sink = sink
+        self._flush_at = sink.row_group
+
+    def _flush_curve(self) -> None:
+        cols = (self._eq_ts, self._eq_equity, self._eq_cash, self._eq_pos, self._eq_price)
+        if not cols[0]:
+            return
+        self._sink.write("equity", {
+            name: np.array(col, dtype=np.int64 if col.typecode == "q" else np.float64)
+            for name, col in zip(("timestamp_ms", "equity", "cash", "position", "last_price"), cols)
+        })
+        for col in cols:
+            del col[:]
+
+    def _flush_trades(self) -> None:
+        if not self._tr_ts:
+            return
+        symbols = np.array(self.book.symbols, dtype=str)
+        self._sink.write("trades", {
+            "timestamp_ms": np.array(self._tr_ts, dtype=np.int64),
+            "symbol": symbols[np.array(self._tr_sym, dtype=np.int64)],
+            "side": np.array(self._tr_side, dtype=np.int8),
+            "qty": np.array(self._tr_qty, dtype=np.int64),
+            "price": np.array(self._tr_price, dtype=np.float64),
+            "commission": np.array(self._tr_comm, dtype=np.float64),
+        })
+        for col in (self._tr_ts, self._tr_sym, self._tr_side, self._tr_qty, self._tr_price, self._tr_comm):
+            del col[:]
+
+    def flush(self, final: bool = False) -> None:
+        """Hand the partial row groups to the sink; final=True also writes the open eod point."""
+        if self._sink is None:
+            return
+        if final and self._pending is not None:
+            self._store(self._pending)
+            self._pending = None
+        self._flush_curve()
+        self._flush_trades()
+
+    # --- columnar access ---------------------------------------------------------------------
+
+    def _curve_columns(self) -> tuple:
+        cols = (self._eq_ts, self._eq_equity, self._eq_cash, self._eq_pos, self._eq_price)
+        if self._pending is None:
+            return cols
+        # eod：当天还没结束的最后一个点也要给出去
+        return tuple(array(c.typecode, c) + array(c.typecode, [v]) for c, v in zip(cols, self._pending))
+
+    def equity_arrays(self) -> Dict[str, np.ndarray]:
+        """Stored equity curve as NumPy arrays (copies): timestamp_ms, equity, cash, position, last_price."""
+        ts, equity, cash, pos, price = self._curve_columns()
+        return {
+            "timestamp_ms": np.array(ts, dtype=np.int64),
+            "equity": np.array(equity, dtype=np.float64),
+            "cash": np.array(cash, dtype=np.float64),
+            "position": np.array(pos, dtype=np.int64),
+            "last_price": np.array(price, dtype=np.float64),
+        }
+
+    def trade_arrays(self) -> Dict[str, np.ndarray]:
+        """Trade log as NumPy arrays (copies); `symbol` holds the symbol strings, `side` is +1/-1."""
+        symbols = np.array(self.book.symbols + [""], dtype=object)
+        return {
+            "timestamp_ms": np.array(self._tr_ts, dtype=np.int64),
+            "symbol": symbols[np.array(self._tr_sym, dtype=np.int64)] if self._tr_sym else np.array([], dtype=object),
+            "side": np.array(self._tr_side, dtype=np.int8),
+            "qty": np.array(self._tr_qty, dtype=np.int64),
+            "price": np.array(self._tr_price, dtype=np.float64),
+            "commission": np.array(self._tr_comm, dtype=np.float64),
+        }
+
+    @property
+    def equity_curve(self) -> List[EquityPoint]:
+        """Row view of the stored curve (built on each access)."""
+        return [EquityPoint(*row) for row in zip(*self._curve_columns())]
+
+    @property
+    def trades(self) -> List[TradeRecord]:
+        """Row view of the trade log (built on each access)."""
+        return [
+            TradeRecord(ts, self.book.symbol(sym), "BUY" if side > 0 else "SELL", qty, price, comm)
+            for ts, sym, side, qty, price, comm in zip(
+                self._tr_ts, self._tr_sym, self._tr_side, self._tr_qty, self._tr_price, self._tr_comm,
+            )
+        ]
 
     def summary(self) -> Dict[str, Any]:
-        last_equity = self.equity_curve[-1].equity if self.equity_curve else float(self.initial_cash)
+        last_equity = self._last_equity if self._last_equity is not None else float(self.initial_cash)
         total_pnl = last_equity - self.initial_cash
         total_return = 0.0 if self.initial_cash == 0 else total_pnl / self.initial_cash
-        total_commission = sum(t.commission for t in self.trades)
+        total_commission = self.total_commission
 
         out = {
             "initial_cash": self.initial_cash,
@@ -113,9 +342,9 @@ class PerformanceTracker:
             "total_pnl": total_pnl,
             "total_return": total_return,
             "max_drawdown": self.max_drawdown,
-            "trades": len(self.trades),
+            "trades": self.trade_count,
             "final_position": self.position,
-            "last_price": float(self.equity_curve[-1].last_price) if self.equity_curve else 0.0,
+            "last_price": self._last_mark_price if self.marks else 0.0,
             "total_commission": total_commission,
             "cash": self.cash,  # 方便排查
         }
@@ -127,4 +356,12 @@ class PerformanceTracker:
                 "Commission may not be propagated into fills/portfolio."
             )
 
-        return out
\ No newline at end of file
+        return out
+
+    def metrics(self) -> Dict[str, Any]:
+        """Streaming risk/return metrics (see OnlineMetrics); O(1), safe to call mid-run."""
+        return self._metrics.snapshot(self.max_drawdown)
+
+    def report(self) -> Dict[str, Any]:
+        """summary() plus metrics()."""
+        return {**self.summary(), **self.metrics()}
@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from src.data.cache import file_digest
+from src.utils.logging import get_logger
+
+# bump when the entry layout or the key recipe changes
+RESULT_CACHE_VERSION = 1
+# 不影响结果的配置段/字段，不进 key
+IGNORED_SECTIONS = ("logging", "cache", "results", "checkpoint")
+IGNORED_DATA_KEYS = ("cache_dir", "chunk_rows")
+_FINGERPRINTS = "fingerprints.json"
+
+
+@lru_cache(maxsize=1)
+def code_version() -> str:
+    """Content hash of the src/ package: any code edit invalidates every cached result."""
+    root = Path(__file__).resolve().parents[1]
+    h = hashlib.blake2b(digest_size=12)
+    for path in sorted(root.rglob("*.py")):
+        h.update(path.relative_to(root).as_posix().encode("utf-8"))
+        h.update(path.read_bytes())
+    return h.hexdigest()
+
+
+def resolved_config(config: Mapping[str, Any]) -> Dict[str, Any]:
+    """config without the sections/keys that cannot change a run's numbers."""
+    out = {k: v for k, v in config.items() if k not in IGNORED_SECTIONS}
+    if isinstance(out.get("data"), Mapping):
+        out["data"] = {k: v for k, v in out["data"].items() if k not in IGNORED_DATA_KEYS}
+    return out
+
+
+@dataclass
+class CachedResult:
+    key: str
+    report: Dict[str, Any]
+    arrays: Optional[Dict[str, np.ndarray]] = None
+
+
+@dataclass
+class ResultCache:
+    """
+    Content-addressed on-disk cache of run results.
+    - key: hash of the data fingerprint, the resolved config, run parameters and code_version()
+    - layout: <directory>/<key>.json (report) + optional <key>.npz (equity arrays)
+    - LRU: a hit refreshes the entry's mtime. put() keeps a running byte total (seeded by one
+      directory scan), and only when it exceeds max_bytes scans, evicts the oldest entries down to
+      LOW_WATER * max_bytes and resyncs the total. Writes from other processes sharing the directory
+      are picked up at that resync.
+    - bypass=True skips lookups (every get() is a miss) but still stores fresh results
+    """
+    directory: str = ".cache/results"
+    max_bytes: int = 256 * 1024 * 1024
+    bypass: bool = False
+    arrays: bool = False
+    tag: str = ""
+    stats: Dict[str, int] = field(default_factory=lambda: {
+        "hits": 0, "misses": 0, "bypassed": 0, "writes": 0, "evictions": 0,
+    })
+
+    LOW_WATER = 0.9
+
+    def __post_init__(self) -> None:
+        self._log = get_logger("backtest.result_cache")
+        Path(self.directory).mkdir(parents=True, exist_ok=True)
+        self._bytes: Optional[int] = None  # 条目总字节数；第一次 put 时扫描一次得到
+
+    @classmethod
+    def from_config(cls, cfg: Optional[Mapping[str, Any]], bypass: bool = False) -> Optional["ResultCache"]:
+        """`cache:` config section -> ResultCache; None when the section is absent or enabled: false."""
+        if not cfg or not cfg.get("enabled", True):
+            return None
+        cfg = {k: v for k, v in cfg.items() if k != "enabled"}
+        cfg["bypass"] = bool(cfg.get("bypass", False)) or bypass
+        return cls(**cfg)
+
+    # --- keys -----------------------------------------------------------------------------------
+
+    def file_fingerprint(self, path: str | Path) -> str:
+        """
+        Content digest of a data file. Digests are memoized in the cache directory by
+        (path, size, mtime), so repeat runs don't re-hash unchanged files.
+        """
+        p = Path(path).resolve()
+        st = os.stat(p)
+        memo_path = Path(self.directory) / _FINGERPRINTS
+        try:
+            memo = json.loads(memo_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            memo = {}
+        hit = memo.get(str(p))
+        if hit and hit["size"] == st.st_size and hit["mtime_ns"] == st.st_mtime_ns:
+            return hit["digest"]
+        digest = file_digest(p)
+        memo[str(p)] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "digest": digest}
+        tmp = memo_path.with_name(f".{_FINGERPRINTS}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(memo, sort_keys=True), encoding="utf-8")
+        os.replace(tmp, memo_path)
+        return digest
+
+    def data_fingerprint(self, data_cfg: Mapping[str, Any]) -> List[Tuple[str, str]]:
+        """(symbol or file name, digest) for every file a `data:` section reads; [] for generated data."""
+        files: List[Tuple[str, Path]] = []
+        if data_cfg.get("csv_path"):
+            files.append((str(data_cfg.get("symbol", "")), Path(data_cfg["csv_path"])))
+        for sym, path in dict(data_cfg.get("paths") or {}).items():
+            files.append((str(sym), Path(path)))
+        if data_cfg.get("directory"):
+            files.extend((p.stem, p) for p in sorted(Path(data_cfg["directory"]).glob("*.csv*")))
+        return [(name, self.file_fingerprint(path)) for name, path in files]
+
+    def key(self, data: Any, config: Mapping[str, Any], params: Optional[Mapping[str, Any]] = None) -> str:
+        payload = json.dumps({
+            "v": RESULT_CACHE_VERSION,
+            "code": code_version(),
+            "tag": self.tag,
+            "data": data,
+            "config": config,
+            "params": dict(params or {}),
+        }, sort_keys=True, default=str)
+        return hashlib.blake2b(payload.encode("utf-8"), digest_size=20).hexdigest()
+
+    # --- entries --------------------------------------------------------------------------------
+
+    def _paths(self, key: str) -> Tuple[Path, Path]:
+        d = Path(self.directory)
+        return d / f"{key}.json", d / f"{key}.npz"
+
+    def get(self, key: str, arrays: bool = False) -> Optional[CachedResult]:
+        if self.bypass:
+            self.stats["bypassed"] += 1
+            return None
+        meta_path, npz_path = self._paths(key)
+        try:
+            entry = json.loads(meta_path.read_text(encoding="utf-8"))
+            loaded = None
+            if arrays:
+                with np.load(npz_path) as z:
+                    loaded = {name: z[name] for name in z.files}
+            os.utime(meta_path)  # LRU：命中即刷新
+        except (OSError, ValueError):
+            self.stats["misses"] += 1
+            self._log.info("RESULT_CACHE_MISS key=%s", key)
+            return None
+        self.stats["hits"] += 1
+        self._log.info("RESULT_CACHE_HIT key=%s", key)
+        return CachedResult(key=key, report=entry["report"], arrays=loaded)
+
+    @staticmethod
+    def _file_size(path: Path) -> int:
+        try:
+            return path.stat().st_size
+        except OSError:
+            return 0
+
+    def put(self, key: str, report: Mapping[str, Any], arrays: Optional[Mapping[str, np.ndarray]] = None) -> None:
+        meta_path, npz_path = self._paths(key)
+        if self._bytes is None:
+            self._bytes = self.size_bytes()
+        replaced = self._file_size(meta_path) + self._file_size(npz_path)
+        if arrays is not None:
+            tmp = npz_path.with_name(f".{npz_path.name}.{os.getpid()}.tmp")
+            with open(tmp, "wb") as f:
+                np.savez(f, **arrays)
+            os.replace(tmp, npz_path)
+        else:
+            npz_path.unlink(missing_ok=True)
+        # json 最后写：有 json 的条目才算有效
+        tmp = meta_path.with_name(f".{meta_path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps({"report": dict(report), "arrays": arrays is not None}, default=float),
+                       encoding="utf-8")
+        os.replace(tmp, meta_path)
+        self.stats["writes"] += 1
+        self._bytes += self._file_size(meta_path) + self._file_size(npz_path) - replaced
+        if self._bytes > self.max_bytes:
+            self.evict(int(self.max_bytes * self.LOW_WATER))
+
+    def get_or_run(self, key: str, run: Callable[[], Tuple[Dict[str, Any], Optional[Dict[str, np.ndarray]]]],
+                   arrays: bool = False) -> Tuple[CachedResult, bool]:
+        """Cached result for `key`, or run() -> (report, arrays) and store it. Returns (result, hit)."""
+        hit = self.get(key, arrays=arrays)
+        if hit is not None:
+            return hit, True
+        report, produced = run()
+        self.put(key, report, produced if self.arrays or arrays else None)
+        return CachedResult(key=key, report=report, arrays=produced), False
+
+    def _entries(self) -> Iterable[Tuple[float, int, List[Path]]]:
+        for meta_path in Path(self.directory).glob("*.json"):
+            if meta_path.name == _FINGERPRINTS:
+                continue
+            files = [meta_path, meta_path.with_suffix(".npz")]
+            try:
+                mtime = meta_path.stat().st_mtime
+                size = sum(p.stat().st_size for p in files if p.exists())
+            except OSError:
+                continue  # 并发淘汰
+            yield mtime, size, files
+
+    def evict(self, target_bytes: Optional[int] = None) -> int:
+        """Delete least recently used entries until the cache fits target_bytes (default max_bytes); returns entries removed."""
+        target = self.max_bytes if target_bytes is None else target_bytes
+        entries = sorted(self._entries(), key=lambda e: e[0])
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, files in entries:
+            if total <= target:
+                break
+            for p in files:
+                p.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        self._bytes = total
+        if removed:
+            self.stats["evictions"] += removed
+            self._log.info("RESULT_CACHE_EVICT entries=%s bytes=%s", removed, total)
+        return removed
+
+    def size_bytes(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def summary(self) -> Dict[str, Any]:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {**self.stats, "hit_rate": self.stats["hits"] / lookups if lookups else 0.0,
+                "bytes": self.size_bytes()}
+
+    def clear(self) -> None:
+        for _, _, files in list(self._entries()):
+            for p in files:
+                p.unlink(missing_ok=True)
+        self._bytes = 0
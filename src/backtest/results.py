@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+from src.core.events import FillEvent, Side
+from src.utils.logging import get_logger
+
+# 目录布局：<table>-<chunk:06d>.npz|.parquet，每个文件一个 row group；close() 写 manifest.json
+MANIFEST = "manifest.json"
+TABLES = ("equity", "trades", "fills")
+_FILL_COLUMNS = ("timestamp_ms", "symbol", "side", "qty", "price", "commission", "client_order_id", "gateway_order_id")
+
+
+def _pyarrow() -> Any:
+    try:
+        import pyarrow  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return None
+    return pyarrow
+
+
+def _text(values: Sequence[str]) -> np.ndarray:
+    # 定长 unicode：npz 不需要 allow_pickle
+    return np.array(values, dtype=str) if len(values) else np.array([], dtype="<U1")
+
+
+class ResultsSink:
+    """
+    Streams run results to `directory` in fixed-size row groups, one file per group:
+    - equity: timestamp_ms, equity, cash, position, last_price (the tracker's stored curve)
+    - trades: timestamp_ms, symbol, side (+1/-1), qty, price, commission (the tracker's trade log)
+    - fills: the trade columns plus client_order_id / gateway_order_id (from FillEvents)
+    format="npz" writes NumPy .npz chunks, "parquet" needs pyarrow, "auto" picks parquet when
+    pyarrow is importable. Attached to a PerformancePortfolio, the tracker hands over each full
+    row group and drops it from memory, so memory stays bounded however long the run is.
+    close(summary) flushes the tails and writes manifest.json (row counts, dtypes, summary).
+    """
+
+    def __init__(self, directory: str | Path, row_group: int = 65_536, format: str = "auto",
+                 compress: bool = False) -> None:
+        if row_group <= 0:
+            raise ValueError("row_group must be > 0")
+        if format == "auto":
+            format = "parquet" if _pyarrow() is not None else "npz"
+        if format not in ("npz", "parquet"):
+            raise ValueError(f"unknown results format: {format!r}")
+        if format == "parquet" and _pyarrow() is None:
+            raise ImportError("format='parquet' requires pyarrow")
+        self.directory = Path(directory)
+        self.row_group = int(row_group)
+        self.format = format
+        self.compress = compress
+        self.chunks: Dict[str, int] = {t: 0 for t in TABLES}
+        self.rows: Dict[str, int] = {t: 0 for t in TABLES}
+        self.dtypes: Dict[str, Dict[str, str]] = {}
+        self.closed = False
+        self._fills: Dict[str, List[Any]] = {c: [] for c in _FILL_COLUMNS}
+        self._log = get_logger("backtest.results")
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    # checkpoint：只存计数和未写出的 fill；反序列化不碰磁盘（只读检查 / warm start 也会 load）
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        del state["_log"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._log = get_logger("backtest.results")
+
+    def truncate_to_checkpoint(self) -> int:
+        """
+        Delete the chunks written after this (unpickled) sink's checkpoint, so a resumed run
+        does not leave duplicate rows behind. Returns the number of files removed.
+        """
+        removed = 0
+        for table, written in self.chunks.items():
+            for path in self._chunk_paths(table)[written:]:
+                path.unlink()
+                removed += 1
+        if removed:
+            self._log.info("RESULTS_TRUNCATED dir=%s files=%s chunks=%s", self.directory, removed, self.chunks)
+        return removed
+
+    def _chunk_paths(self, table: str) -> List[Path]:
+        return sorted(self.directory.glob(f"{table}-*.{self.format}"))
+
+    def write(self, table: str, columns: Mapping[str, np.ndarray]) -> Path:
+        """Write one row group (all columns the same length) as the next chunk of `table`."""
+        if self.closed:
+            raise RuntimeError("results sink is closed")
+        k = self.chunks[table]
+        path = self.directory / f"{table}-{k:06d}.{self.format}"
+        tmp = path.with_name(f".{path.name}.tmp")
+        if self.format == "npz":
+            with open(tmp, "wb") as f:
+                (np.savez_compressed if self.compress else np.savez)(f, **columns)
+        else:
+            pa = _pyarrow()
+            pa.parquet.write_table(
+                pa.table({name: pa.array(col) for name, col in columns.items()}), tmp,
+                compression="zstd" if self.compress else "none",
+            )
+        os.replace(tmp, path)
+        n = len(next(iter(columns.values()))) if columns else 0
+        self.chunks[table] = k + 1
+        self.rows[table] += n
+        self.dtypes.setdefault(table, {name: str(col.dtype) for name, col in columns.items()})
+        return path
+
+    def on_fill(self, event: FillEvent, commission: float) -> None:
+        fills = self._fills
+        fills["timestamp_ms"].append(event.timestamp_ms)
+        fills["symbol"].append(event.symbol)
+        fills["side"].append(1 if event.side == Side.BUY else -1)
+        fills["qty"].append(event.fill_qty)
+        fills["price"].append(event.fill_price)
+        fills["commission"].append(commission)
+        fills["client_order_id"].append(event.client_order_id)
+        fills["gateway_order_id"].append(event.gateway_order_id)
+        if len(fills["timestamp_ms"]) >= self.row_group:
+            self._flush_fills()
+
+    def _flush_fills(self) -> None:
+        fills = self._fills
+        if not fills["timestamp_ms"]:
+            return
+        self.write("fills", {
+            "timestamp_ms": np.array(fills["timestamp_ms"], dtype=np.int64),
+            "symbol": _text(fills["symbol"]),
+            "side": np.array(fills["side"], dtype=np.int8),
+            "qty": np.array(fills["qty"], dtype=np.int64),
+            "price": np.array(fills["price"], dtype=np.float64),
+            "commission": np.array(fills["commission"], dtype=np.float64),
+            "client_order_id": _text(fills["client_order_id"]),
+            "gateway_order_id": _text(fills["gateway_order_id"]),
+        })
+        for col in fills.values():
+            col.clear()
+
+    def close(self, summary: Optional[Mapping[str, Any]] = None, tracker: Any = None) -> Path:
+        """Flush the tails (tracker rows too, if given) and write the manifest."""
+        if tracker is not None:
+            tracker.flush(final=True)
+        self._flush_fills()
+        manifest = {
+            "format": self.format,
+            "row_group": self.row_group,
+            "tables": {
+                t: {"chunks": self.chunks[t], "rows": self.rows[t], "dtypes": self.dtypes.get(t, {})}
+                for t in TABLES
+            },
+            "summary": dict(summary or {}),
+        }
+        path = self.directory / MANIFEST
+        tmp = path.with_name(f".{MANIFEST}.tmp")
+        tmp.write_text(json.dumps(manifest, indent=2, default=float), encoding="utf-8")
+        os.replace(tmp, path)
+        self.closed = True
+        self._log.info("RESULTS_CLOSED dir=%s rows=%s", self.directory, self.rows)
+        return path
+
+
+def load_results(directory: str | Path, table: str, columns: Optional[Sequence[str]] = None) -> Dict[str, np.ndarray]:
+    """
+    Concatenate the chunks of one table, reading only `columns` (None = all).
+    Works without a manifest, e.g. on the partial output of a crashed run.
+    """
+    d = Path(directory)
+    npz = sorted(d.glob(f"{table}-*.npz"))
+    parquet = sorted(d.glob(f"{table}-*.parquet"))
+    parts: List[Dict[str, np.ndarray]] = []
+    if parquet:
+        pa = _pyarrow()
+        if pa is None:
+            raise ImportError(f"{d} holds parquet chunks; reading them requires pyarrow")
+        for p in parquet:
+            t = pa.parquet.read_table(p, columns=list(columns) if columns is not None else None)
+            parts.append({name: t.column(name).to_numpy() for name in t.column_names})
+    for p in npz:
+        with np.load(p) as z:  # NpzFile 按列惰性解压：只读用到的列
+            parts.append({name: z[name] for name in (columns if columns is not None else z.files)})
+    if not parts:
+        return {name: np.array([]) for name in columns or ()}
+    return {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
+
+
+def load_summary(directory: str | Path) -> Dict[str, Any]:
+    return json.loads((Path(directory) / MANIFEST).read_text(encoding="utf-8"))["summary"]
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import time
+from typing import Any, Dict, Optional
+
+from src.utils.latency import LatencyHistogram
+from src.utils.logging import get_logger
+
+
+class Clock:
+    """
+    Time source for engine components.
+    - now_ms(): epoch milliseconds (order/fill stamps)
+    - monotonic_ns(): interval timing; only differences are meaningful
+    - sleep(seconds): wait on this clock's timeline
+    """
+
+    def now_ms(self) -> int:
+        raise NotImplementedError
+
+    def monotonic_ns(self) -> int:
+        raise NotImplementedError
+
+    def sleep(self, seconds: float) -> None:
+        raise NotImplementedError
+
+
+class WallClock(Clock):
+    """The host clock (time.time_ns / perf_counter_ns / time.sleep)."""
+
+    __slots__ = ()
+
+    def now_ms(self) -> int:
+        return time.time_ns() // 1_000_000
+
+    def monotonic_ns(self) -> int:
+        return time.perf_counter_ns()
+
+    def sleep(self, seconds: float) -> None:
+        if seconds > 0:
+            time.sleep(seconds)
+
+
+class SimulatedClock(Clock):
+    """
+    Event time: moves only when bar timestamps (advance_to) or sleep() push it forward,
+    so everything stamped with it is reproducible across runs.
+    """
+
+    __slots__ = ("_ns",)
+
+    def __init__(self, start_ms: int = 0) -> None:
+        self._ns = int(start_ms) * 1_000_000
+
+    def now_ms(self) -> int:
+        return self._ns // 1_000_000
+
+    def monotonic_ns(self) -> int:
+        return self._ns
+
+    def sleep(self, seconds: float) -> None:
+        if seconds > 0:
+            self._ns += int(seconds * 1e9)
+
+    def advance_to(self, ts_ms: int) -> None:
+        """Move to bar time `ts_ms`; never goes backwards (out-of-order bars keep the latest time)."""
+        ns = ts_ms * 1_000_000
+        if ns > self._ns:
+            self._ns = ns
+
+
+class ReplayPacer:
+    """
+    Maps bar timestamps onto a wall-clock schedule: at speed N, a bar that is t ms after the first
+    one is due t / N ms after replay started. wait(ts_ms) sleeps until the bar is due and records
+    the lag (how late the bar actually starts vs. its slot). Lag stays near zero while processing
+    keeps up; once a bar takes longer than the gap to the next one, it grows bar after bar.
+    speed <= 0 means max speed: no sleeping, no lag.
+    - behind_ms: log REPLAY_BEHIND once the lag crosses it, REPLAY_CAUGHT_UP when it drops back
+    """
+
+    def __init__(
+        self,
+        speed: float = 1.0,
+        clock: Optional[Clock] = None,
+        behind_ms: float = 1000.0,
+        lag: Optional[LatencyHistogram] = None,
+    ) -> None:
+        self.speed = float(speed)
+        self.clock = clock or WallClock()
+        self.behind_ns = int(behind_ms * 1e6)
+        self.lag = lag if lag is not None else LatencyHistogram()
+        self.bars = 0
+        self.late_bars = 0
+        self.slept_s = 0.0
+        self.last_lag_ns = 0
+        self._behind = False
+        self._ts0 = 0
+        self._wall0 = 0
+        self._last_ts = 0
+        self._end_ns = 0
+        self._log = get_logger("core.replay")
+
+    def wait(self, ts_ms: int) -> int:
+        """Block until bar `ts_ms` is due; returns its lag in ns (0 at max speed)."""
+        clock = self.clock
+        self.bars += 1
+        if self.bars == 1:
+            self._ts0 = self._last_ts = ts_ms
+            self._wall0 = clock.monotonic_ns()
+            return 0
+        if ts_ms > self._last_ts:
+            self._last_ts = ts_ms
+        if self.speed <= 0:
+            return 0
+
+        due = self._wall0 + int((ts_ms - self._ts0) * 1e6 / self.speed)
+        now = clock.monotonic_ns()
+        if now < due:
+            wait_s = (due - now) / 1e9
+            clock.sleep(wait_s)
+            self.slept_s += wait_s
+            now = clock.monotonic_ns()
+        lag = max(now - due, 0)
+        self.lag.record(lag)
+        self.last_lag_ns = lag
+
+        if lag > self.behind_ns:
+            self.late_bars += 1
+            if not self._behind:
+                self._behind = True
+                self._log.warning("REPLAY_BEHIND bar=%s lag_ms=%.1f speed=%s", self.bars, lag / 1e6, self.speed)
+        elif self._behind:
+            self._behind = False
+            self._log.info("REPLAY_CAUGHT_UP bar=%s lag_ms=%.1f", self.bars, lag / 1e6)
+        return lag
+
+    def finish(self) -> None:
+        """Mark the end of replay (after the last bar has been processed)."""
+        self._end_ns = self.clock.monotonic_ns()
+
+    def stats(self) -> Dict[str, Any]:
+        end = self._end_ns or self.clock.monotonic_ns()
+        wall_s = (end - self._wall0) / 1e9 if self.bars else 0.0
+        sim_s = (self._last_ts - self._ts0) / 1e3
+        return {
+            "speed": self.speed,
+            "bars": self.bars,
+            "late_bars": self.late_bars,
+            "sim_elapsed_s": sim_s,
+            "wall_elapsed_s": wall_s,
+            "effective_speed": sim_s / wall_s if wall_s > 0 else 0.0,
+            "slept_s": self.slept_s,
+            "last_lag_ms": self.last_lag_ns / 1e6,
+            "lag_p50_ms": self.lag.percentile(50) / 1e6,
+            "lag_p99_ms": self.lag.percentile(99) / 1e6,
+            "lag_max_ms": self.lag.max_ns / 1e6,
+        }
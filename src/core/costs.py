@@ -0,0 +1,309 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from src.core.events import Side
+
+# 数组路径里 side 用 +1 (BUY) / -1 (SELL)，与 trade_arrays()/VectorizedResult 一致
+
+
+def _sign(side: Optional[object]) -> int:
+    """+1 BUY, -1 SELL, 0 unknown; accepts Side, "BUY"/"SELL" or +1/-1."""
+    if side is None:
+        return 0
+    if isinstance(side, (int, np.integer)):
+        return int(np.sign(side))
+    return 1 if str(getattr(side, "value", side)).upper() == "BUY" else -1
+
+
+def _side_mask(side: np.ndarray, only: Optional[Side]) -> Optional[np.ndarray]:
+    if only is None:
+        return None
+    return np.asarray(side) == (1 if only == Side.BUY else -1)
+
+
+# --- fees ------------------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class FeeModel:
+    """
+    Cash fee per fill, >= 0.
+    calc() is the per-fill path; calc_array() costs arrays of fills in one call. The scalar signature
+    covers both legacy call styles: calc(qty=, price=) and calc(symbol=, qty=, price=, side=).
+    """
+
+    def calc(self, qty: int, price: float, side: Optional[object] = None, symbol: str = "") -> float:
+        raise NotImplementedError
+
+    def calc_array(self, qty: np.ndarray, price: np.ndarray, side: np.ndarray) -> np.ndarray:
+        # 默认逐笔回退；内置模型都有向量化实现
+        return np.array(
+            [self.calc(q, p, s) for q, p, s in zip(np.asarray(qty).tolist(), np.asarray(price).tolist(),
+                                                   np.asarray(side).tolist())],
+            dtype=np.float64,
+        )
+
+
+@dataclass(frozen=True)
+class FixedFee(FeeModel):
+    per_trade: float = 0.0
+
+    def calc(self, qty: int, price: float, side: Optional[object] = None, symbol: str = "") -> float:
+        return float(self.per_trade)
+
+    def calc_array(self, qty: np.ndarray, price: np.ndarray, side: np.ndarray) -> np.ndarray:
+        return np.full(np.shape(qty), float(self.per_trade), dtype=np.float64)
+
+
+@dataclass(frozen=True)
+class PercentFee(FeeModel):
+    """
+    fee = clip(notional * rate, min_fee, max_fee); side=Side.SELL charges sells only (e.g. stamp duty).
+    """
+    rate: float = 0.0
+    min_fee: float = 0.0
+    max_fee: Optional[float] = None
+    side: Optional[Side] = None
+
+    def calc(self, qty: int, price: float, side: Optional[object] = None, symbol: str = "") -> float:
+        if self.side is not None and _sign(side) != _sign(self.side):
+            return 0.0
+        fee = float(qty) * float(price) * float(self.rate)
+        if fee < self.min_fee:
+            fee = self.min_fee
+        if self.max_fee is not None and fee > self.max_fee:
+            fee = self.max_fee
+        return float(fee) if fee > 0 else 0.0
+
+    def calc_array(self, qty: np.ndarray, price: np.ndarray, side: np.ndarray) -> np.ndarray:
+        fee = np.asarray(qty, dtype=np.float64) * np.asarray(price, dtype=np.float64) * float(self.rate)
+        fee = np.maximum(fee, float(self.min_fee))
+        if self.max_fee is not None:
+            fee = np.minimum(fee, float(self.max_fee))
+        fee = np.maximum(fee, 0.0)
+        mask = _side_mask(side, self.side)
+        return fee if mask is None else np.where(mask, fee, 0.0)
+
+
+@dataclass(frozen=True)
+class PerShareFee(FeeModel):
+    """fee = clip(qty * per_share, min_fee, max_pct * notional)."""
+    per_share: float = 0.0
+    min_fee: float = 0.0
+    max_pct: Optional[float] = None
+    side: Optional[Side] = None
+
+    def calc(self, qty: int, price: float, side: Optional[object] = None, symbol: str = "") -> float:
+        if self.side is not None and _sign(side) != _sign(self.side):
+            return 0.0
+        fee = max(float(qty) * self.per_share, self.min_fee)
+        if self.max_pct is not None:
+            fee = min(fee, float(qty) * float(price) * self.max_pct)
+        return float(fee)
+
+    def calc_array(self, qty: np.ndarray, price: np.ndarray, side: np.ndarray) -> np.ndarray:
+        q = np.asarray(qty, dtype=np.float64)
+        fee = np.maximum(q * float(self.per_share), float(self.min_fee))
+        if self.max_pct is not None:
+            fee = np.minimum(fee, q * np.asarray(price, dtype=np.float64) * float(self.max_pct))
+        mask = _side_mask(side, self.side)
+        return fee if mask is None else np.where(mask, fee, 0.0)
+
+
+@dataclass(frozen=True)
+class TieredFee(FeeModel):
+    """
+    Rate picked by the fill's notional: tiers = ((0, 0.0005), (10_000, 0.0003), (100_000, 0.0002))
+    charges 5 bps below 10k, 3 bps from 10k, 2 bps from 100k (whole notional at the bracket rate).
+    """
+    tiers: Tuple[Tuple[float, float], ...] = ((0.0, 0.0),)
+    min_fee: float = 0.0
+    side: Optional[Side] = None
+
+    def __post_init__(self) -> None:
+        if not self.tiers:
+            raise ValueError("tiers is empty")
+        bounds = [float(b) for b, _ in self.tiers]
+        if bounds != sorted(bounds):
+            raise ValueError("tier thresholds must be ascending")
+
+    def _rate(self, notional: float) -> float:
+        rate = self.tiers[0][1]
+        for bound, r in self.tiers:
+            if notional < bound:
+                break
+            rate = r
+        return rate
+
+    def calc(self, qty: int, price: float, side: Optional[object] = None, symbol: str = "") -> float:
+        if self.side is not None and _sign(side) != _sign(self.side):
+            return 0.0
+        notional = float(qty) * float(price)
+        return float(max(notional * self._rate(notional), self.min_fee))
+
+    def calc_array(self, qty: np.ndarray, price: np.ndarray, side: np.ndarray) -> np.ndarray:
+        notional = np.asarray(qty, dtype=np.float64) * np.asarray(price, dtype=np.float64)
+        bounds = np.array([b for b, _ in self.tiers], dtype=np.float64)
+        rates = np.array([r for _, r in self.tiers], dtype=np.float64)
+        idx = np.maximum(np.searchsorted(bounds, notional, side="right") - 1, 0)
+        fee = np.maximum(notional * rates[idx], float(self.min_fee))
+        mask = _side_mask(side, self.side)
+        return fee if mask is None else np.where(mask, fee, 0.0)
+
+
+# --- slippage --------------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class SlippageModel:
+    """
+    Adverse price move per unit (>= 0): buys fill at price + slip, sells at price - slip.
+    volume is the bar (or period) volume the fill trades into; volatility is the return std over
+    the same period. Models that need them return 0 where they are missing or zero.
+    """
+
+    def slip(self, qty: int, price: float, volume: Optional[float] = None,
+             volatility: Optional[float] = None) -> float:
+        raise NotImplementedError
+
+    def slip_array(self, qty: np.ndarray, price: np.ndarray, volume: Optional[np.ndarray] = None,
+                   volatility: Optional[np.ndarray] = None) -> np.ndarray:
+        raise NotImplementedError
+
+
+def _participation(qty: np.ndarray, volume: Optional[np.ndarray]) -> np.ndarray:
+    q = np.asarray(qty, dtype=np.float64)
+    if volume is None:
+        return np.zeros_like(q)
+    v = np.broadcast_to(np.asarray(volume, dtype=np.float64), q.shape)
+    out = np.zeros_like(q)
+    np.divide(q, v, out=out, where=v > 0)
+    return out
+
+
+@dataclass(frozen=True)
+class FixedBpsSlippage(SlippageModel):
+    bps: float = 0.0
+
+    def slip(self, qty: int, price: float, volume: Optional[float] = None,
+             volatility: Optional[float] = None) -> float:
+        return float(price) * self.bps * 1e-4
+
+    def slip_array(self, qty: np.ndarray, price: np.ndarray, volume: Optional[np.ndarray] = None,
+                   volatility: Optional[np.ndarray] = None) -> np.ndarray:
+        return np.asarray(price, dtype=np.float64) * (self.bps * 1e-4)
+
+
+@dataclass(frozen=True)
+class ParticipationSlippage(SlippageModel):
+    """slip = price * bps_at_full * 1e-4 * qty / volume, i.e. linear in the participation rate."""
+    bps_at_full: float = 100.0
+
+    def slip(self, qty: int, price: float, volume: Optional[float] = None,
+             volatility: Optional[float] = None) -> float:
+        if not volume:
+            return 0.0
+        return float(price) * self.bps_at_full * 1e-4 * float(qty) / float(volume)
+
+    def slip_array(self, qty: np.ndarray, price: np.ndarray, volume: Optional[np.ndarray] = None,
+                   volatility: Optional[np.ndarray] = None) -> np.ndarray:
+        return np.asarray(price, dtype=np.float64) * (self.bps_at_full * 1e-4) * _participation(qty, volume)
+
+
+@dataclass(frozen=True)
+class SqrtImpact(SlippageModel):
+    """
+    Square-root market impact: slip = price * coef * sigma * sqrt(qty / volume).
+    sigma is the per-call volatility when given, else the model's default.
+    """
+    coef: float = 1.0
+    sigma: float = 0.02
+
+    def slip(self, qty: int, price: float, volume: Optional[float] = None,
+             volatility: Optional[float] = None) -> float:
+        if not volume:
+            return 0.0
+        sigma = self.sigma if volatility is None else float(volatility)
+        return float(price) * self.coef * sigma * math.sqrt(float(qty) / float(volume))
+
+    def slip_array(self, qty: np.ndarray, price: np.ndarray, volume: Optional[np.ndarray] = None,
+                   volatility: Optional[np.ndarray] = None) -> np.ndarray:
+        sigma = self.sigma if volatility is None else np.asarray(volatility, dtype=np.float64)
+        return np.asarray(price, dtype=np.float64) * self.coef * sigma * np.sqrt(_participation(qty, volume))
+
+
+# --- composite -------------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class CostModel(FeeModel):
+    """
+    Fees + slippage. Slippage moves the fill price first; fees are charged on the slipped price.
+    As a FeeModel it can stand in wherever a commission model is expected (fees only).
+    """
+    fees: Tuple[FeeModel, ...] = ()
+    slippage: Tuple[SlippageModel, ...] = ()
+
+    def calc(self, qty: int, price: float, side: Optional[object] = None, symbol: str = "") -> float:
+        return float(sum(f.calc(qty, price, side, symbol) for f in self.fees))
+
+    def calc_array(self, qty: np.ndarray, price: np.ndarray, side: np.ndarray) -> np.ndarray:
+        out = np.zeros(np.shape(qty), dtype=np.float64)
+        for f in self.fees:
+            out += f.calc_array(qty, price, side)
+        return out
+
+    def apply(
+        self,
+        qty: int,
+        price: float,
+        side: object,
+        volume: Optional[float] = None,
+        volatility: Optional[float] = None,
+        symbol: str = "",
+    ) -> Tuple[float, float]:
+        """(fill price after slippage, commission) for one fill."""
+        slip = sum(s.slip(qty, price, volume, volatility) for s in self.slippage)
+        fill_price = float(price) + _sign(side) * slip
+        return fill_price, self.calc(qty, fill_price, side, symbol)
+
+    def apply_arrays(
+        self,
+        qty: np.ndarray,
+        price: np.ndarray,
+        side: np.ndarray,
+        volume: Optional[np.ndarray] = None,
+        volatility: Optional[np.ndarray] = None,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Vectorized apply() over arrays of fills (side +1/-1). Returns fill_price, commission,
+        slippage_cost (cash lost to slippage) and total_cost per fill.
+        """
+        qty = np.asarray(qty)
+        price = np.asarray(price, dtype=np.float64)
+        side = np.asarray(side)
+        slip = np.zeros(qty.shape, dtype=np.float64)
+        for s in self.slippage:
+            slip += s.slip_array(qty, price, volume, volatility)
+        fill_price = price + np.sign(side) * slip
+        commission = self.calc_array(qty, fill_price, side)
+        slippage_cost = slip * np.abs(qty)
+        return {
+            "fill_price": fill_price,
+            "commission": commission,
+            "slippage_cost": slippage_cost,
+            "total_cost": commission + slippage_cost,
+        }
+
+
+def trade_costs(
+    trades: Dict[str, np.ndarray],
+    model: CostModel,
+    volume: Optional[np.ndarray] = None,
+    volatility: Optional[np.ndarray] = None,
+) -> Dict[str, np.ndarray]:
+    """Post-trade costing of PerformanceTracker.trade_arrays() (or any qty/price/side columns)."""
+    return model.apply_arrays(trades["qty"], trades["price"], trades["side"], volume, volatility)
+
@@ -2,7 +2,10 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from enum import Enum
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from src.data.bars import BarArrays
 
 
 class EventType(str, Enum):
@@ -11,6 +14,8 @@ class EventType(str, Enum):
     ORDER = "ORDER"
     FILL = "FILL"
     STATUS = "STATUS"
+    BAR_BATCH = "BAR_BATCH"
+    CANCEL = "CANCEL"
 
 class Side(str, Enum):
     BUY = "BUY"
@@ -23,6 +28,13 @@ class SignalType(str, Enum):
 class OrderType(str, Enum):
     MKT = "MKT"
     LMT = "LMT"
+    STP = "STP"
+
+class TimeInForce(str, Enum):
+    GTC = "GTC"  # rests until filled or canceled
+    DAY = "DAY"  # expires at the first bar of the next trading day
+    IOC = "IOC"  # fill what is possible on arrival, cancel the rest
+    FOK = "FOK"  # fill entirely on arrival or not at all
 
 class OrderStatus(str, Enum):
     NEW = "NEW"
@@ -30,6 +42,7 @@ class OrderStatus(str, Enum):
     REJECTED = "REJECTED"
     PARTIALLY_FILLED = "PARTIALLY_FILLED"
     FILLED = "FILLED"
+    EXPIRED = "EXPIRED"
 
 @dataclass(frozen = True, slots = True)
 class Event:
@@ -59,6 +72,8 @@ class OrderEvent(Event):
     qty: int
     limit_price: float = 0.0
     strategy_id: str = "default"
+    stop_price: float = 0.0
+    tif: TimeInForce = TimeInForce.GTC
 
 @dataclass(frozen = True, slots = True)
 class FillEvent(Event):
@@ -77,6 +92,24 @@ class OrderStatusEvent(Event):
     gateway_order_id: Optional[str]
     status: OrderStatus
     reason: str = ""
-    
 
 
+@dataclass(frozen = True, slots = True)
+class CancelEvent(Event):
+    """Request to cancel a resting order."""
+    client_order_id: str
+
+
+@dataclass(frozen = True, slots = True)
+class BarBatch(Event):
+    """
+    N consecutive bars of one symbol as contiguous columns (struct of arrays).
+    timestamp_ms is the last bar's timestamp.
+    """
+    bars: BarArrays
+
+    def __len__(self) -> int:
+        return len(self.bars)
+
+    def event_at(self, i: int) -> MarketEvent:
+        return self.bars.event_at(i, self.symbol)
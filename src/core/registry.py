@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import importlib
+from dataclasses import MISSING, fields, is_dataclass
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Union
+
+# "package.module:Attr"（也可以是 "module:Cls.factory"）；第一次 get() 时才 import
+Target = Union[str, Any]
+
+
+class Registry:
+    """
+    Config name -> component class, imported on first use.
+    Entries are "module:attr" strings (or already-imported objects), so registering every
+    built-in component costs nothing at startup: only what a config actually names gets imported.
+    Supports `name in registry` and `registry[name]`, like the plain dicts it replaces.
+    """
+
+    def __init__(self, kind: str, entries: Optional[Mapping[str, Target]] = None) -> None:
+        self.kind = kind
+        self._targets: Dict[str, Target] = dict(entries or {})
+        self._loaded: Dict[str, Any] = {}
+
+    def register(self, name: str, target: Target) -> None:
+        self._targets[name] = target
+        self._loaded.pop(name, None)
+
+    def names(self) -> List[str]:
+        return sorted(self._targets)
+
+    def get(self, name: str) -> Any:
+        obj = self._loaded.get(name)
+        if obj is not None:
+            return obj
+        try:
+            target = self._targets[name]
+        except KeyError:
+            raise ValueError(f"unknown {self.kind}: {name!r} (known: {', '.join(self.names())})") from None
+        if isinstance(target, str):
+            module, _, attr = target.partition(":")
+            obj = importlib.import_module(module)
+            for part in attr.split("."):
+                obj = getattr(obj, part)
+        else:
+            obj = target
+        self._loaded[name] = obj
+        return obj
+
+    def build(self, name: str, **params: Any) -> Any:
+        return self.get(name)(**params)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._targets
+
+    def __getitem__(self, name: str) -> Any:
+        return self.get(name)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._targets)
+
+
+def build_component(registry: Registry, name: str, params: Mapping[str, Any]) -> Any:
+    """
+    registry[name](**params); components configured through a `config` dataclass field
+    (PaperExecution, SimulatedBroker, ...) get that config built from params instead.
+    """
+    cls = registry.get(name)
+    if isinstance(cls, type) and is_dataclass(cls):
+        cfg = next((f for f in fields(cls) if f.name == "config"), None)
+        if cfg is not None and cfg.default_factory is not MISSING:
+            return cls(config=cfg.default_factory(**params))
+    return cls(**params)
+
+
+def build_cost(cfg: Mapping[str, Any]) -> Any:
+    """
+    `{name, ...params}` -> fee/slippage model (name defaults to percent_notional).
+    cost_model takes nested `fees` / `slippage` lists; tiered takes `tiers` as [[notional, rate], ...].
+    """
+    params = dict(cfg)
+    name = params.pop("name", "percent_notional")
+    if name == "cost_model":
+        params["fees"] = tuple(build_cost(f) for f in params.get("fees", ()))
+        params["slippage"] = tuple(build_cost(s) for s in params.get("slippage", ()))
+    if "tiers" in params:
+        params["tiers"] = tuple(tuple(t) for t in params["tiers"])
+    return COSTS.build(name, **params)
+
+
+def build_portfolio(cfg: Optional[Mapping[str, Any]], default_commission: Mapping[str, Any]) -> Any:
+    """`portfolio:` section -> portfolio; `name` defaults to PerformancePortfolio, `commission` is a build_cost spec."""
+    params = dict(cfg or {})
+    name = params.pop("name", "PerformancePortfolio")
+    params["commission_model"] = build_cost(params.pop("commission", None) or default_commission)
+    return PORTFOLIOS.build(name, **params)
+
+
+def build_execution(cfg: Optional[Mapping[str, Any]], default: Mapping[str, Any]) -> Any:
+    """
+    `execution:` section -> execution; without a `name` the section is merged over `default`.
+    For paper, `commission` is shorthand for default_commission; a `commission_model` mapping goes
+    through build_cost.
+    """
+    params = dict(cfg or {})
+    if "name" not in params:
+        params = {**default, **params}
+    name = params.pop("name")
+    if name == "paper" and "commission" in params:
+        params["default_commission"] = params.pop("commission")
+    if isinstance(params.get("commission_model"), Mapping):
+        params["commission_model"] = build_cost(params["commission_model"])
+    return build_component(EXECUTIONS, name, params)
+
+
+STRATEGIES = Registry("strategy", {
+    "BuyAndHold": "src.strategy.buy_and_hold:BuyAndHold",
+    "SMACross": "src.strategy.sma_cross:SMACross",
+    "Dummy": "src.backtest.engine:DummyStrategy",
+})
+
+DATA = Registry("data source", {
+    "demo": "src.backtest.engine:DummyDataHandler",
+    "csv": "src.data.csv_handler:CSVHandler",
+    "streaming_csv": "src.data.streaming_csv:StreamingCSVHandler",
+    "multi_csv": "src.data.multi_symbol:MultiSymbolHandler",
+})
+
+PORTFOLIOS = Registry("portfolio", {
+    "PerformancePortfolio": "src.portfolio.performance_portfolio:PerformancePortfolio",
+})
+
+EXECUTIONS = Registry("execution", {
+    "dummy": "src.backtest.engine:DummyExecution",
+    "paper": "src.execution.paper:PaperExecution",
+    "simulated": "src.execution.simulated_broker:SimulatedBroker",
+})
+
+# fee / slippage models (calc(qty, price) / calc_array)
+COSTS = Registry("cost model", {
+    "zero": "src.portfolio.commission:ZeroCommission",
+    "percent_notional": "src.portfolio.commission:PercentNotionalCommission",
+    "fixed": "src.execution.commission:FixedCommission",
+    "rate": "src.execution.commission:RateCommission",
+    "per_share": "src.core.costs:PerShareFee",
+    "tiered": "src.core.costs:TieredFee",
+    "fixed_bps_slippage": "src.core.costs:FixedBpsSlippage",
+    "participation_slippage": "src.core.costs:ParticipationSlippage",
+    "sqrt_impact": "src.core.costs:SqrtImpact",
+    "cost_model": "src.core.costs:CostModel",
+})
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import List, Optional
+
+from src.core.events import BarBatch, EventType, MarketEvent
+from src.data.bars import BarArrays
+from src.data.ring_buffer import BarRingBuffer, BarWindow
+
+
+@dataclass
+class ArrayDataHandler:
+    """
+    Data handler over already-parsed columns (BarArrays), e.g. a cache hit or a shared-memory view.
+    Same protocol as CSVHandler; lookback=None keeps the whole series.
+    """
+    bars: BarArrays
+    symbol: str
+    lookback: Optional[int] = None
+
+    def __post_init__(self) -> None:
+        self._n = len(self.bars)
+        self._i = 0
+        capacity = self.lookback if self.lookback is not None else max(self._n, 1)
+        self._history = BarRingBuffer(capacity=capacity, slack=None if self.lookback is not None else 1)
+
+    def has_next(self) -> bool:
+        return self._i < self._n
+
+    def stream_next(self) -> MarketEvent:
+        event = self.bars.event_at(self._i, self.symbol)
+        self._i += 1
+        self._history.append(event)
+        return event
+
+    def stream_batch(self, max_bars: int) -> BarBatch:
+        """Next block of up to max_bars bars as zero-copy column views."""
+        stop = min(self._i + max(int(max_bars), 1), self._n)
+        bars = self.bars.slice(self._i, stop)
+        self._i = stop
+        self._history.extend(bars, self.symbol)
+        return BarBatch(
+            type=EventType.BAR_BATCH, timestamp_ms=bars.timestamp_ms.item(len(bars) - 1),
+            symbol=self.symbol, bars=bars,
+        )
+
+    def get_latest_bars(self, symbol: str, n: int = 1) -> List[MarketEvent]:
+        if symbol != self.symbol or n <= 0:
+            return []
+        return self._history.latest_events(n)
+
+    def get_latest_window(self, symbol: str, n: int) -> Optional[BarWindow]:
+        return self._history.window(n) if symbol == self.symbol else None
+
+    def get_latest_close(self, symbol: str) -> Optional[float]:
+        return self._history.last_close() if symbol == self.symbol else None
@@ -0,0 +1,336 @@
+from __future__ import annotations
+
+import bz2
+import csv
+import gzip
+import lzma
+import warnings
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List, Optional, Sequence, TextIO
+
+import numpy as np
+
+from src.core.events import EventType, MarketEvent
+
+# 与 csv_handler._parse_datetime_to_ms 的尝试顺序保持一致
+DATETIME_FORMATS = ("%Y-%m-%d %H:%M:%S", "%Y/%m/%d %H:%M:%S", "%Y-%m-%d %H:%M")
+EPOCH_FORMAT = "epoch"
+
+_MS_PER_HOUR = 3_600_000
+# np.loadtxt has a fixed setup cost; below this block size the csv module is faster
+_NUMPY_MIN_ROWS = 2_048
+_NAIVE_EPOCH = datetime(1970, 1, 1)
+
+
+@dataclass(frozen=True)
+class BarArrays:
+    """
+    Columnar OHLCV store: one typed array per field.
+    - timestamp_ms: int64
+    - open/high/low/close/volume: float64
+    """
+    timestamp_ms: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+    def __len__(self) -> int:
+        return int(self.timestamp_ms.shape[0])
+
+    def slice(self, start: int, stop: int) -> "BarArrays":
+        """Zero-copy view over rows [start, stop)."""
+        return BarArrays(
+            timestamp_ms=self.timestamp_ms[start:stop],
+            open=self.open[start:stop],
+            high=self.high[start:stop],
+            low=self.low[start:stop],
+            close=self.close[start:stop],
+            volume=self.volume[start:stop],
+        )
+
+    @classmethod
+    def from_events(cls, events: Sequence[MarketEvent]) -> "BarArrays":
+        return cls(
+            timestamp_ms=np.fromiter((e.timestamp_ms for e in events), dtype=np.int64, count=len(events)),
+            open=np.fromiter((e.open for e in events), dtype=np.float64, count=len(events)),
+            high=np.fromiter((e.high for e in events), dtype=np.float64, count=len(events)),
+            low=np.fromiter((e.low for e in events), dtype=np.float64, count=len(events)),
+            close=np.fromiter((e.close for e in events), dtype=np.float64, count=len(events)),
+            volume=np.fromiter((e.volume for e in events), dtype=np.float64, count=len(events)),
+        )
+
+    def event_at(self, i: int, symbol: str) -> MarketEvent:
+        return MarketEvent(
+            type=EventType.MARKET,
+            timestamp_ms=self.timestamp_ms.item(i),
+            symbol=symbol,
+            open=self.open.item(i),
+            high=self.high.item(i),
+            low=self.low.item(i),
+            close=self.close.item(i),
+            volume=self.volume.item(i),
+        )
+
+
+def detect_datetime_format(sample: str) -> str:
+    """Detect the datetime format of one cell; the result is reused for the whole column."""
+    s = sample.strip().replace("T", " ")
+    for fmt in DATETIME_FORMATS:
+        try:
+            datetime.strptime(s, fmt)
+            return fmt
+        except ValueError:
+            continue
+
+    try:
+        float(s)
+        return EPOCH_FORMAT
+    except ValueError as e:
+        raise ValueError(f"Unrecognized datetime format: {sample}") from e
+
+
+def parse_datetimes_to_ms(values: Sequence[str] | np.ndarray, fmt: Optional[str] = None) -> np.ndarray:
+    """
+    Bulk version of csv_handler._parse_datetime_to_ms.
+    Wall-clock strings are interpreted in local time, exactly like datetime.timestamp().
+    """
+    arr = np.char.strip(np.asarray(values, dtype=str))
+    n = int(arr.shape[0])
+    if n == 0:
+        return np.empty(0, dtype=np.int64)
+    if fmt is None:
+        fmt = detect_datetime_format(str(arr[0]))
+
+    if fmt == EPOCH_FORMAT:
+        x = arr.astype(np.float64)
+        return np.where(x > 1e12, x, x * 1000).astype(np.int64)
+
+    if "/" in fmt:
+        arr = np.char.replace(arr, "/", "-")
+
+    try:
+        naive_ms = arr.astype("datetime64[ms]").astype(np.int64)
+    except ValueError:
+        # e.g. non zero-padded fields: numpy refuses, strptime accepts
+        iso_fmt = fmt.replace("/", "-")
+        naive_ms = np.fromiter(
+            (_naive_ms(datetime.strptime(v.replace("T", " "), iso_fmt)) for v in arr.tolist()),
+            dtype=np.int64,
+            count=n,
+        )
+
+    return _naive_to_local_epoch_ms(naive_ms)
+
+
+def _naive_ms(dt: datetime) -> int:
+    return (dt - _NAIVE_EPOCH) // timedelta(milliseconds=1)
+
+
+def _naive_to_local_epoch_ms(naive_ms: np.ndarray) -> np.ndarray:
+    """Shift naive wall-clock ms to epoch ms using the local UTC offset of each distinct hour."""
+    hours = naive_ms // _MS_PER_HOUR
+    uniq, inverse = np.unique(hours, return_inverse=True)
+    offsets = np.fromiter(
+        (
+            h * _MS_PER_HOUR - int((_NAIVE_EPOCH + timedelta(hours=h)).timestamp() * 1000)
+            for h in uniq.tolist()
+        ),
+        dtype=np.int64,
+        count=uniq.shape[0],
+    )
+    return naive_ms - offsets[inverse.reshape(-1)]
+
+
+def _float_column(values: Sequence[str], name: str, default: Optional[float] = None) -> np.ndarray:
+    try:
+        return np.asarray(values, dtype=np.float64)
+    except ValueError:
+        if default is None:
+            raise ValueError(f"Invalid numeric value in column {name!r}") from None
+    return np.fromiter(
+        (float(v) if v and v.strip() else default for v in values),
+        dtype=np.float64,
+        count=len(values),
+    )
+
+
+def bar_arrays_from_rows(
+    rows: Sequence[Sequence[str]],
+    header: Sequence[str],
+    *,
+    col_datetime: str = "datetime",
+    col_open: str = "open",
+    col_high: str = "high",
+    col_low: str = "low",
+    col_close: str = "close",
+    col_volume: str = "volume",
+    datetime_format: Optional[str] = None,
+) -> BarArrays:
+    """Parse raw csv.reader rows (header excluded) into a BarArrays, one column at a time."""
+    index = {name: i for i, name in enumerate(header)}
+    for col in (col_datetime, col_open, col_high, col_low, col_close):
+        if col not in index:
+            raise KeyError(col)
+
+    n = len(rows)
+    width = len(header)
+    # 短行按 DictReader 的语义补齐（缺失字段视为空）
+    columns: List[Sequence[str]]
+    if n and any(len(r) < width for r in rows):
+        rows = [list(r) + [""] * (width - len(r)) for r in rows]
+    columns = list(zip(*rows)) if n else [() for _ in header]
+
+    volume_i = index.get(col_volume)
+    volume = (
+        _float_column(columns[volume_i], col_volume, default=0.0)
+        if volume_i is not None
+        else np.zeros(n, dtype=np.float64)
+    )
+
+    return BarArrays(
+        timestamp_ms=parse_datetimes_to_ms(columns[index[col_datetime]], datetime_format),
+        open=_float_column(columns[index[col_open]], col_open),
+        high=_float_column(columns[index[col_high]], col_high),
+        low=_float_column(columns[index[col_low]], col_low),
+        close=_float_column(columns[index[col_close]], col_close),
+        volume=volume,
+    )
+
+
+def open_text(path: str | Path) -> TextIO:
+    """Open a csv for text reading, decompressing .gz/.bz2/.xz on the fly."""
+    p = Path(path)
+    opener = _COMPRESSED_OPENERS.get(p.suffix.lower())
+    if opener is not None:
+        return opener(p, "rt", newline="", encoding="utf-8")
+    return p.open("r", newline="", encoding="utf-8")
+
+
+_COMPRESSED_OPENERS = {".gz": gzip.open, ".bz2": bz2.open, ".xz": lzma.open}
+
+
+def is_compressed(path: str | Path) -> bool:
+    """True for the .gz/.bz2/.xz inputs open_text decompresses (they cannot seek without re-reading)."""
+    return Path(path).suffix.lower() in _COMPRESSED_OPENERS
+
+
+def load_bar_arrays(
+    csv_path: str,
+    *,
+    col_datetime: str = "datetime",
+    col_open: str = "open",
+    col_high: str = "high",
+    col_low: str = "low",
+    col_close: str = "close",
+    col_volume: str = "volume",
+) -> BarArrays:
+    """Read a whole OHLCV csv into typed columns. The datetime format is detected once per file."""
+    path = Path(csv_path)
+    if not path.exists():
+        raise FileNotFoundError(f"CSV file not found: {csv_path}")
+
+    cols = dict(
+        col_datetime=col_datetime,
+        col_open=col_open,
+        col_high=col_high,
+        col_low=col_low,
+        col_close=col_close,
+        col_volume=col_volume,
+    )
+
+    with open_text(path) as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            raise ValueError("CSV file has no header row.")
+
+        try:
+            # np.loadtxt 自己识别 .gz/.bz2/.xz
+            return _load_with_numpy(path, header, skiprows=1, **cols)
+        except ValueError:
+            # 空 volume、引号内逗号等情况交给 csv 模块逐行解析
+            pass
+
+        rows = [r for r in reader if r]
+
+    if not rows:
+        raise ValueError("CSV is empty.")
+    return bar_arrays_from_rows(rows, header, **cols)
+
+
+def parse_csv_lines(
+    lines: List[str],
+    header: Sequence[str],
+    *,
+    datetime_format: Optional[str] = None,
+    col_datetime: str = "datetime",
+    col_open: str = "open",
+    col_high: str = "high",
+    col_low: str = "low",
+    col_close: str = "close",
+    col_volume: str = "volume",
+) -> BarArrays:
+    """Parse a block of raw csv lines (no header) into a BarArrays."""
+    cols = dict(
+        col_datetime=col_datetime,
+        col_open=col_open,
+        col_high=col_high,
+        col_low=col_low,
+        col_close=col_close,
+        col_volume=col_volume,
+    )
+    if len(lines) >= _NUMPY_MIN_ROWS:
+        try:
+            return _load_with_numpy(lines, header, skiprows=0, datetime_format=datetime_format, **cols)
+        except ValueError:
+            pass
+    rows = [r for r in csv.reader(lines) if r]
+    return bar_arrays_from_rows(rows, header, datetime_format=datetime_format, **cols)
+
+
+def _load_with_numpy(
+    source: Path | List[str],
+    header: Sequence[str],
+    *,
+    skiprows: int,
+    col_datetime: str,
+    col_open: str,
+    col_high: str,
+    col_low: str,
+    col_close: str,
+    col_volume: str,
+    datetime_format: Optional[str] = None,
+) -> BarArrays:
+    """Fast path: np.loadtxt parses the numeric columns in C. Raises ValueError on anything irregular."""
+    index = {name: i for i, name in enumerate(header)}
+    for col in (col_datetime, col_open, col_high, col_low, col_close):
+        if col not in index:
+            raise KeyError(col)
+
+    usecols = [index[c] for c in (col_open, col_high, col_low, col_close)]
+    if col_volume in index:
+        usecols.append(index[col_volume])
+
+    opts = dict(delimiter=",", skiprows=skiprows, comments=None, encoding="utf-8")
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")  # "input contained no data" -> ValueError path
+        try:
+            numeric = np.loadtxt(source, usecols=usecols, dtype=np.float64, ndmin=2, **opts)
+            stamps = np.loadtxt(source, usecols=index[col_datetime], dtype=str, ndmin=1, **opts)
+        except UserWarning as e:
+            raise ValueError(str(e)) from None
+
+    n = int(numeric.shape[0])
+    volume = np.ascontiguousarray(numeric[:, 4]) if numeric.shape[1] == 5 else np.zeros(n, dtype=np.float64)
+    return BarArrays(
+        timestamp_ms=parse_datetimes_to_ms(stamps, datetime_format),
+        open=np.ascontiguousarray(numeric[:, 0]),
+        high=np.ascontiguousarray(numeric[:, 1]),
+        low=np.ascontiguousarray(numeric[:, 2]),
+        close=np.ascontiguousarray(numeric[:, 3]),
+        volume=volume,
+    )
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from src.data.bars import BarArrays, load_bar_arrays
+from src.utils.logging import get_logger
+
+# bump when the on-disk layout or the parser semantics change
+CACHE_VERSION = 1
+COLUMNS = ("timestamp_ms", "open", "high", "low", "close", "volume")
+
+
+def file_digest(path: str | Path, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+@dataclass(frozen=True)
+class SourceFingerprint:
+    size: int
+    mtime_ns: int
+    digest: str
+
+    @classmethod
+    def of(cls, path: str | Path) -> "SourceFingerprint":
+        st = os.stat(path)
+        return cls(size=st.st_size, mtime_ns=st.st_mtime_ns, digest=file_digest(path))
+
+
+@dataclass
+class BarCache:
+    """
+    Binary columnar cache for parsed csv bars.
+    - layout: <cache_dir>/<file name>-<key>/{timestamp_ms,open,high,low,close,volume}.npy + meta.json
+    - hits are memory-mapped read-only (np.load(mmap_mode="r")), no text parsing
+    - an entry is stale when the source size changes, or its mtime changes and the content
+      hash no longer matches; verify_hash=True re-hashes on every load
+    """
+    cache_dir: str = ".cache/bars"
+    verify_hash: bool = False
+
+    def __post_init__(self) -> None:
+        self._log = get_logger("data.cache")
+
+    def entry_dir(self, csv_path: str, **cols: str) -> Path:
+        src = str(Path(csv_path).resolve())
+        key_src = json.dumps({"v": CACHE_VERSION, "src": src, "cols": cols}, sort_keys=True)
+        key = hashlib.sha1(key_src.encode("utf-8")).hexdigest()[:16]
+        return Path(self.cache_dir) / f"{Path(csv_path).name}-{key}"
+
+    def load(self, csv_path: str, **cols: str) -> BarArrays:
+        path = Path(csv_path)
+        if not path.exists():
+            raise FileNotFoundError(f"CSV file not found: {csv_path}")
+
+        entry = self.entry_dir(csv_path, **cols)
+        meta = self._read_meta(entry)
+        if meta is not None and self._is_fresh(entry, meta, path):
+            self._log.info("BAR_CACHE_HIT path=%s rows=%s", csv_path, meta.get("rows"))
+            return self._map(entry)
+
+        self._log.info("BAR_CACHE_MISS path=%s", csv_path)
+        fp = SourceFingerprint.of(path)
+        bars = load_bar_arrays(csv_path, **cols)
+        self._write(entry, str(path.resolve()), bars, fp, cols)
+        return bars
+
+    def _read_meta(self, entry: Path) -> Optional[Dict[str, Any]]:
+        try:
+            with open(entry / "meta.json", "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if meta.get("version") != CACHE_VERSION:
+            return None
+        return meta
+
+    def _is_fresh(self, entry: Path, meta: Dict[str, Any], path: Path) -> bool:
+        st = os.stat(path)
+        if st.st_size != meta.get("size"):
+            return False
+        if st.st_mtime_ns == meta.get("mtime_ns") and not self.verify_hash:
+            return True
+        if file_digest(path) != meta.get("digest"):
+            return False
+        if st.st_mtime_ns != meta.get("mtime_ns"):
+            # touched but unchanged: remember the new mtime so the next load skips hashing
+            meta["mtime_ns"] = st.st_mtime_ns
+            self._write_meta(entry, meta)
+        return True
+
+    def _map(self, entry: Path) -> BarArrays:
+        arrays = {c: np.load(entry / f"{c}.npy", mmap_mode="r") for c in COLUMNS}
+        return BarArrays(**arrays)
+
+    @staticmethod
+    def _write_meta(directory: Path, meta: Dict[str, Any]) -> None:
+        tmp = directory / f"meta.json.tmp-{os.getpid()}"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f, sort_keys=True)
+        os.replace(tmp, directory / "meta.json")
+
+    def _write(
+        self, entry: Path, source: str, bars: BarArrays, fp: SourceFingerprint, cols: Dict[str, str]
+    ) -> None:
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        tmp = entry.with_name(f"{entry.name}.tmp-{os.getpid()}")
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir()
+
+        for c in COLUMNS:
+            np.save(tmp / f"{c}.npy", np.ascontiguousarray(getattr(bars, c)))
+        # meta.json last: an entry without it is never considered valid
+        self._write_meta(tmp, {
+            "version": CACHE_VERSION,
+            "source": source,
+            "size": fp.size,
+            "mtime_ns": fp.mtime_ns,
+            "digest": fp.digest,
+            "rows": len(bars),
+            "columns": cols,
+        })
+
+        # 旧条目先挪走再换上新目录；并发写入时谁先 rename 成功就用谁的
+        if entry.exists():
+            stale = entry.with_name(f"{entry.name}.stale-{os.getpid()}")
+            try:
+                os.replace(entry, stale)
+            except OSError:
+                stale = None
+            if stale is not None:
+                shutil.rmtree(stale, ignore_errors=True)
+        try:
+            os.replace(tmp, entry)
+        except OSError:
+            shutil.rmtree(tmp, ignore_errors=True)
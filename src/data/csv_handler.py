@@ -6,7 +6,10 @@ from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional, Iterable
 
-from src.core.events import EventType, MarketEvent
+from src.core.events import BarBatch, EventType, MarketEvent
+from src.data.bars import BarArrays, load_bar_arrays, open_text
+from src.data.cache import BarCache
+from src.data.ring_buffer import BarRingBuffer, BarWindow
 
 
 def _parse_datetime_to_ms(s: str) -> int:
@@ -39,29 +42,92 @@ class CSVHandler:
     col_close: str = "close"
     col_volume: str = "volume"
 
+    # columnar=True: parse every column once into typed arrays, build MarketEvent lazily
+    columnar: bool = False
+    # get_latest_bars history size; None keeps the whole file (legacy behavior)
+    lookback: Optional[int] = None
+    # binary columnar cache directory (implies columnar); hits are memory-mapped
+    cache_dir: Optional[str] = None
+
     def __post_init__(self) -> None:
         path = Path(self.csv_path)
         if not path.exists():
             raise FileNotFoundError(f"CSV file not found: {self.csv_path}")
-        
+
         self._rows: List[dict] = []
-        with path.open("r", newline="", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            if reader.fieldnames is None:
-                raise ValueError("CSV file has no header row.")
-            self._rows = list(reader)
-
-        if not self._rows:
-            raise ValueError("CSV is empty.")
-        
+        self._bars: Optional[BarArrays] = None
+        if self.columnar or self.cache_dir is not None:
+            cols = dict(
+                col_datetime=self.col_datetime,
+                col_open=self.col_open,
+                col_high=self.col_high,
+                col_low=self.col_low,
+                col_close=self.col_close,
+                col_volume=self.col_volume,
+            )
+            if self.cache_dir is not None:
+                self._bars = BarCache(cache_dir=self.cache_dir).load(self.csv_path, **cols)
+            else:
+                self._bars = load_bar_arrays(self.csv_path, **cols)
+            self._n = len(self._bars)
+            if self._n == 0:
+                raise ValueError("CSV is empty.")
+        else:
+            with open_text(path) as f:
+                reader = csv.DictReader(f)
+                if reader.fieldnames is None:
+                    raise ValueError("CSV file has no header row.")
+                self._rows = list(reader)
+
+            if not self._rows:
+                raise ValueError("CSV is empty.")
+            self._n = len(self._rows)
+
         self._i = 0
-        self._latest_bars: Dict[str, List[MarketEvent]] = {self.symbol: []}
+        if self.lookback is None:
+            history = BarRingBuffer(capacity=self._n, slack=1)
+        else:
+            history = BarRingBuffer(capacity=self.lookback)
+        self._latest_bars: Dict[str, BarRingBuffer] = {self.symbol: history}
+
+    def __getstate__(self) -> dict:
+        # checkpoint 只存游标：数据从 csv / 缓存重新加载，历史窗口按游标重建
+        state = self.__dict__.copy()
+        for key in ("_rows", "_bars", "_latest_bars"):
+            del state[key]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        i, n = state.pop("_i"), state.pop("_n")
+        self.__dict__.update(state)
+        self.__post_init__()
+        if self._n != n:
+            raise ValueError(f"{self.csv_path} has {self._n} rows, checkpoint was taken with {n}")
+        history = self._latest_bars[self.symbol]
+        start = max(i - history.capacity, 0)
+        if self._bars is not None:
+            history.extend(self._bars.slice(start, i), self.symbol)
+        else:
+            self._i = start
+            for _ in range(i - start):
+                self.stream_next()
+        self._i = i
+
+    @property
+    def bars(self) -> Optional[BarArrays]:
+        """Parsed columns (columnar mode only)."""
+        return self._bars
 
-    
     def has_next(self) -> bool:
-        return self._i < len(self._rows)
-    
+        return self._i < self._n
+
     def stream_next(self) -> MarketEvent:
+        if self._bars is not None:
+            event = self._bars.event_at(self._i, self.symbol)
+            self._i += 1
+            self._latest_bars[self.symbol].append(event)
+            return event
+
         row = self._rows[self._i]
         self._i += 1
 
@@ -80,14 +146,37 @@ class CSVHandler:
         )
         self._latest_bars[self.symbol].append(event)
         return event
-    
+
+    def stream_batch(self, max_bars: int) -> BarBatch:
+        """
+        Next block of up to max_bars bars. Columnar mode returns zero-copy views;
+        row mode parses the rows one by one and packs them into arrays.
+        """
+        stop = min(self._i + max(int(max_bars), 1), self._n)
+        if self._bars is not None:
+            bars = self._bars.slice(self._i, stop)
+            self._i = stop
+            self._latest_bars[self.symbol].extend(bars, self.symbol)
+        else:
+            bars = BarArrays.from_events([self.stream_next() for _ in range(stop - self._i)])
+        return BarBatch(
+            type=EventType.BAR_BATCH, timestamp_ms=bars.timestamp_ms.item(len(bars) - 1),
+            symbol=self.symbol, bars=bars,
+        )
+
     def get_latest_bars(self, symbol: str, n: int = 1) -> List[MarketEvent]:
-        bars = self._latest_bars.get(symbol, [])
-        if n <= 0:
+        bars = self._latest_bars.get(symbol)
+        if bars is None or n <= 0:
             return []
-        return bars[-n:]
-    
+        return bars.latest_events(n)
+
+    def get_latest_window(self, symbol: str, n: int) -> Optional[BarWindow]:
+        """Zero-copy array views of the latest n bars (valid until the next stream_next)."""
+        bars = self._latest_bars.get(symbol)
+        return bars.window(n) if bars is not None else None
+
     def get_latest_close(self, symbol: str) -> Optional[float]:
-        bars = self._latest_bars.get(symbol, [])
-        return bars[-1].close if bars else None
+        bars = self._latest_bars.get(symbol)
+        return bars.last_close() if bars is not None else None
+
     
\ No newline at end of file
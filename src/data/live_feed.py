@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+import time
+from dataclasses import dataclass, field
+from typing import Callable, List, Mapping, Optional, Tuple
+
+from src.core.events import EventType, MarketEvent
+from src.data.bars import BarArrays
+from src.utils.latency import LatencyHistogram
+from src.utils.logging import get_logger
+
+# 线路协议：每行一个 JSON 对象
+#   bar: {"t": "bar", "s": symbol, "ts": ms, "o", "h", "l", "c", "v", "sent_ns": wall-clock ns}
+#   heartbeat: {"t": "hb", "ts": ms};  end of stream: {"t": "eof"}
+# client -> server, once per connection: {"op": "subscribe", "symbols": [...]}
+
+Sink = Callable[[MarketEvent, int], None]
+
+
+def encode_bar(symbol: str, ts: int, o: float, h: float, l: float, c: float, v: float) -> bytes:
+    return (json.dumps({"t": "bar", "s": symbol, "ts": ts, "o": o, "h": h, "l": l, "c": c, "v": v,
+                        "sent_ns": time.time_ns()}, separators=(",", ":")) + "\n").encode()
+
+
+@dataclass
+class TcpFeedConfig:
+    """
+    - heartbeat_timeout_s: no message (bar or heartbeat) for this long => drop the connection, reconnect
+    - reconnect backoff doubles from backoff_initial_s up to backoff_max_s; max_retries=None retries forever
+    """
+    host: str = "127.0.0.1"
+    port: int = 9000
+    symbols: Tuple[str, ...] = ()
+    heartbeat_timeout_s: float = 5.0
+    connect_timeout_s: float = 5.0
+    backoff_initial_s: float = 0.1
+    backoff_max_s: float = 5.0
+    max_retries: Optional[int] = None
+
+
+@dataclass
+class TcpFeed:
+    """
+    Push-based market data client over newline-delimited JSON/TCP.
+    run(sink) calls sink(event, recv_ns) for every bar, where recv_ns is perf_counter_ns() at parse time.
+    It returns when the server sends eof and raises ConnectionError once max_retries is exhausted.
+    """
+    config: TcpFeedConfig = field(default_factory=TcpFeedConfig)
+
+    def __post_init__(self) -> None:
+        self._log = get_logger("data.live_feed")
+        self.connects = 0
+        self.reconnects = 0
+        self.heartbeats = 0
+        self.messages = 0
+        self.malformed = 0
+        # server send -> client parse, wall clock; only meaningful when both ends share a host clock
+        self.wire = LatencyHistogram()
+
+    async def run(self, sink: Sink) -> None:
+        cfg = self.config
+        failures = 0
+        while True:
+            try:
+                reader, writer = await asyncio.wait_for(
+                    asyncio.open_connection(cfg.host, cfg.port), timeout=cfg.connect_timeout_s,
+                )
+            except (OSError, asyncio.TimeoutError) as e:
+                failures += 1
+                if cfg.max_retries is not None and failures > cfg.max_retries:
+                    raise ConnectionError(f"feed {cfg.host}:{cfg.port} unreachable after {failures} attempts") from e
+                delay = min(cfg.backoff_initial_s * 2 ** (failures - 1), cfg.backoff_max_s)
+                self._log.warning("LIVE_CONNECT_FAILED attempt=%s retry_in_s=%.2f err=%s", failures, delay, e)
+                await asyncio.sleep(delay)
+                continue
+
+            failures = 0
+            self.connects += 1
+            if self.connects > 1:
+                self.reconnects += 1
+            self._log.info("LIVE_CONNECTED host=%s port=%s connects=%s", cfg.host, cfg.port, self.connects)
+            try:
+                writer.write((json.dumps({"op": "subscribe", "symbols": list(cfg.symbols)}) + "\n").encode())
+                await writer.drain()
+                finished = await self._read(reader, sink)
+            except (ConnectionError, OSError) as e:
+                self._log.warning("LIVE_CONNECTION_ERROR err=%s", e)
+                finished = False
+            finally:
+                writer.close()
+                with contextlib.suppress(Exception):
+                    await writer.wait_closed()
+            if finished:
+                self._log.info("LIVE_FEED_EOF messages=%s", self.messages)
+                return
+            self._log.warning("LIVE_DISCONNECTED reconnect_in_s=%.2f", cfg.backoff_initial_s)
+            await asyncio.sleep(cfg.backoff_initial_s)
+
+    async def _read(self, reader: asyncio.StreamReader, sink: Sink) -> bool:
+        """Read until eof (True) or a dead connection (False)."""
+        timeout = self.config.heartbeat_timeout_s
+        perf_ns = time.perf_counter_ns
+        wall_ns = time.time_ns
+        loads = json.loads
+        record_wire = self.wire.record
+        while True:
+            try:
+                line = await asyncio.wait_for(reader.readline(), timeout=timeout)
+            except asyncio.TimeoutError:
+                self._log.warning("LIVE_HEARTBEAT_TIMEOUT timeout_s=%.2f", timeout)
+                return False
+            if not line:
+                return False
+            try:
+                msg = loads(line)
+                kind = msg["t"]
+                if kind == "bar":
+                    event = MarketEvent(
+                        type=EventType.MARKET, timestamp_ms=int(msg["ts"]), symbol=msg["s"],
+                        open=float(msg["o"]), high=float(msg["h"]), low=float(msg["l"]),
+                        close=float(msg["c"]), volume=float(msg["v"]),
+                    )
+                    recv = perf_ns()
+                    sent = msg.get("sent_ns")
+                    if sent:
+                        record_wire(wall_ns() - sent)
+                    self.messages += 1
+                    sink(event, recv)
+                elif kind == "hb":
+                    self.heartbeats += 1
+                elif kind == "eof":
+                    return True
+            except (ValueError, KeyError, TypeError):
+                self.malformed += 1
+                self._log.warning("LIVE_MALFORMED line=%r", line[:200])
+
+
+@dataclass
+class SyntheticFeedServer:
+    """
+    Local stand-in for a market data gateway: streams `bars` (merged by timestamp) to each client.
+    - rate: messages per second (0 = as fast as the socket takes them)
+    - heartbeats every heartbeat_interval_s while streaming
+    - one injected fault on the first connection after fault_after messages: "close" drops the socket,
+      "stall" goes silent (no bars, no heartbeats) so the client's heartbeat watchdog fires
+    The stream position is shared across connections, so a reconnecting client resumes where it left off.
+    """
+    bars: Mapping[str, BarArrays]
+    host: str = "127.0.0.1"
+    port: int = 0
+    rate: float = 0.0
+    heartbeat_interval_s: float = 1.0
+    fault_after: Optional[int] = None
+    fault: str = "close"
+
+    def __post_init__(self) -> None:
+        if self.fault not in ("close", "stall"):
+            raise ValueError(f"unknown fault: {self.fault!r}")
+        self._log = get_logger("data.feed_server")
+        self._rows = self._merge()
+        self._cursor = 0
+        self._faulted = False
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._closing: Optional[asyncio.Event] = None
+
+    def _merge(self) -> List[Tuple[str, int]]:
+        keys: List[Tuple[int, int, str, int]] = []
+        for k, (symbol, bars) in enumerate(self.bars.items()):
+            ts = bars.timestamp_ms.tolist()
+            keys.extend((t, k, symbol, i) for i, t in enumerate(ts))
+        keys.sort()
+        return [(symbol, i) for _, _, symbol, i in keys]
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    async def start(self) -> "SyntheticFeedServer":
+        self._closing = asyncio.Event()
+        self._server = await asyncio.start_server(self._serve, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._log.info("FEED_SERVER_START port=%s messages=%s", self.port, len(self._rows))
+        return self
+
+    async def close(self) -> None:
+        if self._closing is not None:
+            self._closing.set()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self) -> "SyntheticFeedServer":
+        return await self.start()
+
+    async def __aexit__(self, *exc: object) -> None:
+        await self.close()
+
+    def _line(self, row: int) -> bytes:
+        symbol, i = self._rows[row]
+        b = self.bars[symbol]
+        return encode_bar(symbol, b.timestamp_ms.item(i), b.open.item(i), b.high.item(i), b.low.item(i),
+                          b.close.item(i), b.volume.item(i))
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            await reader.readline()  # subscribe; every client gets the whole stream
+            fault_at = None
+            if self.fault_after is not None and not self._faulted:
+                self._faulted = True
+                fault_at = self._cursor + self.fault_after
+
+            clock = time.perf_counter
+            t0 = last_hb = clock()
+            sent = 0
+            while self._cursor < len(self._rows):
+                if fault_at is not None and self._cursor >= fault_at:
+                    self._log.info("FEED_SERVER_FAULT kind=%s at=%s", self.fault, self._cursor)
+                    if self.fault == "stall" and self._closing is not None:
+                        await self._closing.wait()
+                    return
+                writer.write(self._line(self._cursor))
+                self._cursor += 1
+                sent += 1
+                now = clock()
+                if now - last_hb >= self.heartbeat_interval_s:
+                    writer.write(b'{"t":"hb","ts":%d}\n' % int(time.time() * 1000))
+                    last_hb = now
+                if self.rate > 0:
+                    ahead = sent / self.rate - (now - t0)
+                    if ahead > 0.001:
+                        await writer.drain()
+                        await asyncio.sleep(ahead)
+                elif sent % 256 == 0:
+                    await writer.drain()
+            writer.write(b'{"t":"eof"}\n')
+            await writer.drain()
+        except (ConnectionError, OSError):
+            self._log.info("FEED_SERVER_CLIENT_GONE at=%s", self._cursor)
+        finally:
+            writer.close()
+            with contextlib.suppress(Exception):
+                await writer.wait_closed()
+
@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import heapq
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Tuple
+
+from src.core.events import MarketEvent
+from src.data.bars import is_compressed
+from src.data.ring_buffer import BarWindow
+from src.data.streaming_csv import StreamingCSVHandler
+from src.utils.logging import get_logger
+
+_CSV_SUFFIXES = (".csv", ".csv.gz", ".csv.bz2", ".csv.xz")
+# 留给日志、结果文件等其它句柄的余量
+_FD_RESERVE = 64
+
+
+def _fd_soft_limit() -> Optional[int]:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    soft, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+    return None if soft == resource.RLIM_INFINITY else int(soft)
+
+
+@dataclass
+class MultiSymbolHandler:
+    """
+    N per-symbol csv sources merged into one stream ordered by timestamp_ms.
+    - heap-based k-way merge: the frontier holds one (timestamp_ms, source) entry per symbol
+    - each source is a StreamingCSVHandler, so per-symbol memory is chunk_rows + lookback
+    - sources are opened on first use; at most `max_open_files` keep a file handle, the least
+      recently used plain csv is suspended and reopened (seek to its offset) for its next chunk
+    - .gz/.bz2/.xz sources can only resume by re-decompressing from the start, so they stay open
+      for the whole run: `max_open_files` is raised to fit them (plus one plain slot), and more
+      compressed sources than the process fd limit allows is refused
+    Bars with equal timestamps are emitted in `sources` order.
+    """
+    sources: Mapping[str, str]
+    chunk_rows: int = 512
+    lookback: int = 256
+    max_open_files: int = 256
+
+    def __post_init__(self) -> None:
+        if not self.sources:
+            raise ValueError("sources is empty.")
+        if self.max_open_files <= 0:
+            raise ValueError("max_open_files must be > 0")
+
+        self._symbols: Tuple[str, ...] = tuple(self.sources)
+        self._index: Dict[str, int] = {s: i for i, s in enumerate(self._symbols)}
+        self._readers: List[Optional[StreamingCSVHandler]] = [None] * len(self._symbols)
+        self._heap: List[Tuple[int, int]] = []
+        self._open: "OrderedDict[int, None]" = OrderedDict()  # open plain readers, LRU first
+        self._primed = False
+
+        n_compressed = sum(1 for path in self.sources.values() if is_compressed(path))
+        if n_compressed >= self.max_open_files:
+            limit = _fd_soft_limit()
+            if limit is not None and n_compressed + _FD_RESERVE > limit:
+                raise ValueError(
+                    f"{n_compressed} compressed sources need a file handle each for the whole run, "
+                    f"over the fd limit {limit}; decompress them or raise `ulimit -n`"
+                )
+            get_logger("data.multi_symbol").warning(
+                "MULTI_CSV_MAX_OPEN_RAISED compressed=%s max_open_files=%s -> %s",
+                n_compressed, self.max_open_files, n_compressed + 1,
+            )
+        # 压缩源常驻打开，剩下的名额给可 seek 的 plain csv 轮换
+        self._plain_slots = max(self.max_open_files - n_compressed, 1)
+
+    @classmethod
+    def from_directory(cls, directory: str, **kwargs) -> "MultiSymbolHandler":
+        """One source per `<SYMBOL>.csv[.gz|.bz2|.xz]` file in `directory`, sorted by symbol."""
+        sources: Dict[str, str] = {}
+        for p in sorted(Path(directory).iterdir()):
+            name = p.name
+            for suffix in _CSV_SUFFIXES:
+                if name.endswith(suffix):
+                    sources[name[: -len(suffix)]] = str(p)
+                    break
+        return cls(sources=sources, **kwargs)
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state["_open"] = OrderedDict()  # readers come back suspended
+        return state
+
+    @property
+    def symbols(self) -> Tuple[str, ...]:
+        return self._symbols
+
+    @property
+    def reopens(self) -> int:
+        """Files reopened after being suspended, summed over the sources."""
+        return sum(r.reopens for r in self._readers if r is not None)
+
+    def _track(self, i: int, reader: StreamingCSVHandler) -> None:
+        """Keep the plain-csv handle set bounded: the least recently used reader gets suspended first."""
+        if not reader.is_open:
+            self._open.pop(i, None)
+            return
+        if reader.compressed:
+            return
+        if i in self._open:
+            self._open.move_to_end(i)
+            return
+        self._open[i] = None
+        while len(self._open) > self._plain_slots:
+            j, _ = self._open.popitem(last=False)
+            self._readers[j].suspend()  # type: ignore[union-attr]
+
+    def _prime(self) -> None:
+        self._primed = True
+        for i, symbol in enumerate(self._symbols):
+            reader = StreamingCSVHandler(
+                csv_path=self.sources[symbol],
+                symbol=symbol,
+                chunk_rows=self.chunk_rows,
+                history=self.lookback,
+            )
+            self._readers[i] = reader
+            ts = reader.peek_timestamp_ms()
+            self._track(i, reader)
+            if ts is not None:
+                self._heap.append((ts, i))
+        heapq.heapify(self._heap)
+
+    def has_next(self) -> bool:
+        if not self._primed:
+            self._prime()
+        return bool(self._heap)
+
+    def stream_next(self) -> MarketEvent:
+        if not self.has_next():
+            raise StopIteration("no more bars")
+
+        ts, i = self._heap[0]
+        reader = self._readers[i]
+        event = reader.stream_next()  # type: ignore[union-attr]
+        nxt = reader.peek_timestamp_ms()  # type: ignore[union-attr]
+        if nxt is None:
+            heapq.heappop(self._heap)
+        else:
+            if nxt < ts:
+                raise ValueError(
+                    f"Bars out of order in {self.sources[self._symbols[i]]}: {nxt} after {ts}"
+                )
+            heapq.heapreplace(self._heap, (nxt, i))
+        self._track(i, reader)  # type: ignore[arg-type]
+        return event
+
+    def _reader(self, symbol: str) -> Optional[StreamingCSVHandler]:
+        i = self._index.get(symbol)
+        return self._readers[i] if i is not None else None
+
+    def get_latest_bars(self, symbol: str, n: int = 1) -> List[MarketEvent]:
+        reader = self._reader(symbol)
+        return reader.get_latest_bars(symbol, n) if reader is not None else []
+
+    def get_latest_window(self, symbol: str, n: int) -> Optional[BarWindow]:
+        reader = self._reader(symbol)
+        return reader.get_latest_window(symbol, n) if reader is not None else None
+
+    def get_latest_close(self, symbol: str) -> Optional[float]:
+        reader = self._reader(symbol)
+        return reader.get_latest_close(symbol) if reader is not None else None
+
+    def close(self) -> None:
+        for reader in self._readers:
+            if reader is not None:
+                reader.close()
+        self._open.clear()
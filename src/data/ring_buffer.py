@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, List, NamedTuple, Optional
+
+import numpy as np
+
+from src.core.events import EventType, MarketEvent
+
+if TYPE_CHECKING:
+    from src.data.bars import BarArrays
+
+
+class BarWindow(NamedTuple):
+    """Read-only views over the latest n bars, oldest first."""
+    timestamp_ms: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+
+class BarRingBuffer:
+    """
+    Fixed-capacity bar history for one symbol.
+
+    Storage is `capacity + slack` slots per column. Writes go to `head`; when the
+    buffer end is reached the last `capacity - 1` bars are moved to the front
+    (one memmove every `slack` appends, amortized O(1)). The latest n bars are
+    therefore always contiguous and `window(n)` can return zero-copy views.
+
+    Views returned by `window()` are only valid until the next `append()`.
+    Bars added column-wise with `extend()` have no MarketEvent yet; one is built
+    on first access through `latest_events()`/`last()`.
+    """
+
+    __slots__ = ("capacity", "_size", "_head", "_count", "_cols", "_events", "_symbol")
+
+    def __init__(self, capacity: int, slack: Optional[int] = None) -> None:
+        if capacity <= 0:
+            raise ValueError("capacity must be > 0")
+        self.capacity = int(capacity)
+        self._size = self.capacity + max(int(slack if slack is not None else capacity), 1)
+        self._head = 0
+        self._count = 0
+        self._cols = (
+            np.empty(self._size, dtype=np.int64),
+            np.empty(self._size, dtype=np.float64),
+            np.empty(self._size, dtype=np.float64),
+            np.empty(self._size, dtype=np.float64),
+            np.empty(self._size, dtype=np.float64),
+            np.empty(self._size, dtype=np.float64),
+        )
+        self._events: List[Optional[MarketEvent]] = [None] * self._size
+        self._symbol = ""
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getstate__(self) -> tuple:
+        # checkpoint 只存活动窗口的列；MarketEvent 在加载后按需重建
+        start = self._head - self._count
+        cols = tuple(col[start:self._head].copy() for col in self._cols)
+        return self.capacity, self._size - self.capacity, self._symbol, cols
+
+    def __setstate__(self, state: tuple) -> None:
+        capacity, slack, symbol, cols = state
+        self.__init__(capacity, slack)  # type: ignore[misc]
+        self._symbol = symbol
+        n = len(cols[0])
+        for col, src in zip(self._cols, cols):
+            col[:n] = src
+        self._head = self._count = n
+
+    def _compact(self, keep: Optional[int] = None) -> None:
+        keep = self.capacity - 1 if keep is None else keep
+        src = self._head - keep
+        if keep > 0:
+            for col in self._cols:
+                col[:keep] = col[src:self._head]
+            self._events[:keep] = self._events[src:self._head]
+        # drop references beyond the live window so old events can be freed
+        self._events[keep:] = [None] * (self._size - keep)
+        self._head = keep
+
+    def append(self, event: MarketEvent) -> None:
+        if self._head == self._size:
+            self._compact()
+        i = self._head
+        ts, o, h, l, c, v = self._cols
+        ts[i] = event.timestamp_ms
+        o[i] = event.open
+        h[i] = event.high
+        l[i] = event.low
+        c[i] = event.close
+        v[i] = event.volume
+        self._events[i] = event
+        self._head = i + 1
+        if self._count < self.capacity:
+            self._count += 1
+
+    def extend(self, bars: BarArrays, symbol: str) -> None:
+        """Append a block of bars column-wise (no per-bar MarketEvent)."""
+        m = len(bars)
+        if m == 0:
+            return
+        self._symbol = symbol
+        if m >= self.capacity:
+            # 只有最后 capacity 根会留下
+            bars = bars.slice(m - self.capacity, m)
+            m = self.capacity
+            self._head = 0
+            self._count = 0
+            self._events[:] = [None] * self._size
+        elif self._head + m > self._size:
+            self._compact(keep=min(self._count, self.capacity - m))
+
+        i = self._head
+        sources = (bars.timestamp_ms, bars.open, bars.high, bars.low, bars.close, bars.volume)
+        for col, src in zip(self._cols, sources):
+            col[i:i + m] = src
+        self._events[i:i + m] = [None] * m
+        self._head = i + m
+        self._count = min(self._count + m, self.capacity)
+
+    def _event(self, i: int) -> MarketEvent:
+        event = self._events[i]
+        if event is None:
+            ts, o, h, l, c, v = self._cols
+            event = self._events[i] = MarketEvent(
+                type=EventType.MARKET,
+                timestamp_ms=ts.item(i),
+                symbol=self._symbol,
+                open=o.item(i),
+                high=h.item(i),
+                low=l.item(i),
+                close=c.item(i),
+                volume=v.item(i),
+            )
+        return event
+
+    def window(self, n: int) -> BarWindow:
+        n = min(max(int(n), 0), self._count)
+        start = self._head - n
+        views = []
+        for col in self._cols:
+            view = col[start:self._head]
+            view.flags.writeable = False
+            views.append(view)
+        return BarWindow(*views)
+
+    def latest_events(self, n: int) -> List[MarketEvent]:
+        n = min(max(int(n), 0), self._count)
+        if n == 0:
+            return []
+        start = self._head - n
+        events = self._events[start:self._head]
+        if None in events:
+            events = [self._event(i) for i in range(start, self._head)]
+        return events  # type: ignore[return-value]
+
+    def last(self) -> Optional[MarketEvent]:
+        if self._count == 0:
+            return None
+        return self._event(self._head - 1)
+
+    def last_close(self) -> Optional[float]:
+        if self._count == 0:
+            return None
+        return self._cols[4].item(self._head - 1)
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Tuple
+
+import numpy as np
+
+from src.data.bars import BarArrays
+
+_COLUMNS = ("timestamp_ms", "open", "high", "low", "close", "volume")
+_DTYPES = (np.int64, np.float64, np.float64, np.float64, np.float64, np.float64)
+_ITEMSIZE = 8
+
+
+@dataclass(frozen=True)
+class SharedBarsSpec:
+    """Picklable handle: enough for another process to attach."""
+    name: str
+    rows: int
+
+
+def _views(buf: memoryview, rows: int, readonly: bool) -> BarArrays:
+    cols = {}
+    for k, (col, dtype) in enumerate(zip(_COLUMNS, _DTYPES)):
+        arr = np.ndarray((rows,), dtype=dtype, buffer=buf, offset=k * rows * _ITEMSIZE)
+        if readonly:
+            arr.flags.writeable = False
+        cols[col] = arr
+    return BarArrays(**cols)
+
+
+class SharedBars:
+    """
+    BarArrays copied once into a multiprocessing.shared_memory block (6 contiguous columns).
+    The creating process owns the block and must unlink() it; workers attach() by spec, zero copy.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, rows: int, owner: bool) -> None:
+        self._shm = shm
+        self.rows = rows
+        self._owner = owner
+        self.bars = _views(shm.buf, rows, readonly=not owner)
+
+    @classmethod
+    def create(cls, bars: BarArrays) -> "SharedBars":
+        rows = len(bars)
+        shm = shared_memory.SharedMemory(create=True, size=max(rows * _ITEMSIZE * len(_COLUMNS), 1))
+        out = cls(shm, rows, owner=True)
+        for col in _COLUMNS:
+            getattr(out.bars, col)[:] = getattr(bars, col)
+        return out
+
+    @classmethod
+    def attach(cls, spec: SharedBarsSpec) -> "SharedBars":
+        return cls(shared_memory.SharedMemory(name=spec.name), spec.rows, owner=False)
+
+    @property
+    def spec(self) -> SharedBarsSpec:
+        return SharedBarsSpec(name=self._shm.name, rows=self.rows)
+
+    def close(self) -> None:
+        # numpy views keep the buffer exported; drop them before closing the mapping
+        self.bars = None  # type: ignore[assignment]
+        self._shm.close()
+
+    def unlink(self) -> None:
+        if self._owner:
+            self._shm.unlink()
+
+    def __enter__(self) -> "SharedBars":
+        return self
+
+    def __exit__(self, *exc: Tuple[object, ...]) -> None:
+        self.close()
+        self.unlink()
@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import csv
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, TextIO
+
+from src.core.events import MarketEvent
+from src.data.bars import BarArrays, detect_datetime_format, is_compressed, open_text, parse_csv_lines
+from src.data.ring_buffer import BarRingBuffer, BarWindow
+
+
+@dataclass
+class StreamingCSVHandler:
+    """
+    Bounded-memory CSV reader:
+    - reads `chunk_rows` lines at a time and parses them into typed columns
+    - .gz/.bz2/.xz are decompressed on the fly
+    - only the last `history` bars are kept for get_latest_bars
+    Peak memory depends on chunk_rows/history, not on file length.
+    """
+    csv_path: str
+    symbol: str
+
+    col_datetime: str = "datetime"
+    col_open: str = "open"
+    col_high: str = "high"
+    col_low: str = "low"
+    col_close: str = "close"
+    col_volume: str = "volume"
+
+    chunk_rows: int = 65_536
+    history: int = 1_000
+
+    def __post_init__(self) -> None:
+        if self.chunk_rows <= 0:
+            raise ValueError("chunk_rows must be > 0")
+        path = Path(self.csv_path)
+        if not path.exists():
+            raise FileNotFoundError(f"CSV file not found: {self.csv_path}")
+
+        self._compressed = is_compressed(path)
+        self._file: Optional[TextIO] = open_text(path)
+        header_line = self._file.readline()
+        header = next(csv.reader([header_line]), None)
+        if not header:
+            self.close()
+            raise ValueError("CSV file has no header row.")
+        self._header: List[str] = header
+
+        self._fmt: Optional[str] = None
+        self._chunk: Optional[BarArrays] = None
+        self._j = 0
+        self._n = 0
+        self._rows_read = 0
+        self._eof = False
+        self._offset: Optional[int] = None  # file position while suspended
+        self._reopens = 0
+        self._latest_bars = BarRingBuffer(capacity=max(int(self.history), 1))
+
+        if not self._fill():
+            raise ValueError("CSV is empty.")
+
+    def _read_lines(self) -> List[str]:
+        if self._file is None:
+            # resume after suspend(): reopen and seek back to where we stopped
+            self._file = open_text(self.csv_path)
+            self._file.seek(self._offset or 0)
+            self._offset = None
+            self._reopens += 1
+
+        readline = self._file.readline
+        lines: List[str] = []
+        while len(lines) < self.chunk_rows:
+            ln = readline()
+            if not ln:
+                self._eof = True
+                break
+            if ln.strip():
+                lines.append(ln)
+        return lines
+
+    def _fill(self) -> bool:
+        """Load the next chunk; returns False at end of file."""
+        if self._eof:
+            self._chunk, self._j, self._n = None, 0, 0
+            self.close()
+            return False
+
+        lines = self._read_lines()
+        if not lines:
+            self._chunk, self._j, self._n = None, 0, 0
+            self.close()
+            return False
+
+        if self._fmt is None:
+            first = dict(zip(self._header, next(csv.reader(lines[:1]))))
+            self._fmt = detect_datetime_format(first[self.col_datetime])
+
+        self._chunk = parse_csv_lines(
+            lines,
+            self._header,
+            datetime_format=self._fmt,
+            col_datetime=self.col_datetime,
+            col_open=self.col_open,
+            col_high=self.col_high,
+            col_low=self.col_low,
+            col_close=self.col_close,
+            col_volume=self.col_volume,
+        )
+        self._j = 0
+        self._n = len(self._chunk)
+        self._rows_read += self._n
+        return True
+
+    def __getstate__(self) -> dict:
+        # 文件句柄不入 checkpoint：记下偏移，加载后像 suspend() 一样按需重新打开
+        state = self.__dict__.copy()
+        if self._file is not None:
+            state["_offset"] = self._file.tell()
+            state["_file"] = None
+        return state
+
+    @property
+    def rows_read(self) -> int:
+        return self._rows_read
+
+    @property
+    def reopens(self) -> int:
+        """Times the file was reopened after suspend() (or a checkpoint restore)."""
+        return self._reopens
+
+    @property
+    def is_open(self) -> bool:
+        return self._file is not None
+
+    @property
+    def compressed(self) -> bool:
+        return self._compressed
+
+    def suspend(self) -> None:
+        """
+        Release the file handle but keep the cursor; the next chunk read reopens the file.
+        Compressed inputs re-decompress from the start up to the offset on resume, so
+        MultiSymbolHandler never suspends them.
+        """
+        if self._file is None:
+            return
+        if self._eof:
+            self.close()
+            return
+        self._offset = self._file.tell()
+        self._file.close()
+        self._file = None
+
+    def peek_timestamp_ms(self) -> Optional[int]:
+        """Timestamp of the next bar without building the event; None at end of data."""
+        if not self.has_next():
+            return None
+        return self._chunk.timestamp_ms.item(self._j)  # type: ignore[union-attr]
+
+    def has_next(self) -> bool:
+        if self._j < self._n:
+            return True
+        return self._fill()
+
+    def stream_next(self) -> MarketEvent:
+        if self._j >= self._n and not self._fill():
+            raise StopIteration("no more bars")
+        event = self._chunk.event_at(self._j, self.symbol)  # type: ignore[union-attr]
+        self._j += 1
+        self._latest_bars.append(event)
+        return event
+
+    def get_latest_bars(self, symbol: str, n: int = 1) -> List[MarketEvent]:
+        if symbol != self.symbol or n <= 0:
+            return []
+        return self._latest_bars.latest_events(n)
+
+    def get_latest_window(self, symbol: str, n: int) -> Optional[BarWindow]:
+        """Zero-copy array views of the latest n bars (valid until the next stream_next)."""
+        if symbol != self.symbol:
+            return None
+        return self._latest_bars.window(n)
+
+    def get_latest_close(self, symbol: str) -> Optional[float]:
+        last = self._latest_bars.last() if symbol == self.symbol else None
+        return last.close if last is not None else None
+
+    def close(self) -> None:
+        self._eof = True
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __del__(self) -> None:
+        try:
+            self.close()
+        except Exception:
+            pass
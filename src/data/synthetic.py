@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict
+
+import numpy as np
+
+from src.data.bars import BarArrays
+
+
+@dataclass(frozen=True)
+class SyntheticSpec:
+    """
+    Deterministic synthetic OHLCV universe: `symbols` independent geometric random walks of `bars` bars.
+    The same (seed, symbol index) always yields the same series, whatever the number of symbols.
+    """
+    bars: int = 10_000
+    symbols: int = 1
+    seed: int = 42
+    start_ms: int = 1_704_067_200_000  # 2024-01-01 00:00:00 UTC
+    interval_ms: int = 60_000
+    start_price: float = 100.0
+    volatility: float = 0.002  # per-bar log-return std
+
+    def symbol_names(self) -> list[str]:
+        return [f"SYN{i:04d}" for i in range(self.symbols)]
+
+
+def generate_bars(spec: SyntheticSpec, index: int = 0) -> BarArrays:
+    """Series number `index` of the spec (GBM close, open = previous close, high/low around both)."""
+    rng = np.random.default_rng([spec.seed, index])
+    n = spec.bars
+    rets = rng.normal(0.0, spec.volatility, n)
+    close = np.round(spec.start_price * np.exp(np.cumsum(rets)), 4)
+    open_ = np.empty(n)
+    open_[0] = spec.start_price
+    open_[1:] = close[:-1]
+    wiggle = np.abs(rng.normal(0.0, spec.volatility, (2, n)))
+    high = np.round(np.maximum(open_, close) * (1.0 + wiggle[0]), 4)
+    low = np.round(np.minimum(open_, close) * (1.0 - wiggle[1]), 4)
+    volume = rng.integers(100, 10_000, n).astype(np.float64)
+    return BarArrays(
+        timestamp_ms=spec.start_ms + np.arange(n, dtype=np.int64) * spec.interval_ms,
+        open=open_, high=high, low=low, close=close, volume=volume,
+    )
+
+
+def generate_universe(spec: SyntheticSpec) -> Dict[str, BarArrays]:
+    return {name: generate_bars(spec, i) for i, name in enumerate(spec.symbol_names())}
+
+
+def write_csv(bars: BarArrays, path: str | Path) -> str:
+    """Write in the sample_*.csv layout (naive '%Y-%m-%d %H:%M:%S' in local time)."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # 与 CSVHandler 的 naive 本地时间解析对称
+    local = [datetime.fromtimestamp(t / 1000, tz=timezone.utc).astimezone().replace(tzinfo=None)
+             for t in bars.timestamp_ms.tolist()]
+    stamps = [d.strftime("%Y-%m-%d %H:%M:%S") for d in local]
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write("datetime,open,high,low,close,volume\n")
+        rows = zip(stamps, bars.open.tolist(), bars.high.tolist(), bars.low.tolist(),
+                   bars.close.tolist(), bars.volume.tolist())
+        f.writelines(f"{d},{o:.4f},{h:.4f},{l:.4f},{c:.4f},{v:.0f}\n" for d, o, h, l, c, v in rows)
+    return str(path)
+
+
+def write_universe(spec: SyntheticSpec, directory: str | Path) -> Dict[str, str]:
+    """One `<SYMBOL>.csv` per symbol (MultiSymbolHandler.from_directory layout)."""
+    directory = Path(directory)
+    return {
+        name: write_csv(generate_bars(spec, i), directory / f"{name}.csv")
+        for i, name in enumerate(spec.symbol_names())
+    }
@@ -1,103 +1,361 @@
 from __future__ import annotations
 
-from dataclasses import dataclass, field
+import logging
+from dataclasses import dataclass, field, fields
 from queue import SimpleQueue, Empty
-from typing import Optional
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
 
+from src.core.clock import SimulatedClock
 from src.core.events import (
-    Event, EventType,
-    MarketEvent, SignalEvent, OrderEvent, FillEvent,
+    BarBatch, CancelEvent, Event, EventType,
+    MarketEvent, SignalEvent, OrderEvent, FillEvent, OrderStatusEvent,
 )
 
+from src.utils.latency import LatencyRecorder
 from src.utils.logging import get_logger
 
 class DataHandler:
     def has_next(self) -> bool: ...
     def stream_next(self) -> MarketEvent: ...
+    # optional: def stream_batch(self, max_bars: int) -> BarBatch
 
 class Strategy:
     def on_market(self, event: MarketEvent) -> Optional[SignalEvent]: ...
+    # optional: def on_market_batch(self, batch: BarBatch) -> Sequence[Tuple[int, SignalEvent]]
+    #   (bar index within the batch, signal), ascending index
 
 class Portfolio:
+    # optional: def on_market_batch(self, batch: BarBatch, start: int, stop: int) -> None
+    # optional: def on_status(self, event: OrderStatusEvent) -> None
     def on_signal(self, event: SignalEvent) -> Optional[OrderEvent]: ...
     def on_fill(self, event: FillEvent) -> None: ...
 
 class ExecutionHandler:
-    def on_order(self, event: OrderEvent) -> Optional[FillEvent]: ...
+    # may also return a list of events (e.g. a partial fill + cancel of the remainder)
+    def on_order(self, event: OrderEvent) -> Union[Event, Sequence[Event], None]: ...
+    # optional, resting-order brokers:
+    #   def on_bar(self, event: MarketEvent) -> Sequence[Event]   (fills/statuses triggered by the bar)
+    #   def has_resting(self, symbol: str) -> bool
+    #   def on_cancel(self, event: CancelEvent) -> Optional[OrderStatusEvent]
+
+Handler = Callable[[Event], Optional[Event]]
 
 @dataclass
 class EventLoop:
+    """
+    Event bus: handlers are resolved once into a dispatch table keyed by EventType.
+    Each handler gets the event; a non-None return value is queued.
+    Core order per type: MARKET -> execution bar matching, execution price, portfolio mark, strategy;
+    SIGNAL -> portfolio; ORDER / CANCEL -> execution; FILL / STATUS -> portfolio. Extra subscribers
+    run after the core handlers (or before them with first=True).
+    Events produced by execution.on_bar() are dispatched immediately, so resting-order fills are
+    applied before the portfolio marks the bar's close.
+
+    batch_size > 0 pulls BarBatch blocks from data handlers with stream_batch() when the strategy
+    implements on_market_batch() and nobody else subscribes to MARKET; otherwise bars are streamed
+    one MarketEvent at a time. Within a batch, signals are processed at their bar index, so
+    fills and marks happen in the same order as the per-bar path.
+
+    latency=LatencyRecorder() times the core handlers and market -> fill; with None (default)
+    the dispatch table holds the bare handlers.
+
+    clock=SimulatedClock() is advanced to each bar's timestamp (a batch's last bar) before it is
+    dispatched; share it with components that stamp events, e.g. DummyExecution(clock=...).
+    """
     data: DataHandler
     strategy: Strategy
     portfolio: Portfolio
     execution: ExecutionHandler
     queue: SimpleQueue[Event] = field(default_factory=SimpleQueue)
     last_ts_ms: int = 0
+    batch_size: int = 0
+    latency: Optional[LatencyRecorder] = None
+    clock: Optional[SimulatedClock] = None
+
+    def __post_init__(self) -> None:
+        self._log = get_logger(self.__class__.__name__)
+        self._before: Dict[EventType, List[Handler]] = {}
+        self._after: Dict[EventType, List[Handler]] = {}
+        self.rebind()
+
+    def __getstate__(self) -> Dict[str, object]:
+        """
+        Checkpoint state: components, pending events, clocks. The dispatch table, bound-method
+        caches and latency closures are rebuilt by rebind() on load; extra subscribers are not
+        saved (modes re-subscribe when they run).
+        """
+        pending: List[Event] = []
+        while True:
+            try:
+                pending.append(self.queue.get_nowait())
+            except Empty:
+                break
+        for event in pending:
+            self.queue.put(event)
+        state: Dict[str, object] = {f.name: getattr(self, f.name) for f in fields(self)}
+        state["queue"] = pending
+        return state
+
+    def __setstate__(self, state: Dict[str, object]) -> None:
+        pending = state.pop("queue")
+        self.__dict__.update(state)
+        self.queue = SimpleQueue()
+        for event in pending:  # type: ignore[attr-defined]
+            self.queue.put(event)
+        self.__post_init__()
+
+    def subscribe(self, event_type: EventType, handler: Handler, *, first: bool = False) -> None:
+        """
+        Register an extra handler (risk, recorder, ...) for one event type.
+        first=True runs it before the core handlers, e.g. to see a signal before the portfolio does.
+        """
+        subs = self._before if first else self._after
+        subs.setdefault(EventType(event_type), []).append(handler)
+        self.rebind()
+
+    def rebind(self) -> None:
+        """(Re)build the dispatch table; call after replacing data/strategy/portfolio/execution."""
+        self._strategy_on_market = self.strategy.on_market
+        self._strategy_on_market_batch = getattr(self.strategy, "on_market_batch", None)
+        self._portfolio_on_market = getattr(self.portfolio, "on_market", None)
+        self._portfolio_on_market_batch = getattr(self.portfolio, "on_market_batch", None)
+        self._execution_on_market_price = getattr(self.execution, "on_market_price", None)
+        self._execution_on_bar = getattr(self.execution, "on_bar", None)
+        self._execution_has_resting = getattr(self.execution, "has_resting", None)
+        self._execution_on_bar_state = getattr(self.execution, "on_bar_state", None)
+        self._portfolio_on_status = getattr(self.portfolio, "on_status", None)
+        core: Dict[EventType, List[Handler]] = {t: [] for t in EventType}
+
+        if self._execution_on_bar is not None:
+            core[EventType.MARKET].append(self._on_execution_bar)
+        if self._execution_on_market_price is not None:
+            core[EventType.MARKET].append(self._on_market_price)
+        if self._portfolio_on_market is not None:
+            core[EventType.MARKET].append(self._portfolio_on_market)
+        lat = self.latency
+        if lat is None:
+            core[EventType.MARKET].append(self._on_strategy)
+            core[EventType.SIGNAL].append(self._on_signal)
+            core[EventType.ORDER].append(self._on_order)
+            core[EventType.FILL].append(self._on_fill)
+        else:
+            core[EventType.MARKET].insert(0, lat.start_market)
+            core[EventType.MARKET].append(lat.wrap("strategy.on_market", self._on_strategy))
+            core[EventType.SIGNAL].append(lat.wrap("portfolio.on_signal", self._on_signal))
+            core[EventType.ORDER].append(lat.wrap("execution.on_order", self._on_order))
+            core[EventType.FILL].append(lat.wrap("portfolio.on_fill", self._on_fill))
+            core[EventType.FILL].append(lat.on_fill_applied)
+            core[EventType.BAR_BATCH].append(lat.start_market)
+            if self._strategy_on_market_batch is not None:
+                self._strategy_on_market_batch = lat.wrap("strategy.on_market_batch", self._strategy_on_market_batch)
+        core[EventType.BAR_BATCH].append(self._on_bar_batch)
+        core[EventType.STATUS].append(self._on_status)
+        if hasattr(self.execution, "on_cancel"):
+            core[EventType.CANCEL].append(self._on_cancel)
+
+        table: Dict[EventType, Tuple[Handler, ...]] = {}
+        for t in EventType:
+            handlers = (*self._before.get(t, ()), *core[t], *self._after.get(t, ()))
+            if handlers:
+                table[t] = handlers
+        self._dispatch = table
 
     def run_until_data_end(self) -> None:
         """
         通用事件循环：拉取 MarketEvent -> 入队 -> drain queue。
         不处理“回测收口/平仓”等策略性行为。
         """
-        log = get_logger(self.__class__.__name__)
+        log = self._log
         log.info("ENGINE_START")
 
-        while self.data.has_next():
-            market = self.data.stream_next()
-            self.last_ts_ms = market.timestamp_ms
-            self.queue.put(market)
+        data = self.data
+        put = self.queue.put
+        drain = self._drain_queue
+        advance = self.clock.advance_to if self.clock is not None else None
+        if self.latency is not None:
+            # 每根 bar drain 完后清掉 market 起点，收口平仓的 fill 不计入 market_to_fill
+            end_market = self.latency.end_market
+            inner = drain
 
-            self._drain_queue()
+            def drain() -> None:
+                inner()
+                end_market()
+
+        if self._batch_enabled():
+            stream_batch = data.stream_batch  # type: ignore[attr-defined]
+            size = self.batch_size
+            while data.has_next():
+                batch = stream_batch(size)
+                self.last_ts_ms = batch.timestamp_ms
+                if advance is not None:
+                    advance(batch.timestamp_ms)
+                put(batch)
+                drain()
+        else:
+            while data.has_next():
+                market = data.stream_next()
+                self.last_ts_ms = market.timestamp_ms
+                if advance is not None:
+                    advance(market.timestamp_ms)
+                put(market)
+                drain()
 
         log.info("ENGINE_END")
 
     def _drain_queue(self) -> None:
-        log = get_logger(self.__class__.__name__)
+        get = self.queue.get_nowait
+        put = self.queue.put
+        dispatch = self._dispatch
 
         while True:
             try:
-                event = self.queue.get_nowait()
+                event = get()
             except Empty:
                 break
 
-            et = event.type
+            handlers = dispatch.get(event.type)
+            if handlers is None:
+                self._log.warning("UNKNOWN_EVENT", extra={"event_type": str(event.type)})
+                continue
 
-            if et == EventType.MARKET:
-                if hasattr(self.execution, "on_market_price"):
-                    try:
-                        self.execution.on_market_price(event.symbol, event.close) # type: ignore
-                    except Exception as e:
-                        log.warning("EXECUTION_ON_MARKET_PRICE_FAILED")
-                        raise
+            for handler in handlers:
+                out = handler(event)
+                if out is not None:
+                    put(out)
 
-                if hasattr(self.portfolio, "on_market"):
-                    self.portfolio.on_market(event)  
-    
-                sig = self.strategy.on_market(event)  # type: ignore
+    def drain(self) -> None:
+        self._drain_queue()
 
-                if sig is not None:
-                    log.info("SIGNAL_EMIT", extra={"symbol": getattr(sig, "symbol", None), "signal": getattr(sig, "signal", None)})
-                    self.queue.put(sig)
+    def _batch_enabled(self) -> bool:
+        return (
+            self.batch_size > 0
+            and hasattr(self.data, "stream_batch")
+            and self._strategy_on_market_batch is not None
+            and not self._before.get(EventType.MARKET)
+            and not self._after.get(EventType.MARKET)
+        )
 
-            elif et == EventType.SIGNAL:
-                order = self.portfolio.on_signal(event)  # type: ignore
-                if order is not None:
-                    log.info("ORDER_EMIT", extra={"symbol": getattr(order, "symbol", None), "side": getattr(order, "side", None), "qty": getattr(order, "qty", None)})
-                    self.queue.put(order)
+    def _dispatch_now(self, event: Event) -> None:
+        """Run `event`'s handlers right away (outputs are queued); types without handlers are dropped."""
+        put = self.queue.put
+        for handler in self._dispatch.get(event.type, ()):
+            out = handler(event)
+            if out is not None:
+                put(out)
 
-            elif et == EventType.ORDER:
-                fill = self.execution.on_order(event)  # type: ignore
-                if fill is not None:
-                    log.info("FILL_EMIT", extra={"symbol": getattr(fill, "symbol", None), "side": getattr(fill, "side", None), "qty": getattr(fill, "fill_qty", None)})
-                    self.queue.put(fill)
+    def _advance(self, batch: BarBatch, start: int, stop: int) -> None:
+        """
+        Bars [start, stop) of a batch: broker matching bar by bar while orders rest, then marks.
+        Bars skipped for the broker only matter through its per-bar state (volume cap, day, last
+        price), which depends on the latest bar alone, so on_bar_state() gets just the last one.
+        """
+        on_bar = self._execution_on_bar
+        if on_bar is not None:
+            has_resting = self._execution_has_resting
+            symbol = batch.symbol
+            while start < stop and (has_resting is None or has_resting(symbol)):
+                event = batch.event_at(start)
+                for out in on_bar(event):
+                    self._dispatch_now(out)
+                self._mark_range(batch, start, start + 1)
+                start += 1
+            on_bar_state = self._execution_on_bar_state
+            if start < stop and on_bar_state is not None:
+                bars, last = batch.bars, stop - 1
+                for out in on_bar_state(symbol, bars.timestamp_ms.item(last), bars.volume.item(last),
+                                        bars.close.item(last)):
+                    self._dispatch_now(out)
+        self._mark_range(batch, start, stop)
 
-            elif et == EventType.FILL:
-                self.portfolio.on_fill(event)  # type: ignore
-                log.info("PORTFOLIO_APPLY_FILL", extra={"symbol": getattr(event, "symbol", None)})
+    def _mark_range(self, batch: BarBatch, start: int, stop: int) -> None:
+        if start >= stop:
+            return
+        if self._portfolio_on_market_batch is not None:
+            self._portfolio_on_market_batch(batch, start, stop)
+        elif self._portfolio_on_market is not None:
+            for i in range(start, stop):
+                self._portfolio_on_market(batch.event_at(i))
 
-            else:
-                log.warning("UNKNOWN_EVENT", extra={"event_type": str(et)})
+    # --- core handlers ---------------------------------------------------------------------
+    # 日志 payload 只在 INFO 打开时才构造
 
-    def drain(self) -> None:
-        self._drain_queue()
+    def _on_market_price(self, event: MarketEvent) -> None:
+        try:
+            self._execution_on_market_price(event.symbol, event.close)
+        except Exception:
+            self._log.warning("EXECUTION_ON_MARKET_PRICE_FAILED")
+            raise
 
+    def _on_strategy(self, event: MarketEvent) -> Optional[SignalEvent]:
+        sig = self._strategy_on_market(event)
+        if sig is not None and self._log.isEnabledFor(logging.INFO):
+            self._log.info("SIGNAL_EMIT", extra={"symbol": sig.symbol, "signal": getattr(sig, "signal", None)})
+        return sig
+
+    def _on_signal(self, event: SignalEvent) -> Optional[OrderEvent]:
+        order = self.portfolio.on_signal(event)
+        if order is not None and self._log.isEnabledFor(logging.INFO):
+            self._log.info("ORDER_EMIT", extra={"symbol": order.symbol, "side": order.side, "qty": order.qty})
+        return order
+
+    def _on_order(self, event: OrderEvent) -> Optional[Event]:
+        out = self.execution.on_order(event)
+        if isinstance(out, (list, tuple)):
+            put = self.queue.put
+            for e in out:
+                put(e)
+            return None
+        if isinstance(out, FillEvent) and self._log.isEnabledFor(logging.INFO):
+            self._log.info("FILL_EMIT", extra={"symbol": out.symbol, "side": out.side, "qty": out.fill_qty})
+        return out
+
+    def _on_cancel(self, event: CancelEvent) -> Optional[OrderStatusEvent]:
+        return self.execution.on_cancel(event)  # type: ignore[attr-defined]
+
+    def _on_execution_bar(self, event: MarketEvent) -> None:
+        for out in self._execution_on_bar(event):  # type: ignore[misc]
+            self._dispatch_now(out)
+
+    def _on_status(self, event: OrderStatusEvent) -> None:
+        if self._portfolio_on_status is not None:
+            self._portfolio_on_status(event)
+        if self._log.isEnabledFor(logging.INFO):
+            self._log.info("ORDER_STATUS", extra={
+                "symbol": event.symbol, "cid": event.client_order_id, "status": event.status,
+            })
+
+    def _on_fill(self, event: FillEvent) -> None:
+        self.portfolio.on_fill(event)
+        if self._log.isEnabledFor(logging.INFO):
+            self._log.info("PORTFOLIO_APPLY_FILL", extra={"symbol": event.symbol})
+
+    def _on_bar_batch(self, batch: BarBatch) -> None:
+        n = len(batch)
+        if n == 0:
+            return
+        if self._strategy_on_market_batch is None or self._before.get(EventType.MARKET) \
+                or self._after.get(EventType.MARKET):
+            # 回退：逐根 MarketEvent
+            for i in range(n):
+                self.queue.put(batch.event_at(i))
+                self._drain_queue()
+            return
+
+        signals = self._strategy_on_market_batch(batch) or ()
+        set_price = self._execution_on_market_price
+        close = batch.bars.close
+        info = self._log.isEnabledFor(logging.INFO)
+        start = 0
+        for i, sig in signals:
+            # bars up to and including i are marked before the signal's fill, as in the per-bar path
+            self._advance(batch, start, i + 1)
+            start = i + 1
+            if set_price is not None:
+                set_price(batch.symbol, close.item(i))
+            if info:
+                self._log.info("SIGNAL_EMIT", extra={"symbol": sig.symbol, "signal": getattr(sig, "signal", None)})
+            self.queue.put(sig)
+            self._drain_queue()
+        self._advance(batch, start, n)
+        if set_price is not None:
+            set_price(batch.symbol, close.item(n - 1))
@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+import contextlib
+import csv
+import io
+import itertools
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Mapping, Optional, Sequence
+
+from src.utils.logging import get_logger
+
+# 引擎、组件、共享内存都在用到时才 import：worker 冷启动只付 run_single 真正需要的部分
+if TYPE_CHECKING:
+    from src.backtest.result_cache import ResultCache
+    from src.data.bars import BarArrays
+    from src.data.shared_bars import SharedBars, SharedBarsSpec
+
+# 没写 name 时的组件默认值（与旧的 sweep 配置写法兼容）
+DEFAULT_COMMISSION = {"name": "zero"}
+DEFAULT_EXECUTION = {"name": "paper", "commission": 0.0}
+
+
+def expand_grid(grid: Mapping[str, Sequence[Any]]) -> List[Dict[str, Any]]:
+    """Cartesian product of the grid, in key order; scalars are treated as one-element lists."""
+    keys = list(grid)
+    values = [v if isinstance(v, (list, tuple)) else [v] for v in grid.values()]
+    return [dict(zip(keys, combo)) for combo in itertools.product(*values)]
+
+
+def load_sweep_config(path: str) -> Dict[str, Any]:
+    import yaml
+
+    with open(Path(path), "r", encoding="utf-8") as f:
+        return yaml.safe_load(f) or {}
+
+
+@dataclass
+class SweepResult:
+    rows: List[Dict[str, Any]]
+    workers: List[Dict[str, Any]]
+    elapsed_s: float
+    bars: int = 0
+    # ResultCache.stats summed over the worker processes (empty without a cache)
+    cache_stats: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def cache_hits(self) -> int:
+        return sum(1 for row in self.rows if row.get("cache_hit"))
+
+    def write_csv(self, path: str) -> None:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        columns: List[str] = []
+        for row in self.rows:
+            columns.extend(k for k in row if k not in columns)
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=columns)
+            writer.writeheader()
+            writer.writerows(self.rows)
+
+
+# --- worker side ---------------------------------------------------------------------------
+
+@dataclass
+class _WorkerState:
+    bars: Optional[BarArrays] = None
+    shared: Optional[SharedBars] = None
+    config: Dict[str, Any] = field(default_factory=dict)
+    cache: Optional[ResultCache] = None
+    data_key: Any = None
+
+
+_WORKER = _WorkerState()
+
+
+def _init_worker(spec: SharedBarsSpec, config: Dict[str, Any], cache: Optional[Dict[str, Any]] = None,
+                 data_key: Any = None) -> None:
+    from src.data.shared_bars import SharedBars
+
+    shared = SharedBars.attach(spec)
+    _WORKER.shared = shared
+    _WORKER.bars = shared.bars
+    _WORKER.config = config
+    _WORKER.cache = None
+    if cache is not None:
+        from src.backtest.result_cache import ResultCache
+        _WORKER.cache = ResultCache(**cache)
+    _WORKER.data_key = data_key
+
+
+def _cache_key(cache: "ResultCache", data_key: Any, config: Mapping[str, Any], params: Mapping[str, Any]) -> str:
+    from src.backtest.result_cache import resolved_config
+
+    # run.workers / run.output 不影响结果
+    resolved = resolved_config(config)
+    resolved["run"] = {"flatten_on_end": bool(config.get("run", {}).get("flatten_on_end", True))}
+    return cache.key(data_key, resolved, params)
+
+
+def run_single(bars: BarArrays, config: Mapping[str, Any], params: Mapping[str, Any]) -> Dict[str, Any]:
+    """
+    One BacktestMode run over `bars`; returns the portfolio's report() + metrics().
+    strategy / portfolio / execution are built through the registry (src.core.registry), so
+    `portfolio.name`, `portfolio.commission.name` and `execution.name` are honored; unnamed sections
+    default to PerformancePortfolio, zero commission and paper fills.
+    """
+    from src.core.registry import STRATEGIES, build_execution, build_portfolio
+    from src.data.array_handler import ArrayDataHandler
+    from src.engine.event_loop import EventLoop
+    from src.modes.backtest import BacktestConfig, BacktestMode
+
+    data_cfg = config.get("data", {})
+    strat_cfg = config.get("strategy", {})
+    strategy = STRATEGIES.build(strat_cfg.get("name", "SMACross"), **{**strat_cfg.get("params", {}), **params})
+    loop = EventLoop(
+        data=ArrayDataHandler(bars=bars, symbol=data_cfg.get("symbol", "UNKNOWN"), lookback=1),
+        strategy=strategy,
+        portfolio=build_portfolio(config.get("portfolio"), DEFAULT_COMMISSION),
+        execution=build_execution(config.get("execution"), DEFAULT_EXECUTION),
+    )
+    mode = BacktestMode(loop=loop, config=BacktestConfig(
+        flatten_on_end=bool(config.get("run", {}).get("flatten_on_end", True)),
+    ))
+    with contextlib.redirect_stdout(io.StringIO()):
+        mode.run()
+    return {**loop.portfolio.report(), **loop.portfolio.metrics()}  # type: ignore[attr-defined]
+
+
+def _run_task(task: Dict[str, Any]) -> Dict[str, Any]:
+    params = task["params"]
+    row: Dict[str, Any] = {"run_id": task["run_id"], **params}
+    t0 = time.perf_counter()
+    cache = _WORKER.cache
+    before = dict(cache.stats) if cache is not None else None
+    try:
+        if cache is not None:
+            result, row["cache_hit"] = cache.get_or_run(
+                _cache_key(cache, _WORKER.data_key, _WORKER.config, params),
+                lambda: (run_single(_WORKER.bars, _WORKER.config, params), None),  # type: ignore[arg-type]
+            )
+            row.update(result.report)
+        else:
+            row.update(run_single(_WORKER.bars, _WORKER.config, params))  # type: ignore[arg-type]
+        row["error"] = ""
+    except ValueError as e:
+        row["error"] = str(e)
+    row["elapsed_s"] = time.perf_counter() - t0
+    row["worker_pid"] = os.getpid()
+    if cache is not None:
+        # worker 进程里的 stats 带不回来：每行捎上本次的增量，driver 汇总后去掉
+        row["_cache_stats"] = {k: v - before.get(k, 0) for k, v in cache.stats.items()}  # type: ignore[union-attr]
+    return row
+
+
+# --- driver side ---------------------------------------------------------------------------
+
+def _load_bars(data_cfg: Mapping[str, Any]) -> BarArrays:
+    csv_path = data_cfg.get("csv_path")
+    if not csv_path:
+        raise ValueError("config.data.csv_path is required")
+    if data_cfg.get("cache_dir"):
+        from src.data.cache import BarCache
+        return BarCache(cache_dir=data_cfg["cache_dir"]).load(csv_path)
+    from src.data.bars import load_bar_arrays
+    return load_bar_arrays(csv_path)
+
+
+def _worker_stats(rows: List[Dict[str, Any]], bars: int) -> List[Dict[str, Any]]:
+    """Per-process throughput; cache hits are counted apart and kept out of runs / busy_s / bars_per_s."""
+    stats: Dict[int, Dict[str, Any]] = {}
+    for row in rows:
+        s = stats.setdefault(row["worker_pid"], {"worker_pid": row["worker_pid"], "runs": 0, "cache_hits": 0,
+                                                 "busy_s": 0.0})
+        if row.get("cache_hit"):
+            s["cache_hits"] += 1
+            continue
+        s["runs"] += 1
+        s["busy_s"] += row["elapsed_s"]
+    for s in stats.values():
+        s["bars"] = s["runs"] * bars
+        s["bars_per_s"] = s["bars"] / s["busy_s"] if s["busy_s"] > 0 else 0.0
+    return sorted(stats.values(), key=lambda s: s["worker_pid"])
+
+
+def run_sweep(config: Mapping[str, Any], workers: Optional[int] = None, no_cache: bool = False) -> SweepResult:
+    """
+    Expand config["grid"], load the bars once into shared memory and fan the runs out over a
+    process pool. Workers attach to the shared block (zero copy) and return report() rows.
+    With a `cache:` section, rows already computed for the same data, config and code come from
+    the ResultCache (no_cache=True forces fresh runs, which still refresh the cache).
+    """
+    log = get_logger("engine.sweep")
+    run_cfg = config.get("run", {})
+    n_workers = int(workers or run_cfg.get("workers") or os.cpu_count() or 1)
+
+    combos = expand_grid(config.get("grid", {}))
+    tasks = [{"run_id": i, "params": p} for i, p in enumerate(combos)]
+    base = {k: v for k, v in config.items() if k != "grid"}
+
+    bars = _load_bars(config.get("data", {}))
+    cache = None
+    cache_cfg = None
+    data_key = None
+    if config.get("cache"):
+        from src.backtest.result_cache import ResultCache
+        cache = ResultCache.from_config(config.get("cache"), bypass=no_cache)
+    if cache is not None:
+        cache_cfg = {"directory": cache.directory, "max_bytes": cache.max_bytes, "bypass": cache.bypass, "tag": cache.tag}
+        data_key = cache.data_fingerprint(config.get("data", {}))
+    log.info("SWEEP_START runs=%s workers=%s bars=%s cache=%s", len(tasks), n_workers, len(bars), cache is not None)
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    from src.data.shared_bars import SharedBars
+
+    t0 = time.perf_counter()
+    with SharedBars.create(bars) as shared:
+        chunksize = max(1, len(tasks) // (n_workers * 4))
+        with ProcessPoolExecutor(
+            max_workers=n_workers,
+            initializer=_init_worker,
+            initargs=(shared.spec, base, cache_cfg, data_key),
+        ) as pool:
+            rows = list(pool.map(_run_task, tasks, chunksize=chunksize))
+    elapsed = time.perf_counter() - t0
+
+    cache_stats: Dict[str, int] = {}
+    for row in rows:
+        for k, v in row.pop("_cache_stats", {}).items():
+            cache_stats[k] = cache_stats.get(k, 0) + v
+    result = SweepResult(rows=rows, workers=_worker_stats(rows, len(bars)), elapsed_s=elapsed, bars=len(bars),
+                         cache_stats=cache_stats)
+    for s in result.workers:
+        log.info(
+            "SWEEP_WORKER pid=%s runs=%s bars_per_s=%.0f busy_s=%.3f",
+            s["worker_pid"], s["runs"], s["bars_per_s"], s["busy_s"],
+        )
+    log.info("SWEEP_DONE runs=%s elapsed_s=%.3f cache=%s", len(rows), elapsed, cache_stats or None)
+    return result
@@ -0,0 +1,337 @@
+from __future__ import annotations
+
+import csv
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.data.bars import BarArrays
+from src.data.shared_bars import SharedBars, SharedBarsSpec
+from src.data.synthetic import SyntheticSpec, generate_bars
+from src.core.registry import STRATEGIES, build_cost
+from src.engine.sweep import DEFAULT_COMMISSION, DEFAULT_EXECUTION, _load_bars, expand_grid
+from src.modes.vectorized import VectorizedBacktestMode, VectorizedConfig, VectorizedResult
+from src.utils.logging import get_logger
+
+_MS_PER_YEAR = 365.25 * 86_400_000
+OBJECTIVES = ("total_return", "sharpe", "calmar")
+
+
+@dataclass(frozen=True)
+class Fold:
+    """Bar-index windows [start, stop) of one train/test split."""
+    index: int
+    train_start: int
+    train_stop: int
+    test_start: int
+    test_stop: int
+
+
+def make_folds(n: int, train_bars: int, test_bars: int, step_bars: int = 0, anchored: bool = False) -> List[Fold]:
+    """
+    Split n bars into consecutive folds; each test window directly follows its train window.
+    - rolling: the train window slides by step_bars (default test_bars), keeping train_bars bars
+    - anchored: the train window always starts at bar 0 and grows
+    The last test window may be shorter than test_bars.
+    """
+    if train_bars <= 0 or test_bars <= 0:
+        raise ValueError("train_bars and test_bars must be > 0")
+    step = step_bars or test_bars
+    folds: List[Fold] = []
+    start = 0
+    while start + train_bars < n:
+        train_stop = start + train_bars
+        folds.append(Fold(
+            index=len(folds),
+            train_start=0 if anchored else start,
+            train_stop=train_stop,
+            test_start=train_stop,
+            test_stop=min(train_stop + test_bars, n),
+        ))
+        start += step
+    return folds
+
+
+def score(result: VectorizedResult, objective: str) -> float:
+    """Objective on one vectorized run; higher is better. sharpe/calmar are annualized from the bar spacing."""
+    summary = result.summary
+    if objective == "total_return":
+        return float(summary["total_return"])
+    ts = result.equity_timestamp_ms
+    # 成交点与 bar 点同 ts：每个 ts 只取第一个点（bar 点）
+    first = np.ones(ts.shape[0], dtype=bool)
+    first[1:] = np.diff(ts) != 0
+    equity, bar_ts = result.equity[first], ts[first]
+    if equity.shape[0] < 3:
+        return float("-inf")
+    periods = _MS_PER_YEAR / float(np.median(np.diff(bar_ts)))
+    if objective == "sharpe":
+        r = equity[1:] / equity[:-1] - 1.0
+        sd = float(r.std(ddof=1))
+        return float(r.mean()) / sd * math.sqrt(periods) if sd > 0 else float("-inf")
+    if objective == "calmar":
+        years = (equity.shape[0] - 1) / periods
+        growth = float(equity[-1] / equity[0])
+        if years <= 0 or growth <= 0:
+            return float("-inf")
+        cagr = growth ** (1.0 / years) - 1.0
+        if summary["max_drawdown"] <= 0:
+            # 没有回撤：正收益排在所有有回撤的组合前面
+            return float("inf") if cagr > 0 else 0.0
+        return cagr / float(summary["max_drawdown"])
+    raise ValueError(f"unknown objective: {objective!r} (expected one of {OBJECTIVES})")
+
+
+class _Signals:
+    """generate_signals() over a slice of precomputed full-series signals."""
+
+    def __init__(self, signals: np.ndarray) -> None:
+        self._signals = signals
+
+    def generate_signals(self, bars: BarArrays) -> np.ndarray:
+        return self._signals
+
+
+@dataclass
+class _WorkerState:
+    bars: Optional[BarArrays] = None
+    shared: Optional[SharedBars] = None
+    config: Dict[str, Any] = field(default_factory=dict)
+    # 每个进程每组参数只算一次全序列信号，所有重叠 fold 共用
+    signals: Dict[Tuple[Tuple[str, Any], ...], np.ndarray] = field(default_factory=dict)
+
+
+_WORKER = _WorkerState()
+
+
+def _init_worker(spec: SharedBarsSpec, config: Dict[str, Any]) -> None:
+    shared = SharedBars.attach(spec)
+    _WORKER.shared = shared
+    _WORKER.bars = shared.bars
+    _WORKER.config = config
+    _WORKER.signals = {}
+
+
+def _full_signals(params: Mapping[str, Any]) -> np.ndarray:
+    key = tuple(sorted(params.items()))
+    sig = _WORKER.signals.get(key)
+    if sig is None:
+        strat_cfg = _WORKER.config.get("strategy", {})
+        strategy = STRATEGIES.build(strat_cfg.get("name", "SMACross"), **{**strat_cfg.get("params", {}), **params})
+        # 信号只依赖当前及之前的 bar：整段算一次再切片，不引入未来数据
+        sig = _WORKER.signals[key] = np.asarray(strategy.generate_signals(_WORKER.bars))
+    return sig
+
+
+def vectorized_config(config: Mapping[str, Any], initial_cash: Optional[float] = None) -> VectorizedConfig:
+    """
+    VectorizedConfig mirroring sweep.run_single: `portfolio.commission` goes through build_cost.
+    The vectorized runner only models PerformancePortfolio with paper fills, so other
+    portfolio / execution names are rejected instead of being silently ignored.
+    """
+    port_cfg = dict(config.get("portfolio") or {})
+    exec_cfg = dict(config.get("execution") or {})
+    if "name" not in exec_cfg:
+        exec_cfg = {**DEFAULT_EXECUTION, **exec_cfg}
+    port_name = port_cfg.get("name", "PerformancePortfolio")
+    if port_name != "PerformancePortfolio" or exec_cfg["name"] != "paper":
+        raise ValueError(f"walk-forward runs vectorized: only PerformancePortfolio with paper execution is "
+                         f"supported, got portfolio={port_name!r} execution={exec_cfg['name']!r}")
+    return VectorizedConfig(
+        initial_cash=float(port_cfg.get("initial_cash", 100_000.0) if initial_cash is None else initial_cash),
+        order_qty=int(port_cfg.get("order_qty", 10)),
+        commission_per_trade=float(exec_cfg.get("commission", 0.0)),
+        commission_model=build_cost(port_cfg.get("commission") or DEFAULT_COMMISSION),
+        flatten_on_end=True,
+    )
+
+
+def _evaluate(params: Mapping[str, Any], start: int, stop: int) -> VectorizedResult:
+    bars = _WORKER.bars.slice(start, stop)  # type: ignore[union-attr]
+    mode = VectorizedBacktestMode(
+        bars=bars,
+        strategy=_Signals(_full_signals(params)[start:stop]),
+        symbol=_WORKER.config.get("data", {}).get("symbol", "UNKNOWN"),
+        config=vectorized_config(_WORKER.config),
+    )
+    return mode.compute()
+
+
+def _run_fold(task: Dict[str, Any]) -> Dict[str, Any]:
+    fold: Fold = task["fold"]
+    objective = task["objective"]
+    t0 = time.perf_counter()
+    best: Optional[Tuple[float, int]] = None
+    errors: List[str] = []
+    for i, params in enumerate(task["combos"]):
+        try:
+            s = score(_evaluate(params, fold.train_start, fold.train_stop), objective)
+        except ValueError as exc:
+            errors.append(f"{params}: {exc}")  # 非法组合（如 fast >= slow）跳过，原因写进 fold 行
+            continue
+        if best is None or s > best[0]:
+            best = (s, i)
+    if best is None:
+        raise ValueError(f"fold {fold.index}: no valid parameter combination ({'; '.join(errors)})")
+
+    params = task["combos"][best[1]]
+    test = _evaluate(params, fold.test_start, fold.test_stop)
+    return {
+        "fold": fold,
+        "params": params,
+        "train_score": best[0],
+        "test_score": score(test, objective),
+        "skipped": errors,
+        "test": test,
+        "elapsed_s": time.perf_counter() - t0,
+        "worker_pid": os.getpid(),
+    }
+
+
+@dataclass
+class WalkForwardResult:
+    # one row per fold: windows, chosen params, in-/out-of-sample scores, test summary
+    folds: List[Dict[str, Any]]
+    # stitched out-of-sample curve (test windows only, each fold's PnL added to the running equity)
+    timestamp_ms: np.ndarray
+    equity: np.ndarray
+    summary: Dict[str, Any]
+    elapsed_s: float
+
+    def write_csv(self, path: str) -> None:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        columns: List[str] = []
+        for row in self.folds:
+            columns.extend(k for k in row if k not in columns)
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=columns)
+            writer.writeheader()
+            writer.writerows(self.folds)
+
+
+def _stitch(bars: BarArrays, outs: Sequence[Dict[str, Any]], initial_cash: float,
+            objective: str) -> Tuple[List[Dict[str, Any]], np.ndarray, np.ndarray, Dict[str, Any]]:
+    """
+    Chain the test runs. Orders are a fixed quantity, so a run's PnL does not depend on its starting
+    cash: adding each fold's equity change to the running total gives the same curve as running the
+    folds back to back with carried-over capital.
+    """
+    ts = bars.timestamp_ms
+    rows: List[Dict[str, Any]] = []
+    curve_ts: List[np.ndarray] = []
+    curve_eq: List[np.ndarray] = []
+    equity = initial_cash
+    trades = 0
+    commission = 0.0
+    for out in outs:
+        fold, test = out["fold"], out["test"]
+        pnl = test.summary["total_pnl"]
+        curve_ts.append(test.equity_timestamp_ms)
+        curve_eq.append(test.equity - test.summary["initial_cash"] + equity)
+        rows.append({
+            "fold": fold.index,
+            "train_start_ms": ts.item(fold.train_start),
+            "train_end_ms": ts.item(fold.train_stop - 1),
+            "test_start_ms": ts.item(fold.test_start),
+            "test_end_ms": ts.item(fold.test_stop - 1),
+            **out["params"],
+            f"train_{objective}": out["train_score"],
+            f"test_{objective}": out["test_score"],
+            "test_pnl": pnl,
+            "test_trades": test.summary["trades"],
+            "test_max_drawdown": test.summary["max_drawdown"],
+            "start_equity": equity,
+            "skipped_params": len(out["skipped"]),
+            "skip_errors": "; ".join(out["skipped"]),
+            "elapsed_s": out["elapsed_s"],
+            "worker_pid": out["worker_pid"],
+        })
+        equity += pnl
+        trades += test.summary["trades"]
+        commission += test.summary["total_commission"]
+
+    eq_ts = np.concatenate(curve_ts) if curve_ts else np.array([], dtype=np.int64)
+    eq = np.concatenate(curve_eq) if curve_eq else np.array([], dtype=np.float64)
+    peak = np.maximum.accumulate(np.concatenate(([initial_cash], eq)))[1:]
+    summary = {
+        "folds": len(rows),
+        "initial_cash": initial_cash,
+        "final_equity": equity,
+        "total_pnl": equity - initial_cash,
+        "total_return": (equity - initial_cash) / initial_cash if initial_cash else 0.0,
+        "max_drawdown": float(((peak - eq) / peak).max()) if eq.shape[0] else 0.0,
+        "trades": trades,
+        "total_commission": commission,
+        "oos_bars": int(sum(o["fold"].test_stop - o["fold"].test_start for o in outs)),
+    }
+    return rows, eq_ts, eq, summary
+
+
+def load_bars(data_cfg: Mapping[str, Any]) -> BarArrays:
+    """`data.synthetic: {bars, seed, ...}` generates a SyntheticSpec series in memory; otherwise csv_path."""
+    synthetic = data_cfg.get("synthetic")
+    if synthetic:
+        return generate_bars(SyntheticSpec(**synthetic))
+    return _load_bars(data_cfg)
+
+
+def run_walk_forward(config: Mapping[str, Any], workers: Optional[int] = None) -> WalkForwardResult:
+    """
+    Walk-forward analysis over config["walk_forward"] = {train_bars, test_bars, step_bars, anchored,
+    objective}: on each fold, every config["grid"] combination is run vectorized on the train window,
+    the best one by `objective` is run on the test window, and the test curves are stitched.
+    The bars are parsed once into shared memory; each process computes a combination's full-series
+    signals once and slices them for every fold. Folds run in a process pool when workers > 1.
+    """
+    log = get_logger("engine.walk_forward")
+    wf = dict(config.get("walk_forward", {}))
+    objective = wf.get("objective", "sharpe")
+    if objective not in OBJECTIVES:
+        raise ValueError(f"unknown objective: {objective!r} (expected one of {OBJECTIVES})")
+    n_workers = int(workers or wf.get("workers") or 1)
+    # 未知策略名在这里报错，而不是在每个 fold 里被当成非法组合跳过
+    STRATEGIES.get(config.get("strategy", {}).get("name", "SMACross"))
+
+    bars = load_bars(config.get("data", {}))
+    folds = make_folds(
+        len(bars), int(wf["train_bars"]), int(wf["test_bars"]),
+        step_bars=int(wf.get("step_bars", 0)), anchored=bool(wf.get("anchored", False)),
+    )
+    if not folds:
+        raise ValueError(f"{len(bars)} bars are not enough for train_bars={wf['train_bars']}")
+    combos = expand_grid(config.get("grid", {}))
+    base = {k: v for k, v in config.items() if k != "grid"}
+    tasks = [{"fold": f, "combos": combos, "objective": objective} for f in folds]
+    log.info("WALK_FORWARD_START folds=%s combos=%s workers=%s bars=%s anchored=%s",
+             len(folds), len(combos), n_workers, len(bars), bool(wf.get("anchored", False)))
+
+    t0 = time.perf_counter()
+    with SharedBars.create(bars) as shared:
+        if n_workers > 1:
+            with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker,
+                                     initargs=(shared.spec, base)) as pool:
+                outs = list(pool.map(_run_fold, tasks))
+        else:
+            _init_worker(shared.spec, base)
+            try:
+                outs = [_run_fold(t) for t in tasks]
+            finally:
+                worker_shared = _WORKER.shared
+                _WORKER.bars = _WORKER.shared = None
+                _WORKER.signals = {}
+                if worker_shared is not None:
+                    worker_shared.close()
+    elapsed = time.perf_counter() - t0
+
+    initial_cash = vectorized_config(base).initial_cash
+    rows, eq_ts, eq, summary = _stitch(bars, outs, initial_cash, objective)
+    for row in rows:
+        log.info("WALK_FORWARD_FOLD %s", row)
+    log.info("WALK_FORWARD_DONE elapsed_s=%.3f %s", elapsed, summary)
+    return WalkForwardResult(folds=rows, timestamp_ms=eq_ts, equity=eq, summary=summary, elapsed_s=elapsed)
@@ -1,27 +1,28 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from src.core.costs import FeeModel, PercentFee
+
+# 统一到 src.core.costs；这里保留旧名字，兼容已有 import
+CommissionModel = FeeModel
+
 
 @dataclass(frozen = True)
-class CommissionModel:
-    def calc(self, qty: int, price: float) -> float:
-        raise NotImplementedError
-    
-@dataclass(frozen = True)
-class FixedCommission(CommissionModel):
+class FixedCommission(FeeModel):
     per_trade: float = 0.0
     commission: float = 0.0
-    def calc(self, qty: int, price: float) -> float:
+
+    def calc(self, qty: int, price: float, side: Optional[object] = None, symbol: str = "") -> float:
         return float(self.per_trade)
-    
+
+    def calc_array(self, qty: np.ndarray, price: np.ndarray, side: np.ndarray) -> np.ndarray:
+        return np.full(np.shape(qty), float(self.per_trade), dtype=np.float64)
+
+
 @dataclass(frozen = True)
-class RateCommission(CommissionModel):
-    rate: float = 0.0
-    min_fee: float = 0.0
-
-    def calc(self, qty: int, price: float) -> float:
-        notional = float(qty) * float(price)
-        fee = notional * float(self.rate)
-        if fee < float(self.min_fee):
-            fee = float(self.min_fee)
-        return fee
+class RateCommission(PercentFee):
+    """fee = max(notional * rate, min_fee)"""
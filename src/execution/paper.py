@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Optional, Dict
 from src.core.events import (
     EventType, OrderEvent, FillEvent,
@@ -19,7 +19,7 @@ class PaperExecutionConfig:
 
 @dataclass
 class PaperExecution:
-    config: PaperExecutionConfig = PaperExecutionConfig()
+    config: PaperExecutionConfig = field(default_factory=PaperExecutionConfig)
 
     def __post_init__(self) -> None:
         self._log = get_logger("execution.paper")
@@ -0,0 +1,356 @@
+from __future__ import annotations
+
+import heapq
+import sys
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, List, Optional, Tuple, Union
+
+from src.core.events import (
+    CancelEvent, Event, EventType, FillEvent, MarketEvent, OrderEvent, OrderStatus,
+    OrderStatusEvent, OrderType, Side, TimeInForce,
+)
+from src.core.costs import CostModel
+from src.execution.commission import CommissionModel, FixedCommission
+from src.utils.logging import get_logger
+
+_MS_PER_DAY = 86_400_000
+_UNLIMITED = sys.maxsize
+
+
+@dataclass
+class SimulatedBrokerConfig:
+    """
+    - commission_model: per-fill commission (calc(qty, price)); a CostModel also slips MKT and STP fills
+      (limit fills keep their price), with the current bar's volume as the participation base
+    - max_participation: per bar and symbol, fills are capped at this fraction of the bar volume
+      (0 = unlimited); the remainder of a limit/stop order keeps resting as PARTIALLY_FILLED
+    - utc_offset_ms: where the trading day starts, for DAY orders
+    """
+    commission_model: CommissionModel = field(default_factory=FixedCommission)
+    max_participation: float = 0.0
+    utc_offset_ms: int = 0
+
+
+class _Order:
+    __slots__ = ("order", "gateway_id", "remaining", "day", "active")
+
+    def __init__(self, order: OrderEvent, gateway_id: str, day: int) -> None:
+        self.order = order
+        self.gateway_id = gateway_id
+        self.remaining = int(order.qty)
+        self.day = day
+        self.active = True
+
+
+# heap entry: (sort key, arrival seq, order); seq breaks price ties FIFO and keeps _Order out of comparisons
+_Entry = Tuple[float, int, _Order]
+
+
+class _SymbolBook:
+    __slots__ = (
+        "buy_lmt", "sell_lmt", "buy_stp", "sell_stp", "day_orders",
+        "live", "dead", "last_price", "volume", "volume_cap", "liquidity", "day",
+    )
+
+    def __init__(self) -> None:
+        self.buy_lmt: List[_Entry] = []   # key -limit: highest bid first
+        self.sell_lmt: List[_Entry] = []  # key +limit: lowest offer first
+        self.buy_stp: List[_Entry] = []   # key +stop: lowest trigger first
+        self.sell_stp: List[_Entry] = []  # key -stop: highest trigger first
+        self.day_orders: Deque[_Order] = deque()
+        self.live = 0
+        self.dead = 0
+        self.last_price: Optional[float] = None
+        self.volume: Optional[float] = None
+        self.volume_cap = _UNLIMITED
+        self.liquidity = _UNLIMITED
+        self.day: Optional[int] = None
+
+    def heaps(self) -> Tuple[List[_Entry], ...]:
+        return (self.buy_lmt, self.sell_lmt, self.buy_stp, self.sell_stp)
+
+    def compact(self) -> None:
+        """Drop canceled/expired entries once they outnumber live ones (amortized O(1) per cancel)."""
+        for h in self.heaps():
+            h[:] = [e for e in h if e[2].active]
+            heapq.heapify(h)
+        self.dead = 0
+
+
+@dataclass
+class SimulatedBroker:
+    """
+    Bar-range order matching for backtests.
+    - MKT orders fill on arrival at the last known price, like PaperExecution
+    - LMT/STP orders that are marketable on arrival fill immediately at the last price; otherwise they
+      rest in per-symbol heaps (buy limits, sell limits, buy stops, sell stops) ordered by price, then
+      arrival time
+    - on_bar() pops triggered orders from the heap tops: buy limit if low <= limit, sell limit if
+      high >= limit, buy stop if high >= stop, sell stop if low <= stop. Fills happen at the order price,
+      or at the open when the bar gaps through it. Untriggered orders are never touched, so each bar
+      costs O(k log n) for k fills out of n resting orders
+    - cancels are lazy: the order is flagged and its heap entry is dropped when it reaches the top
+    - time in force: GTC rests, DAY expires at the first bar of a later day, IOC cancels what does not
+      fill on arrival, FOK fills entirely on arrival or is rejected
+    Order acknowledgements, cancels, expiries and rejects are OrderStatusEvents.
+    """
+    config: SimulatedBrokerConfig = field(default_factory=SimulatedBrokerConfig)
+
+    def __post_init__(self) -> None:
+        self._log = get_logger("execution.simulated")
+        self._books: Dict[str, _SymbolBook] = {}
+        self._orders: Dict[str, _Order] = {}
+        self._seq = 0
+        model = self.config.commission_model
+        self._costs = model if isinstance(model, CostModel) and model.slippage else None
+
+    # --- market data ---------------------------------------------------------------------------
+
+    def _book(self, symbol: str) -> _SymbolBook:
+        book = self._books.get(symbol)
+        if book is None:
+            book = self._books[symbol] = _SymbolBook()
+        return book
+
+    def _day(self, timestamp_ms: int) -> int:
+        return (timestamp_ms + self.config.utc_offset_ms) // _MS_PER_DAY
+
+    def on_market_price(self, symbol: str, price: float) -> None:
+        self._book(symbol).last_price = price
+
+    def has_resting(self, symbol: str) -> bool:
+        book = self._books.get(symbol)
+        return book is not None and book.live > 0
+
+    def on_bar(self, event: MarketEvent) -> List[Event]:
+        """Match resting orders against the bar's range; returns fills and expiry statuses in order."""
+        book = self._book(event.symbol)
+        out: List[Event] = []
+        self._roll(book, event.timestamp_ms, event.volume, out)
+        if book.live:
+            self._match(book, event, out)
+        book.last_price = event.close
+        return out
+
+    def on_bar_state(self, symbol: str, timestamp_ms: int, volume: float, close: float) -> List[Event]:
+        """
+        on_bar() for a bar with nothing resting to match: only the day, volume, participation budget
+        and last price move on. The batch path calls it for the last of the bars it skips, so orders
+        arriving next see the same book as in a per-bar run.
+        """
+        book = self._book(symbol)
+        out: List[Event] = []
+        self._roll(book, timestamp_ms, volume, out)
+        book.last_price = close
+        return out
+
+    def _roll(self, book: _SymbolBook, timestamp_ms: int, volume: float, out: List[Event]) -> None:
+        day = self._day(timestamp_ms)
+        if day != book.day:
+            book.day = day
+            if book.day_orders:
+                self._expire(book, day, timestamp_ms, out)
+
+        book.volume = volume
+        rate = self.config.max_participation
+        if rate > 0.0:
+            book.volume_cap = int(volume * rate)
+        book.liquidity = book.volume_cap
+
+    def _expire(self, book: _SymbolBook, day: int, timestamp_ms: int, out: List[Event]) -> None:
+        q = book.day_orders
+        while q and q[0].day < day:
+            o = q.popleft()
+            if o.active:
+                self._close(book, o)
+                out.append(self._status(o, OrderStatus.EXPIRED, timestamp_ms, "day order expired"))
+
+    def _match(self, book: _SymbolBook, bar: MarketEvent, out: List[Event]) -> None:
+        op, hi, lo = bar.open, bar.high, bar.low
+        # (heap, sign of stored key, down): down-triggered orders (buy limit, sell stop) fire at low <= price
+        # and fill at min(price, open); the others fire at high >= price and fill at max(price, open)
+        for heap, sign, down in (
+            (book.buy_lmt, -1.0, True),
+            (book.sell_lmt, 1.0, False),
+            (book.buy_stp, 1.0, False),
+            (book.sell_stp, -1.0, True),
+        ):
+            while heap:
+                if book.liquidity <= 0:
+                    return
+                key, _, o = heap[0]
+                if not o.active:
+                    heapq.heappop(heap)
+                    book.dead -= 1
+                    continue
+                price = key * sign
+                if down:
+                    if lo > price:
+                        break
+                    fill_price = price if price < op else op
+                else:
+                    if hi < price:
+                        break
+                    fill_price = price if price > op else op
+                qty = min(o.remaining, book.liquidity)
+                out.append(self._fill(book, o, qty, fill_price, bar.timestamp_ms))
+                if o.active:
+                    return  # partial fill: the bar's liquidity is used up
+                heapq.heappop(heap)
+                book.dead -= 1
+
+    # --- orders --------------------------------------------------------------------------------
+
+    def on_order(self, event: OrderEvent) -> Union[Event, List[Event], None]:
+        book = self._book(event.symbol)
+        self._seq += 1
+        o = _Order(event, f"sim-{self._seq}", self._day(event.timestamp_ms))
+
+        reason = self._validate(event, book)
+        if reason:
+            self._log.warning("SIM_REJECT cid=%s reason=%s", event.client_order_id, reason)
+            return self._status(o, OrderStatus.REJECTED, event.timestamp_ms, reason)
+
+        price = self._marketable_price(event, book.last_price)
+        if price is not None:
+            qty = max(min(o.remaining, book.liquidity), 0)
+            if event.tif == TimeInForce.FOK and qty < o.remaining:
+                return self._status(o, OrderStatus.REJECTED, event.timestamp_ms, "fok: not enough liquidity")
+            if event.order_type == OrderType.MKT:
+                qty = o.remaining  # 市价单不受成交量上限约束
+            out: List[Event] = []
+            if qty > 0:
+                o.active = False  # 还没挂进 book，_fill 不应动 live 计数
+                out.append(self._fill(book, o, qty, price, event.timestamp_ms))
+                o.active = o.remaining > 0
+            if o.remaining == 0:
+                return out[0]
+        else:
+            out = []
+            if event.tif == TimeInForce.FOK:
+                return self._status(o, OrderStatus.REJECTED, event.timestamp_ms, "fok: not marketable")
+
+        if event.tif == TimeInForce.IOC:
+            o.active = False
+            out.append(self._status(o, OrderStatus.CANCELED, event.timestamp_ms, "ioc remainder"))
+        else:
+            self._rest(book, o)
+            if not out:
+                out.append(self._status(o, OrderStatus.NEW, event.timestamp_ms))
+        return out[0] if len(out) == 1 else out
+
+    def _validate(self, event: OrderEvent, book: _SymbolBook) -> str:
+        if event.qty <= 0:
+            return "qty must be > 0"
+        if event.client_order_id in self._orders:
+            return "duplicate client_order_id"
+        if event.order_type == OrderType.MKT and book.last_price is None:
+            return "no price"
+        if event.order_type == OrderType.LMT and event.limit_price <= 0.0:
+            return "limit_price must be > 0"
+        if event.order_type == OrderType.STP and event.stop_price <= 0.0:
+            return "stop_price must be > 0"
+        return ""
+
+    @staticmethod
+    def _marketable_price(event: OrderEvent, last: Optional[float]) -> Optional[float]:
+        if last is None:
+            return None
+        buy = event.side == Side.BUY
+        if event.order_type == OrderType.MKT:
+            return last
+        if event.order_type == OrderType.LMT:
+            ok = last <= event.limit_price if buy else last >= event.limit_price
+        else:  # STP
+            ok = last >= event.stop_price if buy else last <= event.stop_price
+        return last if ok else None
+
+    def _rest(self, book: _SymbolBook, o: _Order) -> None:
+        e = o.order
+        buy = e.side == Side.BUY
+        if e.order_type == OrderType.LMT:
+            heap, key = (book.buy_lmt, -e.limit_price) if buy else (book.sell_lmt, e.limit_price)
+        else:
+            heap, key = (book.buy_stp, e.stop_price) if buy else (book.sell_stp, -e.stop_price)
+        heapq.heappush(heap, (key, self._seq, o))
+        if e.tif == TimeInForce.DAY:
+            book.day_orders.append(o)
+        o.active = True
+        book.live += 1
+        self._orders[e.client_order_id] = o
+
+    def on_cancel(self, event: CancelEvent) -> OrderStatusEvent:
+        o = self._orders.get(event.client_order_id)
+        if o is None:
+            return OrderStatusEvent(
+                type=EventType.STATUS, timestamp_ms=event.timestamp_ms, symbol=event.symbol,
+                client_order_id=event.client_order_id, gateway_order_id=None,
+                status=OrderStatus.REJECTED, reason="unknown or closed order",
+            )
+        self._close(self._books[o.order.symbol], o)
+        return self._status(o, OrderStatus.CANCELED, event.timestamp_ms, "canceled")
+
+    def cancel(self, client_order_id: str, timestamp_ms: int = 0) -> OrderStatusEvent:
+        o = self._orders.get(client_order_id)
+        symbol = o.order.symbol if o is not None else ""
+        return self.on_cancel(CancelEvent(
+            type=EventType.CANCEL, timestamp_ms=timestamp_ms, symbol=symbol, client_order_id=client_order_id,
+        ))
+
+    def open_orders(self, symbol: Optional[str] = None) -> Dict[str, int]:
+        """Remaining qty of resting orders by client_order_id."""
+        return {
+            cid: o.remaining for cid, o in self._orders.items()
+            if symbol is None or o.order.symbol == symbol
+        }
+
+    # --- helpers -------------------------------------------------------------------------------
+
+    def _close(self, book: _SymbolBook, o: _Order) -> None:
+        """Take a resting order out of the book; its heap entry stays until popped or compacted."""
+        o.active = False
+        book.live -= 1
+        book.dead += 1
+        self._orders.pop(o.order.client_order_id, None)
+        if book.dead > 64 and book.dead > book.live:
+            book.compact()
+
+    def _fill(self, book: _SymbolBook, o: _Order, qty: int, price: float, timestamp_ms: int) -> FillEvent:
+        o.remaining -= qty
+        if book.liquidity != _UNLIMITED:
+            book.liquidity -= qty
+        if o.remaining == 0 and o.active:
+            o.active = False
+            book.live -= 1
+            book.dead += 1
+            self._orders.pop(o.order.client_order_id, None)
+        e = o.order
+        if self._costs is not None and e.order_type != OrderType.LMT:
+            price, commission = self._costs.apply(qty, price, e.side, book.volume, symbol=e.symbol)
+        else:
+            commission = float(self.config.commission_model.calc(qty=qty, price=price, side=e.side, symbol=e.symbol))
+        return FillEvent(
+            type=EventType.FILL,
+            timestamp_ms=timestamp_ms,
+            symbol=e.symbol,
+            client_order_id=e.client_order_id,
+            gateway_order_id=o.gateway_id,
+            side=e.side,
+            fill_qty=qty,
+            fill_price=price,
+            commission=commission,
+            status=OrderStatus.FILLED if o.remaining == 0 else OrderStatus.PARTIALLY_FILLED,
+        )
+
+    @staticmethod
+    def _status(o: _Order, status: OrderStatus, timestamp_ms: int, reason: str = "") -> OrderStatusEvent:
+        return OrderStatusEvent(
+            type=EventType.STATUS,
+            timestamp_ms=timestamp_ms,
+            symbol=o.order.symbol,
+            client_order_id=o.order.client_order_id,
+            gateway_order_id=o.gateway_id,
+            status=status,
+            reason=reason,
+        )
@@ -1,12 +1,16 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
+from pathlib import Path
 from queue import Empty
+from typing import Dict, Mapping, Optional
 from src.core.events import (
     EventType, OrderEvent,
     Side, OrderType,
 )
+from src.engine.checkpoint import CheckpointConfig, Checkpointer, load_checkpoint, resolve_checkpoint
 from src.engine.event_loop import EventLoop
+from src.utils.latency import emit_latency_summary
 from src.utils.logging import get_logger
 import logging
 
@@ -16,17 +20,44 @@ log = logging.getLogger("mode.backtest")
 class BacktestConfig:
     flatten_on_end: bool = True
     max_flatten_steps: int = 10
+    # periodic snapshots; resume with BacktestMode.resume(directory)
+    checkpoint: Optional[CheckpointConfig] = None
 
 @dataclass
 class BacktestMode:
     loop: EventLoop
     config: BacktestConfig = field(default_factory=BacktestConfig)
+    _start_bars: int = field(default=0, init=False, repr=False)
+
+    @classmethod
+    def resume(cls, path: str | Path, config: Optional[BacktestConfig] = None) -> "BacktestMode":
+        """Continue from a checkpoint file (or the newest one in a directory); results match an uninterrupted run."""
+        ckpt = resolve_checkpoint(path)
+        loop, meta = load_checkpoint(ckpt)
+        get_logger("mode.backtest").info("BACKTEST_RESUME path=%s bars=%s", ckpt, meta.get("bars"))
+        # 续跑会从快照处重写 chunk：先删掉快照之后写出的，避免重复行
+        sink = getattr(loop.portfolio, "sink", None)
+        if sink is not None:
+            sink.truncate_to_checkpoint()
+        mode = cls(loop=loop, config=config or BacktestConfig())
+        mode._start_bars = int(meta.get("bars", 0))
+        return mode
 
     def run(self) -> None:
         log = get_logger("mode.backtest")
         log.info("BACKTEST_START")
 
-        self.loop.run_until_data_end()
+        ckpt = None
+        if self.config.checkpoint is not None:
+            ckpt = Checkpointer(self.loop, self.config.checkpoint, self._start_bars, meta={"mode": "backtest"})
+            ckpt.attach()
+        try:
+            self.loop.run_until_data_end()
+        finally:
+            if ckpt is not None:
+                ckpt.detach()
+        if ckpt is not None and ckpt.config.on_end:
+            ckpt.save(end=True)
         self._finalize_flatten()
 
         pos = getattr(self.loop.portfolio, "position", 0)
@@ -35,8 +66,24 @@ class BacktestMode:
 
         if hasattr(self.loop.portfolio, "report"):
             summary = self.loop.portfolio.report()  # type: ignore[attr-defined]
-
-        log.info("PERF_SUMMARY %s", summary)
+            log.info("PERF_SUMMARY %s", summary)
+        if hasattr(self.loop.portfolio, "metrics"):
+            log.info("PERF_METRICS %s", self.loop.portfolio.metrics())  # type: ignore[attr-defined]
+        emit_latency_summary(getattr(self.loop, "latency", None), log)
+
+    def _open_positions(self) -> Dict[str, int]:
+        """
+        Non-zero positions by symbol.
+        Portfolios exposing a `positions` mapping are flattened per symbol; otherwise the
+        single `position` is attributed to the data handler's symbol.
+        """
+        book = getattr(self.loop.portfolio, "positions", None)
+        if isinstance(book, Mapping):
+            return {s: int(q) for s, q in book.items() if q}
+        pos = getattr(self.loop.portfolio, "position", 0)
+        if pos == 0:
+            return {}
+        return {getattr(self.loop.data, "symbol", "UNKNOWN"): pos}
 
     def _finalize_flatten(self) -> None:
         log = get_logger("mode.backtest")
@@ -45,29 +92,29 @@ class BacktestMode:
             log.info("FLATTEN_SKIP disabled")
             return
 
-        pos = getattr(self.loop.portfolio, "position", 0)
-        if pos == 0:
+        positions = self._open_positions()
+        if not positions:
             log.info("FLATTEN_SKIP position=0")
             return
 
         ts = self.loop.last_ts_ms
-        symbol = getattr(self.loop.data, "symbol", "UNKNOWN")
-        side = Side.SELL if pos > 0 else Side.BUY
-
-        order = OrderEvent(
-            type=EventType.ORDER,
-            timestamp_ms=ts,
-            symbol=symbol,
-            client_order_id=f"flatten-{ts}",
-            side=side,
-            order_type=OrderType.MKT,
-            qty=abs(pos),
-            limit_price=0.0,
-            strategy_id="finalize",
-        )
-
-        log.info("FLATTEN_START symbol=%s side=%s qty=%s", symbol, side, abs(pos))
-        self.loop.queue.put(order)
+        for symbol, pos in positions.items():
+            side = Side.SELL if pos > 0 else Side.BUY
+
+            order = OrderEvent(
+                type=EventType.ORDER,
+                timestamp_ms=ts,
+                symbol=symbol,
+                client_order_id=f"flatten-{symbol}-{ts}" if len(positions) > 1 else f"flatten-{ts}",
+                side=side,
+                order_type=OrderType.MKT,
+                qty=abs(pos),
+                limit_price=0.0,
+                strategy_id="finalize",
+            )
+
+            log.info("FLATTEN_START symbol=%s side=%s qty=%s", symbol, side, abs(pos))
+            self.loop.queue.put(order)
 
         steps = 0
         while steps < self.config.max_flatten_steps:
@@ -82,7 +129,7 @@ class BacktestMode:
                     drained = True
                     self.loop.drain()
 
-            if getattr(self.loop.portfolio, "position", 0) == 0:
+            if not self._open_positions():
                 log.info("FLATTEN_OK")
                 return
 
@@ -1,7 +1,14 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from src.engine.event_loop import EventLoop
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from src.core.clock import Clock, ReplayPacer
+from src.core.events import EventType, MarketEvent
+from src.engine.checkpoint import CheckpointConfig, Checkpointer, load_checkpoint, resolve_checkpoint
+from src.engine.event_loop import DataHandler, EventLoop, ExecutionHandler
+from src.utils.latency import LatencyHistogram, emit_latency_summary
 from src.utils.logging import get_logger
 
 @dataclass
@@ -11,21 +18,145 @@ class DryRunConfig:
     - No forced flatten on end (paper trading can keep open positions)
     """
     emit_summary: bool = True
+    # >0: log PERF_SNAPSHOT (report + metrics) every N bars
+    summary_every_bars: int = 0
+    # 回放速度：1 = 按 bar 时间戳实时回放，N = N 倍速，0 = 尽快（不等待）
+    speed: float = 0.0
+    # lag above this many ms logs REPLAY_BEHIND (only with speed > 0)
+    behind_ms: float = 1000.0
+    # periodic snapshots; pick them up with DryRunMode.warm_start(directory)
+    checkpoint: Optional[CheckpointConfig] = None
+
+
+class _PacedData:
+    """Holds each bar until its replay slot; per-bar only (no stream_batch), everything else delegates."""
+
+    def __init__(self, inner: DataHandler, pacer: ReplayPacer) -> None:
+        self._inner = inner
+        self._wait = pacer.wait
+
+    def has_next(self) -> bool:
+        return self._inner.has_next()
+
+    def stream_next(self) -> MarketEvent:
+        event = self._inner.stream_next()
+        self._wait(event.timestamp_ms)
+        return event
+
+    def __getattr__(self, name: str) -> Any:
+        if name == "stream_batch":
+            raise AttributeError(name)
+        return getattr(self._inner, name)
 
 @dataclass
 class DryRunMode:
+    """
+    Replays the data handler through the EventLoop without forced flatten.
+    With config.speed > 0 bars are released on a wall-clock schedule (see ReplayPacer) and the lag
+    behind that schedule is recorded as the replay.lag latency stage and in replay_stats().
+    """
     loop: EventLoop
     config: DryRunConfig = field(default_factory=DryRunConfig)
+    # pacing clock; None = WallClock (tests inject a SimulatedClock)
+    clock: Optional[Clock] = None
+    _start_bars: int = field(default=0, init=False, repr=False)
+
+    REPLAY_LAG = "replay.lag"
+
+    @classmethod
+    def warm_start(
+        cls,
+        path: str | Path,
+        data: Optional[DataHandler] = None,
+        config: Optional[DryRunConfig] = None,
+        execution: Optional[ExecutionHandler] = None,
+        clock: Optional[Clock] = None,
+    ) -> "DryRunMode":
+        """
+        Session from a checkpoint file (or the newest one in a directory), e.g. the end of a backtest.
+        Strategy, portfolio and pending events carry over. data=None resumes the checkpointed data
+        handler; otherwise `data` (and `execution`, if given) replace the saved ones.
+        """
+        ckpt = resolve_checkpoint(path)
+        loop, meta = load_checkpoint(ckpt)
+        if data is not None:
+            loop.data = data
+        if execution is not None:
+            loop.execution = execution
+        loop.rebind()
+        get_logger("mode.dryrun").info("DRYRUN_WARM_START path=%s bars=%s resume=%s", ckpt, meta.get("bars"), data is None)
+        mode = cls(loop=loop, config=config or DryRunConfig(), clock=clock)
+        if data is None:
+            mode._start_bars = int(meta.get("bars", 0))
+        return mode
+
+    def __post_init__(self) -> None:
+        self.pacer: Optional[ReplayPacer] = None
+        if self.config.speed > 0:
+            lat = self.loop.latency
+            self.pacer = ReplayPacer(
+                speed=self.config.speed,
+                clock=self.clock,
+                behind_ms=self.config.behind_ms,
+                lag=lat.histogram(self.REPLAY_LAG) if lat is not None else LatencyHistogram(),
+            )
 
     def run(self) -> None:
         log = get_logger("mode.dryrun")
-        log.info("DRYRUN_START")
+        log.info("DRYRUN_START speed=%s", self.config.speed or "max")
 
-        self.loop.run_until_data_end()
+        if self.config.summary_every_bars > 0:
+            self._bars = 0
+            self.loop.subscribe(EventType.MARKET, self._on_bar)
+
+        data = self.loop.data
+        ckpt = None
+        if self.config.checkpoint is not None:
+            # checkpoint 包在最里层：存盘时只 pickle 原始 data handler
+            ckpt = Checkpointer(self.loop, self.config.checkpoint, self._start_bars, meta={"mode": "dryrun"})
+            ckpt.attach()
+        if self.pacer is not None:
+            self.loop.data = _PacedData(self.loop.data, self.pacer)  # type: ignore[assignment]
+        try:
+            self.loop.run_until_data_end()
+        finally:
+            if ckpt is not None:
+                ckpt.detach()
+            self.loop.data = data
+            if self.pacer is not None:
+                self.pacer.finish()
+                log.info("REPLAY_DONE %s", self.pacer.stats())
+        if ckpt is not None and ckpt.config.on_end:
+            ckpt.save(end=True)
 
         if self.config.emit_summary:
             pos = getattr(self.loop.portfolio, "position", 0)
             log.info("DRYRUN_DONE final_position=%s", pos)
             print(f"DryRun done. Final position: {pos}")
+            if hasattr(self.loop.portfolio, "report"):
+                log.info("PERF_SUMMARY %s", self.loop.portfolio.report())  # type: ignore[attr-defined]
+            if hasattr(self.loop.portfolio, "metrics"):
+                log.info("PERF_METRICS %s", self.loop.portfolio.metrics())  # type: ignore[attr-defined]
+            emit_latency_summary(getattr(self.loop, "latency", None), log)
         else:
             log.info("DRYRUN_DONE")
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Intermediate report + metrics; cheap enough to call at any time during a session."""
+        out: Dict[str, Any] = {}
+        if hasattr(self.loop.portfolio, "report"):
+            out.update(self.loop.portfolio.report())  # type: ignore[attr-defined]
+        if hasattr(self.loop.portfolio, "metrics"):
+            out.update(self.loop.portfolio.metrics())  # type: ignore[attr-defined]
+        if self.pacer is not None:
+            out["replay"] = self.pacer.stats()
+        return out
+
+    def replay_stats(self) -> Dict[str, Any]:
+        """Pacing stats (speed, lag percentiles, effective speed); empty at max speed."""
+        return self.pacer.stats() if self.pacer is not None else {}
+
+    def _on_bar(self, event: MarketEvent) -> None:
+        self._bars += 1
+        if self._bars % self.config.summary_every_bars == 0:
+            get_logger("mode.dryrun").info("PERF_SNAPSHOT bars=%s %s", self._bars, self.snapshot())
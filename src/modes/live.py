@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.core.events import EventType, MarketEvent, SignalEvent
+from src.data.live_feed import Sink
+from src.engine.event_loop import EventLoop
+from src.utils.latency import LatencyRecorder, emit_latency_summary
+from src.utils.logging import get_logger
+
+
+class AsyncDataHandler:
+    """Push-based feed: run() calls sink(event, recv_ns) per bar and returns at end of stream."""
+    async def run(self, sink: Sink) -> None: ...
+
+
+@dataclass
+class LiveConfig:
+    """
+    Live session behavior.
+    - queue_size: receive -> strategy buffer; when full the oldest bar is dropped (counted in `dropped`)
+    - max_messages / duration_s: stop after that many bars / seconds (0 = until the feed ends)
+    - offload (default): strategy/portfolio/execution run in a worker thread, so socket reads and
+      heartbeat checks never wait on them; each chunk costs a thread hand-off
+    - offload=False: handlers run on the asyncio loop, at most `inline_chunk` bars between yields;
+      lower per-bar overhead, but the receive path stalls while a chunk is processed
+    - stats_every_s: log LIVE_STATS periodically (0 = only at the end)
+    """
+    queue_size: int = 10_000
+    max_messages: int = 0
+    duration_s: float = 0.0
+    offload: bool = True
+    inline_chunk: int = 16
+    stats_every_s: float = 0.0
+
+
+@dataclass
+class LiveMode:
+    """
+    asyncio session: the feed task only parses and enqueues; a consumer task drains the queue in
+    chunks and pushes each bar through the EventLoop dispatch table (same handlers as backtest/dryrun).
+    Latency stages (perf_counter_ns from feed parse):
+    - live.tick_to_signal: parse -> strategy signal
+    - live.tick_to_done: parse -> bar fully processed (signal, order, fill)
+    """
+    loop: EventLoop
+    feed: AsyncDataHandler
+    config: LiveConfig = field(default_factory=LiveConfig)
+
+    TICK_TO_SIGNAL = "live.tick_to_signal"
+    TICK_TO_DONE = "live.tick_to_done"
+
+    def __post_init__(self) -> None:
+        self._log = get_logger("mode.live")
+        self.latency = self.loop.latency or LatencyRecorder()
+        self._to_signal = self.latency.histogram(self.TICK_TO_SIGNAL).record
+        self._to_done = self.latency.histogram(self.TICK_TO_DONE).record
+        self._recv_ns = 0
+        self.received = 0
+        self.processed = 0
+        self.dropped = 0
+        self.signals = 0
+        self._t0 = 0.0
+
+    def run(self) -> Dict[str, Any]:
+        return asyncio.run(self.run_async())
+
+    async def run_async(self) -> Dict[str, Any]:
+        log = self._log
+        log.info("LIVE_START")
+        self.loop.subscribe(EventType.SIGNAL, self._on_signal, first=True)
+        self._queue: asyncio.Queue[Optional[Tuple[MarketEvent, int]]] = asyncio.Queue(self.config.queue_size)
+        self._t0 = time.perf_counter()
+
+        consumer = asyncio.create_task(self._consume())
+        feed = asyncio.create_task(self._feed())
+        stats = asyncio.create_task(self._stats()) if self.config.stats_every_s > 0 else None
+        try:
+            timeout = self.config.duration_s or None
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(asyncio.shield(consumer), timeout)
+        finally:
+            for task in (feed, stats, consumer):
+                if task is not None and not task.done():
+                    task.cancel()
+            await asyncio.gather(feed, consumer, *(t for t in (stats,) if t), return_exceptions=True)
+            if feed.done() and not feed.cancelled() and feed.exception() is not None:
+                log.error("LIVE_FEED_FAILED err=%s", feed.exception())
+
+        out = self.stats()
+        log.info("LIVE_DONE %s", out)
+        if hasattr(self.loop.portfolio, "report"):
+            log.info("PERF_SUMMARY %s", self.loop.portfolio.report())  # type: ignore[attr-defined]
+        emit_latency_summary(self.latency, log)
+        if feed.done() and not feed.cancelled() and feed.exception() is not None:
+            raise feed.exception()  # type: ignore[misc]
+        return out
+
+    def stats(self) -> Dict[str, Any]:
+        elapsed = time.perf_counter() - self._t0 if self._t0 else 0.0
+        out: Dict[str, Any] = {
+            "received": self.received,
+            "processed": self.processed,
+            "dropped": self.dropped,
+            "signals": self.signals,
+            "elapsed_s": elapsed,
+            "msgs_per_s": self.processed / elapsed if elapsed > 0 else 0.0,
+        }
+        for name in ("reconnects", "heartbeats", "malformed"):
+            if hasattr(self.feed, name):
+                out[name] = getattr(self.feed, name)
+        return out
+
+    # --- receive path --------------------------------------------------------------------------
+
+    def _on_message(self, event: MarketEvent, recv_ns: int) -> None:
+        """Feed sink; never waits: a full queue drops its oldest bar."""
+        self.received += 1
+        q = self._queue
+        if q.full():
+            q.get_nowait()
+            self.dropped += 1
+        q.put_nowait((event, recv_ns))
+
+    async def _feed(self) -> None:
+        try:
+            await self.feed.run(self._on_message)
+        finally:
+            # 结束标记：消费者处理完已收到的 bar 后退出
+            if self._queue.full():
+                self._queue.get_nowait()
+                self.dropped += 1
+            self._queue.put_nowait(None)
+
+    # --- strategy path -------------------------------------------------------------------------
+
+    async def _consume(self) -> None:
+        q = self._queue
+        limit = self.config.max_messages
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="live") if self.config.offload else None
+        aio = asyncio.get_running_loop()
+        # 不 offload 时一次只在事件循环上跑一小段，跑完就让出给接收协程
+        max_chunk = 256 if executor is not None else max(int(self.config.inline_chunk), 1)
+        try:
+            while True:
+                item = await q.get()
+                chunk: List[Tuple[MarketEvent, int]] = []
+                done = item is None
+                if not done:
+                    chunk.append(item)  # type: ignore[arg-type]
+                    while not q.empty() and len(chunk) < max_chunk:
+                        nxt = q.get_nowait()
+                        if nxt is None:
+                            done = True
+                            break
+                        chunk.append(nxt)
+                if limit:
+                    chunk = chunk[: max(limit - self.processed, 0)]
+                if chunk:
+                    if executor is not None:
+                        await aio.run_in_executor(executor, self._process, chunk)
+                    else:
+                        self._process(chunk)
+                        await asyncio.sleep(0)  # 让出给接收协程
+                if done or (limit and self.processed >= limit):
+                    return
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True)
+
+    def _process(self, chunk: List[Tuple[MarketEvent, int]]) -> None:
+        loop = self.loop
+        put = loop.queue.put
+        drain = loop.drain
+        clock = time.perf_counter_ns
+        to_done = self._to_done
+        advance = loop.clock.advance_to if loop.clock is not None else None
+        # 同 run_until_data_end：每根 bar 处理完清掉 market 起点，market_to_fill 按 bar 计
+        end_market = loop.latency.end_market if loop.latency is not None else None
+        for event, recv_ns in chunk:
+            self._recv_ns = recv_ns
+            loop.last_ts_ms = event.timestamp_ms
+            if advance is not None:
+                advance(event.timestamp_ms)
+            put(event)
+            drain()
+            if end_market is not None:
+                end_market()
+            to_done(clock() - recv_ns)
+        self.processed += len(chunk)
+
+    def _on_signal(self, event: SignalEvent) -> None:
+        self.signals += 1
+        self._to_signal(time.perf_counter_ns() - self._recv_ns)
+
+    async def _stats(self) -> None:
+        while True:
+            await asyncio.sleep(self.config.stats_every_s)
+            self._log.info("LIVE_STATS %s", self.stats())
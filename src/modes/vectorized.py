@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, Protocol, Tuple
+
+import numpy as np
+
+from src.core.events import Side
+from src.data.bars import BarArrays
+from src.core.costs import CostModel
+from src.portfolio.commission import CommissionModel, ZeroCommission
+from src.utils.logging import get_logger
+
+
+class VectorizedStrategy(Protocol):
+    def generate_signals(self, bars: BarArrays) -> np.ndarray:
+        """Per-bar signals: +1 LONG, -1 EXIT, 0 none."""
+        ...
+
+
+@dataclass
+class VectorizedConfig:
+    """
+    Mirrors the event-driven stack PerformancePortfolio + PaperExecution:
+    - LONG while flat buys `order_qty`, EXIT while long sells everything
+    - fills at the signal bar's close
+    - per-fill commission = commission_per_trade, or commission_model when that is <= 0
+    - a CostModel as commission_model also applies its slippage to the fill price, with the signal
+      bar's volume as the participation base
+    """
+    initial_cash: float = 100_000.0
+    order_qty: int = 10
+    commission_per_trade: float = 0.0
+    commission_model: CommissionModel = field(default_factory=ZeroCommission)
+    flatten_on_end: bool = True
+
+
+@dataclass
+class VectorizedResult:
+    summary: Dict[str, Any]
+    # one row per PerformanceTracker mark (each bar, then each fill)
+    equity_timestamp_ms: np.ndarray
+    equity: np.ndarray
+    cash: np.ndarray
+    position: np.ndarray
+    last_price: np.ndarray
+    # one row per fill
+    fill_index: np.ndarray
+    fill_side: np.ndarray  # +1 BUY, -1 SELL
+    fill_qty: np.ndarray
+    fill_price: np.ndarray
+    fill_commission: np.ndarray
+
+
+def _target_positions(signals: np.ndarray, qty: int) -> np.ndarray:
+    """Forward-fill the last LONG/EXIT: LONG while long and EXIT while flat are no-ops."""
+    n = signals.shape[0]
+    idx = np.where(signals != 0, np.arange(n), -1)
+    np.maximum.accumulate(idx, out=idx)
+    last = np.where(idx >= 0, signals[np.maximum(idx, 0)], 0)
+    return np.where(last > 0, qty, 0).astype(np.int64)
+
+
+@dataclass
+class VectorizedBacktestMode:
+    """
+    Array-at-a-time backtest for single-symbol strategies that implement generate_signals().
+    Produces the same summary dict as PerformanceTracker.summary() for the equivalent
+    EventLoop + BacktestMode run (see src.backtest.parity).
+    """
+    bars: BarArrays
+    strategy: VectorizedStrategy
+    symbol: str = "UNKNOWN"
+    config: VectorizedConfig = field(default_factory=VectorizedConfig)
+
+    def run(self) -> VectorizedResult:
+        log = get_logger("mode.vectorized")
+        log.info("VECTORIZED_START bars=%s", len(self.bars))
+
+        result = self.compute()
+
+        log.info("VECTORIZED_DONE final_position=%s", result.summary["final_position"])
+        log.info("PERF_SUMMARY %s", result.summary)
+        return result
+
+    def compute(self) -> VectorizedResult:
+        cfg = self.config
+        bars = self.bars
+        n = len(bars)
+        close = np.asarray(bars.close, dtype=np.float64)
+        ts = np.asarray(bars.timestamp_ms, dtype=np.int64)
+
+        signals = np.asarray(self.strategy.generate_signals(bars))
+        target = _target_positions(signals, int(cfg.order_qty))
+        before = np.zeros(n, dtype=np.int64)
+        before[1:] = target[:-1]
+
+        fill_index = np.flatnonzero(target != before)
+        delta = target[fill_index] - before[fill_index]
+        if cfg.flatten_on_end and n and target[-1] != 0:
+            fill_index = np.append(fill_index, n - 1)
+            delta = np.append(delta, -target[-1])
+
+        fill_side = np.sign(delta).astype(np.int8)
+        fill_qty = np.abs(delta).astype(np.int64)
+        fill_price, fill_commission = self._fill_costs(
+            fill_side, fill_qty, close[fill_index], np.asarray(bars.volume, dtype=np.float64)[fill_index],
+        )
+
+        # cash after each fill, accumulated in the same order as PerformanceTracker.on_fill
+        notional = fill_qty * fill_price
+        flows = np.where(fill_side > 0, -(notional + fill_commission), notional - fill_commission)
+        cash_after = np.cumsum(np.concatenate(([float(cfg.initial_cash)], flows)))[1:]
+        pos_after = np.cumsum(delta)
+
+        # merge marks: bar i, then the fills of bar i
+        k = fill_index.shape[0]
+        fills_before_bar = np.searchsorted(fill_index, np.arange(n), side="left")
+        bar_slot = np.arange(n) + fills_before_bar
+        fill_slot = fill_index + 1 + np.arange(k)
+        total = n + k
+
+        prev_fill = fills_before_bar - 1
+        if k:
+            cash_at_bar = np.where(prev_fill >= 0, cash_after[np.maximum(prev_fill, 0)], float(cfg.initial_cash))
+            pos_at_bar = np.where(prev_fill >= 0, pos_after[np.maximum(prev_fill, 0)], 0)
+        else:
+            cash_at_bar = np.full(n, float(cfg.initial_cash))
+            pos_at_bar = np.zeros(n, dtype=np.int64)
+
+        eq_ts = np.empty(total, dtype=np.int64)
+        cash = np.empty(total, dtype=np.float64)
+        position = np.empty(total, dtype=np.int64)
+        price = np.empty(total, dtype=np.float64)
+
+        eq_ts[bar_slot], eq_ts[fill_slot] = ts, ts[fill_index]
+        cash[bar_slot], cash[fill_slot] = cash_at_bar, cash_after
+        position[bar_slot], position[fill_slot] = pos_at_bar, pos_after
+        price[bar_slot], price[fill_slot] = close, fill_price
+        equity = cash + position * price
+
+        summary = self._summary(equity, cash, position, price, fill_commission)
+        return VectorizedResult(
+            summary=summary,
+            equity_timestamp_ms=eq_ts,
+            equity=equity,
+            cash=cash,
+            position=position,
+            last_price=price,
+            fill_index=fill_index,
+            fill_side=fill_side,
+            fill_qty=fill_qty,
+            fill_price=fill_price,
+            fill_commission=fill_commission,
+        )
+
+    def _fill_costs(
+        self, side: np.ndarray, qty: np.ndarray, price: np.ndarray, volume: np.ndarray,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """(fill prices, commissions) for all fills in one call."""
+        model = self.config.commission_model
+        if isinstance(model, CostModel) and model.slippage:
+            costs = model.apply_arrays(qty, price, side, volume)
+            price = costs["fill_price"]
+        per_trade = float(self.config.commission_per_trade)
+        if per_trade > 0.0:
+            return price, np.full(qty.shape[0], per_trade, dtype=np.float64)
+        calc_array = getattr(model, "calc_array", None)
+        if calc_array is not None:
+            return price, np.asarray(calc_array(qty, price, side), dtype=np.float64)
+        # duck-typed models with only the scalar calc()
+        return price, np.array(
+            [
+                float(model.calc(symbol=self.symbol, qty=int(q), price=float(p), side=Side.BUY if s > 0 else Side.SELL))
+                for s, q, p in zip(side.tolist(), qty.tolist(), price.tolist())
+            ],
+            dtype=np.float64,
+        )
+
+    def _summary(
+        self,
+        equity: np.ndarray,
+        cash: np.ndarray,
+        position: np.ndarray,
+        price: np.ndarray,
+        commission: np.ndarray,
+    ) -> Dict[str, Any]:
+        initial_cash = self.config.initial_cash
+        max_drawdown = 0.0
+        if equity.shape[0]:
+            peak = np.maximum.accumulate(np.concatenate(([float(initial_cash)], equity)))[1:]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                dd = np.where(peak == 0, 0.0, (peak - equity) / peak)
+            max_drawdown = max(0.0, float(dd.max()))
+
+        last_equity = float(equity[-1]) if equity.shape[0] else float(initial_cash)
+        total_pnl = last_equity - initial_cash
+        return {
+            "initial_cash": initial_cash,
+            "final_equity": last_equity,
+            "total_pnl": total_pnl,
+            "total_return": 0.0 if initial_cash == 0 else total_pnl / initial_cash,
+            "max_drawdown": max_drawdown,
+            "trades": int(commission.shape[0]),
+            "final_position": int(position[-1]) if position.shape[0] else 0,
+            "last_price": float(price[-1]) if price.shape[0] else 0.0,
+            "total_commission": sum(commission.tolist()),
+            "cash": float(cash[-1]) if cash.shape[0] else float(initial_cash),
+        }
@@ -1,39 +1,29 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Protocol, Optional
+from typing import Optional
+
+import numpy as np
+
+from src.core.costs import FeeModel, PercentFee
+
+# 统一到 src.core.costs；这里保留旧名字，兼容已有 import
+CommissionModel = FeeModel
 
-class CommissionModel(Protocol):
-    def calc(self, *, symbol: str, qty: int, price: float, side: object) -> float:
-        """Return commission for this fill. Must be >= 0."""
-        ...
 
 @dataclass(frozen=True)
-class ZeroCommission:
-    def calc(self, *, symbol: str, qty: int, price: float, side: object) -> float:
+class ZeroCommission(FeeModel):
+    def calc(self, qty: int, price: float, side: Optional[object] = None, symbol: str = "") -> float:
         return 0.0
 
+    def calc_array(self, qty: np.ndarray, price: np.ndarray, side: np.ndarray) -> np.ndarray:
+        return np.zeros(np.shape(qty), dtype=np.float64)
+
+
 @dataclass(frozen=True)
-class PercentNotionalCommission:
+class PercentNotionalCommission(PercentFee):
     """
     Commission = max(min_fee, min(max_fee, notional * rate))
     - rate: e.g. 0.0003 means 0.03% (3 bps)
     - min_fee/max_fee: in cash currency
     """
-    rate: float = 0.0
-    min_fee: float = 0.0
-    max_fee: Optional[float] = None
-
-    def calc(self, *, symbol: str, qty: int, price: float, side: object) -> float:
-        notional = float(qty) * float(price)
-        fee = notional * float(self.rate)
-
-        if fee < self.min_fee:
-            fee = self.min_fee
-        if self.max_fee is not None and fee > self.max_fee:
-            fee = self.max_fee
-
-        # Guard
-        if fee < 0:
-            fee = 0.0
-        return float(fee)
@@ -1,11 +1,13 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Optional
-from src.backtest.performance import PerformanceTracker
+from typing import Dict, List, Optional
+from src.backtest.performance import CurveSampling, PerformanceTracker
+from src.backtest.results import ResultsSink
 from src.portfolio.commission import CommissionModel, ZeroCommission, PercentNotionalCommission
+from src.portfolio.position_book import Position
 from src.core.events import (
-    MarketEvent, SignalEvent, OrderEvent, FillEvent,
+    BarBatch, MarketEvent, SignalEvent, OrderEvent, FillEvent,
     EventType, SignalType, Side, OrderType,
 )
 import logging
@@ -14,18 +16,61 @@ import logging
 class PerformancePortfolio:
     initial_cash: float = 100_000.0
     tracker: PerformanceTracker = field(init=False)
-    position: int = 0
     commission_model: CommissionModel = field(default_factory = ZeroCommission)
+    order_qty: int = 10
+    # equity curve downsampling; summary/report are unaffected
+    curve_sampling: CurveSampling = field(default_factory=CurveSampling)
 
     def __post_init__(self) -> None:
-        self.tracker = PerformanceTracker(initial_cash=self.initial_cash)
+        self.tracker = PerformanceTracker(initial_cash=self.initial_cash, sampling=self.curve_sampling)
+        self._sink: Optional[ResultsSink] = None
+
+    def attach_sink(self, sink: ResultsSink) -> None:
+        """Stream equity curve, trades and fills to `sink`; close it with sink.close(summary, tracker)."""
+        self._sink = sink
+        self.tracker.attach_sink(sink)
+
+    @property
+    def sink(self) -> Optional[ResultsSink]:
+        return self._sink
+
+    @property
+    def position(self) -> int:
+        """Net quantity across all symbols."""
+        return self.tracker.position
+
+    @property
+    def positions(self) -> Dict[str, int]:
+        """Non-zero quantities by symbol."""
+        return self.tracker.book.positions()
+
+    def position_of(self, symbol: str) -> Position:
+        return self.tracker.book.get(symbol)
+
+    def position_snapshot(self) -> List[Position]:
+        """qty / avg cost / realized / unrealized PnL for every symbol traded so far."""
+        return self.tracker.book.snapshot()
+
+    def _qty(self, symbol: str) -> int:
+        sid = self.tracker.book.find(symbol)
+        return self.tracker.book.qty[sid] if sid is not None else 0
 
     def on_market(self, event: MarketEvent) -> None:
         # mark-to-market using close
-        self.tracker.on_market(timestamp_ms=event.timestamp_ms, price=event.close)
+        self.tracker.on_market(timestamp_ms=event.timestamp_ms, price=event.close, symbol=event.symbol)
+
+    def on_market_batch(self, batch: BarBatch, start: int, stop: int) -> None:
+        """Mark bars [start, stop) of a batch, same as on_market per bar."""
+        on_market = self.tracker.on_market
+        symbol = batch.symbol
+        ts = batch.bars.timestamp_ms[start:stop].tolist()
+        close = batch.bars.close[start:stop].tolist()
+        for t, c in zip(ts, close):
+            on_market(t, c, symbol)
 
     def on_signal(self, event: SignalEvent) -> Optional[OrderEvent]:
-        if event.signal == SignalType.LONG and self.position == 0:
+        position = self._qty(event.symbol)
+        if event.signal == SignalType.LONG and position == 0:
             return OrderEvent(
                 type = EventType.ORDER,
                 timestamp_ms = event.timestamp_ms,
@@ -33,33 +78,28 @@ class PerformancePortfolio:
                 client_order_id = f"cid-{event.timestamp_ms}",
                 side = Side.BUY,
                 order_type = OrderType.MKT,
-                qty = 10,
+                qty = self.order_qty,
                 limit_price = 0.0,
                 strategy_id = event.strategy_id,
             )
 
-        if event.signal == SignalType.EXIT and self.position != 0:
+        if event.signal == SignalType.EXIT and position != 0:
             return OrderEvent(
                 type = EventType.ORDER,
                 timestamp_ms = event.timestamp_ms,
                 symbol = event.symbol,
                 client_order_id = f"cid-{event.timestamp_ms}",
-                side = Side.SELL,
+                side = Side.SELL if position > 0 else Side.BUY,
                 order_type = OrderType.MKT,
-                qty = abs(self.position),
+                qty = abs(position),
                 limit_price = 0.0,
                 strategy_id = event.strategy_id,
             )
         return None
 
     def on_fill(self, event: FillEvent) -> None:
-        # update position
-        if event.side == Side.BUY:
-            self.position += event.fill_qty
-            side = "BUY"
-        else:
-            self.position -= event.fill_qty
-            side = "SELL"
+        # position is updated by the tracker's book
+        side = "BUY" if event.side == Side.BUY else "SELL"
 
         commission = float(getattr(event, "commission", 0.0) or 0.0)
         if commission <= 0.0:
@@ -86,9 +126,12 @@ class PerformancePortfolio:
             price = event.fill_price,
             commission = commission,
         )
+        if self._sink is not None:
+            self._sink.on_fill(event, commission)
 
         #log = logging.getLogger("portfolio.performance")
-        
+        if not log.isEnabledFor(logging.INFO):
+            return
         log.info(
             "PERF_TRACKER_APPLIED_FILL",
             extra={
@@ -103,3 +146,7 @@ class PerformancePortfolio:
 
     def report(self) -> dict:
         return self.tracker.summary()
+
+    def metrics(self) -> dict:
+        """Streaming risk/return metrics; O(1), safe to call mid-run."""
+        return self.tracker.metrics()
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+
+@dataclass(frozen=True)
+class Position:
+    """Read-only snapshot of one symbol's book entry."""
+    symbol: str
+    qty: int
+    avg_cost: float
+    last_price: float
+    realized_pnl: float
+    unrealized_pnl: float
+
+
+class PositionBook:
+    """
+    Per-symbol positions indexed by an interned symbol id.
+    - qty / avg_cost / realized PnL / last mark price are kept in parallel lists
+    - `market_value` (sum of qty * last_price) is updated incrementally, so mark() is O(1)
+      regardless of how many symbols are held
+    - realized PnL is gross of commission; avg_cost resets to the fill price on a flip
+    """
+
+    __slots__ = (
+        "_ids", "_symbols", "qty", "avg_cost", "last_price", "realized",
+        "market_value", "net_qty", "open_count", "realized_pnl",
+    )
+
+    def __init__(self) -> None:
+        self._ids: Dict[str, int] = {}
+        self._symbols: List[str] = []
+        self.qty: List[int] = []
+        self.avg_cost: List[float] = []
+        self.last_price: List[float] = []
+        self.realized: List[float] = []
+        self.market_value = 0.0
+        self.net_qty = 0
+        self.open_count = 0
+        self.realized_pnl = 0.0
+
+    def __len__(self) -> int:
+        return len(self._symbols)
+
+    def symbol_id(self, symbol: str) -> int:
+        """Id of `symbol`, allocating a flat entry on first use."""
+        sid = self._ids.get(symbol)
+        if sid is None:
+            sid = self._ids[symbol] = len(self._symbols)
+            self._symbols.append(symbol)
+            self.qty.append(0)
+            self.avg_cost.append(0.0)
+            self.last_price.append(0.0)
+            self.realized.append(0.0)
+        return sid
+
+    def find(self, symbol: str) -> Optional[int]:
+        return self._ids.get(symbol)
+
+    def symbol(self, sid: int) -> str:
+        return self._symbols[sid]
+
+    @property
+    def symbols(self) -> List[str]:
+        return list(self._symbols)
+
+    def _revalue(self, sid: int, old_value: float, new_value: float) -> None:
+        if self.open_count == 0:
+            self.market_value = 0.0
+        elif self.open_count == 1 and self.qty[sid]:
+            # 只剩一个持仓时直接重算，避免增量累加的浮点漂移
+            self.market_value = new_value
+        else:
+            self.market_value += new_value - old_value
+
+    def mark(self, sid: int, price: float) -> None:
+        """New price for one symbol; O(1)."""
+        q = self.qty[sid]
+        if q:
+            self._revalue(sid, q * self.last_price[sid], q * price)
+        self.last_price[sid] = price
+
+    def apply_fill(self, sid: int, signed_qty: int, price: float) -> float:
+        """Apply a fill (+ buy / - sell) at `price`, mark the symbol there; returns realized PnL."""
+        q0 = self.qty[sid]
+        q1 = q0 + signed_qty
+        old_value = q0 * self.last_price[sid]
+        realized = 0.0
+
+        if q0 == 0 or (q0 > 0) == (signed_qty > 0):
+            # 开仓 / 加仓：加权平均成本
+            if q1:
+                self.avg_cost[sid] = (self.avg_cost[sid] * abs(q0) + price * abs(signed_qty)) / abs(q1)
+        else:
+            closed = min(abs(signed_qty), abs(q0))
+            realized = closed * (price - self.avg_cost[sid]) * (1 if q0 > 0 else -1)
+            if q1 == 0:
+                self.avg_cost[sid] = 0.0
+            elif (q1 > 0) != (q0 > 0):
+                self.avg_cost[sid] = price
+
+        self.qty[sid] = q1
+        self.last_price[sid] = price
+        self.net_qty += signed_qty
+        if q0 == 0 and q1 != 0:
+            self.open_count += 1
+        elif q0 != 0 and q1 == 0:
+            self.open_count -= 1
+        self._revalue(sid, old_value, q1 * price)
+
+        self.realized[sid] += realized
+        self.realized_pnl += realized
+        return realized
+
+    def unrealized(self, sid: int) -> float:
+        q = self.qty[sid]
+        return q * (self.last_price[sid] - self.avg_cost[sid]) if q else 0.0
+
+    def get(self, symbol: str) -> Position:
+        sid = self._ids.get(symbol)
+        if sid is None:
+            return Position(symbol, 0, 0.0, 0.0, 0.0, 0.0)
+        return Position(
+            symbol=symbol,
+            qty=self.qty[sid],
+            avg_cost=self.avg_cost[sid],
+            last_price=self.last_price[sid],
+            realized_pnl=self.realized[sid],
+            unrealized_pnl=self.unrealized(sid),
+        )
+
+    def positions(self) -> Dict[str, int]:
+        """Non-zero quantities by symbol; O(symbols), meant for reporting / end of run."""
+        return {s: q for s, q in zip(self._symbols, self.qty) if q}
+
+    def snapshot(self) -> List[Position]:
+        """Every symbol ever traded, flat ones included."""
+        return [self.get(s) for s in self._symbols]
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from typing import Dict, Optional
+
+from src.core.events import EventType, MarketEvent, SignalEvent, SignalType
+from src.strategy.indicators import Indicator, IndicatorSet
+
+
+class Strategy:
+    """
+    Base strategy.
+    Indicators registered in `self.indicators` are updated once per MarketEvent,
+    then on_bar() receives the symbol's indicators by name.
+    """
+    strategy_id: str = "base"
+
+    def __init__(self) -> None:
+        self.indicators = IndicatorSet()
+
+    def on_market(self, event: MarketEvent) -> Optional[SignalEvent]:
+        return self.on_bar(event, self.indicators.update(event))
+
+    def on_bar(self, event: MarketEvent, indicators: Dict[str, Indicator]) -> Optional[SignalEvent]:
+        raise NotImplementedError
+
+    def signal(self, event: MarketEvent, signal: SignalType, strength: float = 1.0) -> SignalEvent:
+        return SignalEvent(
+            type=EventType.SIGNAL,
+            timestamp_ms=event.timestamp_ms,
+            symbol=event.symbol,
+            signal=signal,
+            strength=strength,
+            strategy_id=self.strategy_id,
+        )
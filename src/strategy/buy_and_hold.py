@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import List, Optional, Set, Tuple
+
+import numpy as np
+
+from src.core.events import BarBatch, EventType, MarketEvent, SignalEvent, SignalType
+from src.data.bars import BarArrays
+from src.strategy.base import Strategy
+
+
+@dataclass
+class BuyAndHold(Strategy):
+    """
+    LONG once on each symbol's first bar, then hold (the run's flatten closes the position).
+    qty is the intended position size; the portfolio sizes the order, so the engine uses it as
+    the portfolio's order_qty when the config doesn't set one.
+    """
+    qty: int = 0
+    strategy_id: str = "buy_and_hold"
+
+    def __post_init__(self) -> None:
+        if self.qty < 0:
+            raise ValueError(f"qty must be >= 0, got {self.qty}")
+        Strategy.__init__(self)
+        self._entered: Set[str] = set()
+
+    def on_market(self, event: MarketEvent) -> Optional[SignalEvent]:
+        # 不需要指标：跳过 IndicatorSet.update
+        if event.symbol in self._entered:
+            return None
+        self._entered.add(event.symbol)
+        return self.signal(event, SignalType.LONG)
+
+    def on_market_batch(self, batch: BarBatch) -> List[Tuple[int, SignalEvent]]:
+        if batch.symbol in self._entered or not len(batch.bars):
+            return []
+        self._entered.add(batch.symbol)
+        return [(0, SignalEvent(
+            type=EventType.SIGNAL,
+            timestamp_ms=batch.bars.timestamp_ms.item(0),
+            symbol=batch.symbol,
+            signal=SignalType.LONG,
+            strategy_id=self.strategy_id,
+        ))]
+
+    def generate_signals(self, bars: BarArrays) -> np.ndarray:
+        """Per-bar signal array: +1 on the first bar, 0 after."""
+        out = np.zeros(len(bars), dtype=np.int8)
+        out[:1] = 1
+        return out
@@ -0,0 +1,329 @@
+from __future__ import annotations
+
+import math
+from collections import deque
+from typing import TYPE_CHECKING, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from src.core.events import MarketEvent
+
+if TYPE_CHECKING:
+    from src.data.bars import BarArrays
+
+
+class Indicator:
+    """
+    Streaming indicator: O(1) update per bar.
+    - update(event): feed one MarketEvent (scalar indicators read `source`, default close)
+    - push(x): feed a raw value (scalar indicators only)
+    - value: latest value, None until `ready`
+    """
+    value: Optional[float] = None
+    source: str = "close"
+
+    @property
+    def ready(self) -> bool:
+        return self.value is not None
+
+    def update(self, event: MarketEvent) -> Optional[float]:
+        return self.push(getattr(event, self.source))
+
+    def push(self, x: float) -> Optional[float]:
+        raise NotImplementedError
+
+    def bind(self, bars: BarArrays) -> Callable[[int], Optional[float]]:
+        """Updater for a block of bars: calling it with i feeds bar i (same values as update())."""
+        col = getattr(bars, self.source).tolist()
+        push = self.push
+        return lambda i: push(col[i])
+
+
+class SMA(Indicator):
+    """Simple moving average. Running sum: add the new value, then drop the oldest."""
+
+    def __init__(self, window: int, source: str = "close") -> None:
+        if window <= 0:
+            raise ValueError("window must be > 0")
+        self.window = int(window)
+        self.source = source
+        self.value = None
+        self._values: Deque[float] = deque()
+        self._sum = 0.0
+
+    def push(self, x: float) -> Optional[float]:
+        values = self._values
+        values.append(x)
+        self._sum += x
+        if len(values) > self.window:
+            self._sum += -values.popleft()
+        if len(values) < self.window:
+            return None
+        self.value = self._sum / self.window
+        return self.value
+
+
+class EMA(Indicator):
+    """Exponential moving average, alpha = 2 / (window + 1), seeded with the SMA of the first window values."""
+
+    def __init__(self, window: int, source: str = "close") -> None:
+        if window <= 0:
+            raise ValueError("window must be > 0")
+        self.window = int(window)
+        self.alpha = 2.0 / (self.window + 1)
+        self.source = source
+        self.value = None
+        self._n = 0
+        self._seed = 0.0
+
+    def push(self, x: float) -> Optional[float]:
+        if self.value is not None:
+            self.value += self.alpha * (x - self.value)
+            return self.value
+        self._n += 1
+        self._seed += x
+        if self._n == self.window:
+            self.value = self._seed / self.window
+        return self.value
+
+
+class RollingVariance(Indicator):
+    """Rolling variance over `window` values, Welford updates with removal of the oldest value."""
+
+    def __init__(self, window: int, ddof: int = 1, source: str = "close") -> None:
+        if window <= ddof:
+            raise ValueError("window must be > ddof")
+        self.window = int(window)
+        self.ddof = int(ddof)
+        self.source = source
+        self.value = None
+        self._values: Deque[float] = deque()
+        self._mean = 0.0
+        self._m2 = 0.0
+
+    def push(self, x: float) -> Optional[float]:
+        values = self._values
+        values.append(x)
+        n = len(values)
+        delta = x - self._mean
+        self._mean += delta / n
+        self._m2 += delta * (x - self._mean)
+
+        if n > self.window:
+            old = values.popleft()
+            n -= 1
+            delta = old - self._mean
+            self._mean -= delta / n
+            self._m2 -= delta * (old - self._mean)
+
+        if n < self.window:
+            return None
+        # 累计误差可能让 m2 略小于 0
+        self.value = max(self._m2, 0.0) / (n - self.ddof)
+        return self.value
+
+    @property
+    def mean(self) -> float:
+        return self._mean
+
+
+class RollingStd(RollingVariance):
+    """Rolling standard deviation (sqrt of RollingVariance)."""
+
+    def push(self, x: float) -> Optional[float]:
+        var = super().push(x)
+        if var is None:
+            return None
+        self.value = math.sqrt(var)
+        return self.value
+
+
+class _RollingExtreme(Indicator):
+    """Monotonic deque of (index, value): amortized O(1) per update."""
+
+    _keep_front: Callable[[float, float], bool]
+
+    def __init__(self, window: int, source: str = "close") -> None:
+        if window <= 0:
+            raise ValueError("window must be > 0")
+        self.window = int(window)
+        self.source = source
+        self.value = None
+        self._i = 0
+        self._q: Deque[Tuple[int, float]] = deque()
+
+    def push(self, x: float) -> Optional[float]:
+        q = self._q
+        keep = self._keep_front
+        while q and not keep(q[-1][1], x):
+            q.pop()
+        q.append((self._i, x))
+        if q[0][0] <= self._i - self.window:
+            q.popleft()
+        self._i += 1
+        if self._i < self.window:
+            return None
+        self.value = q[0][1]
+        return self.value
+
+
+class RollingMax(_RollingExtreme):
+    _keep_front = staticmethod(lambda kept, new: kept > new)
+
+
+class RollingMin(_RollingExtreme):
+    _keep_front = staticmethod(lambda kept, new: kept < new)
+
+
+class ATR(Indicator):
+    """Average true range, Wilder smoothing; first value is the mean of the first `window` true ranges."""
+
+    def __init__(self, window: int = 14) -> None:
+        if window <= 0:
+            raise ValueError("window must be > 0")
+        self.window = int(window)
+        self.value = None
+        self._prev_close: Optional[float] = None
+        self._n = 0
+        self._seed = 0.0
+
+    def update(self, event: MarketEvent) -> Optional[float]:
+        return self.push_bar(event.high, event.low, event.close)
+
+    def push(self, x: float) -> Optional[float]:
+        raise TypeError("ATR needs high/low/close; use update(event) or push_bar()")
+
+    def bind(self, bars: BarArrays) -> Callable[[int], Optional[float]]:
+        high, low, close = bars.high.tolist(), bars.low.tolist(), bars.close.tolist()
+        push_bar = self.push_bar
+        return lambda i: push_bar(high[i], low[i], close[i])
+
+    def push_bar(self, high: float, low: float, close: float) -> Optional[float]:
+        pc = self._prev_close
+        tr = high - low if pc is None else max(high - low, abs(high - pc), abs(low - pc))
+        self._prev_close = close
+
+        if self.value is not None:
+            self.value = (self.value * (self.window - 1) + tr) / self.window
+            return self.value
+        self._n += 1
+        self._seed += tr
+        if self._n == self.window:
+            self.value = self._seed / self.window
+        return self.value
+
+
+class RSI(Indicator):
+    """Relative strength index, Wilder smoothing of average gain/loss over `window` changes."""
+
+    def __init__(self, window: int = 14, source: str = "close") -> None:
+        if window <= 0:
+            raise ValueError("window must be > 0")
+        self.window = int(window)
+        self.source = source
+        self.value = None
+        self._prev: Optional[float] = None
+        self._n = 0
+        self._gain = 0.0
+        self._loss = 0.0
+
+    def push(self, x: float) -> Optional[float]:
+        prev, self._prev = self._prev, x
+        if prev is None:
+            return None
+        change = x - prev
+        gain = change if change > 0 else 0.0
+        loss = -change if change < 0 else 0.0
+
+        w = self.window
+        if self._n < w:
+            self._n += 1
+            self._gain += gain
+            self._loss += loss
+            if self._n < w:
+                return None
+            self._gain /= w
+            self._loss /= w
+        else:
+            self._gain = (self._gain * (w - 1) + gain) / w
+            self._loss = (self._loss * (w - 1) + loss) / w
+
+        if self._loss == 0.0:
+            self.value = 100.0 if self._gain > 0.0 else 50.0
+        else:
+            self.value = 100.0 - 100.0 / (1.0 + self._gain / self._loss)
+        return self.value
+
+
+IndicatorFactory = Callable[[], Indicator]
+
+
+class IndicatorSet:
+    """
+    Per-symbol indicator registry.
+    - register(symbol, name, indicator): one instance for one symbol
+    - register_factory(name, factory): a fresh instance for every symbol, created on its first bar
+    update(event) advances every indicator of event.symbol exactly once.
+    Factories must be picklable (a class or functools.partial, not a lambda) for checkpoints.
+    """
+
+    def __init__(self) -> None:
+        self._factories: Dict[str, IndicatorFactory] = {}
+        self._by_symbol: Dict[str, Dict[str, Indicator]] = {}
+        self._lists: Dict[str, List[Indicator]] = {}
+
+    def register(self, symbol: str, name: str, indicator: Indicator) -> Indicator:
+        self._for_symbol(symbol)[name] = indicator
+        self._lists[symbol] = list(self._by_symbol[symbol].values())
+        return indicator
+
+    def register_factory(self, name: str, factory: IndicatorFactory) -> None:
+        self._factories[name] = factory
+        for symbol in self._by_symbol:
+            self.register(symbol, name, factory())
+
+    def _for_symbol(self, symbol: str) -> Dict[str, Indicator]:
+        inds = self._by_symbol.get(symbol)
+        if inds is None:
+            inds = self._by_symbol[symbol] = {name: f() for name, f in self._factories.items()}
+            self._lists[symbol] = list(inds.values())
+        return inds
+
+    def get(self, symbol: str) -> Dict[str, Indicator]:
+        return self._for_symbol(symbol)
+
+    def update(self, event: MarketEvent) -> Dict[str, Indicator]:
+        inds = self._for_symbol(event.symbol)
+        for ind in self._lists[event.symbol]:
+            ind.update(event)
+        return inds
+
+    def iter_batch(self, symbol: str, bars: BarArrays) -> Iterator[Tuple[int, Dict[str, Indicator]]]:
+        """Advance every indicator of `symbol` bar by bar over a block; yields (i, indicators) after each bar."""
+        inds = self._for_symbol(symbol)
+        updaters = [ind.bind(bars) for ind in self._lists[symbol]]
+        for i in range(len(bars)):
+            for step in updaters:
+                step(i)
+            yield i, inds
+
+    def symbols(self) -> Iterator[str]:
+        return iter(self._by_symbol)
+
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Vectorized SMA, NaN until `window` values are available.
+    The running sum is accumulated exactly like SMA.push (add new, then drop old),
+    so event-driven and vectorized runs see bit-identical averages.
+    """
+    x = np.asarray(values, dtype=np.float64)
+    n = x.shape[0]
+    steps = np.zeros(2 * n, dtype=np.float64)
+    steps[0::2] = x
+    if n > window:
+        steps[2 * window + 1::2] = -x[: n - window]
+    running = np.cumsum(steps)[1::2]
+    out = running / window
+    out[: window - 1] = np.nan
+    return out
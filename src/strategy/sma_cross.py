@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import partial
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.core.events import BarBatch, EventType, MarketEvent, SignalEvent, SignalType
+from src.data.bars import BarArrays
+from src.strategy.base import Strategy
+from src.strategy.indicators import SMA, Indicator, rolling_mean
+
+
+@dataclass
+class SMACross(Strategy):
+    """
+    Moving-average crossover:
+    - LONG when the fast SMA crosses above the slow SMA
+    - EXIT when it crosses back below
+    Event-driven via on_market / on_market_batch, vectorized via generate_signals; all emit the same signals.
+    """
+    fast: int = 10
+    slow: int = 30
+    strategy_id: str = "sma_cross"
+
+    def __post_init__(self) -> None:
+        if not 0 < self.fast < self.slow:
+            raise ValueError(f"require 0 < fast < slow, got fast={self.fast} slow={self.slow}")
+        Strategy.__init__(self)
+        # partial 而不是 lambda：策略状态要能 pickle 进 checkpoint
+        self.indicators.register_factory("fast", partial(SMA, self.fast))
+        self.indicators.register_factory("slow", partial(SMA, self.slow))
+        self._above: Dict[str, bool] = {}
+
+    def _cross(self, symbol: str, f: Optional[float], s: Optional[float]) -> Optional[SignalType]:
+        if f is None or s is None:
+            return None
+        above = f > s
+        prev = self._above.get(symbol)
+        self._above[symbol] = above
+        if prev is None or prev == above:
+            return None
+        return SignalType.LONG if above else SignalType.EXIT
+
+    def on_bar(self, event: MarketEvent, indicators: Dict[str, Indicator]) -> Optional[SignalEvent]:
+        sig = self._cross(event.symbol, indicators["fast"].value, indicators["slow"].value)
+        return self.signal(event, sig) if sig is not None else None
+
+    def on_market_batch(self, batch: BarBatch) -> List[Tuple[int, SignalEvent]]:
+        """Same signals as on_market over the block, without building a MarketEvent per bar."""
+        out: List[Tuple[int, SignalEvent]] = []
+        ts = batch.bars.timestamp_ms
+        for i, inds in self.indicators.iter_batch(batch.symbol, batch.bars):
+            sig = self._cross(batch.symbol, inds["fast"].value, inds["slow"].value)
+            if sig is not None:
+                out.append((i, SignalEvent(
+                    type=EventType.SIGNAL,
+                    timestamp_ms=ts.item(i),
+                    symbol=batch.symbol,
+                    signal=sig,
+                    strategy_id=self.strategy_id,
+                )))
+        return out
+
+    def generate_signals(self, bars: BarArrays) -> np.ndarray:
+        """Per-bar signal array: +1 LONG, -1 EXIT, 0 none."""
+        f = rolling_mean(bars.close, self.fast)
+        s = rolling_mean(bars.close, self.slow)
+        above = f > s
+        ready = ~np.isnan(s)
+
+        out = np.zeros(len(bars), dtype=np.int8)
+        prev_ready = np.zeros_like(ready)
+        prev_ready[1:] = ready[:-1]
+        prev_above = np.zeros_like(above)
+        prev_above[1:] = above[:-1]
+
+        cross = ready & prev_ready & (above != prev_above)
+        out[cross & above] = 1
+        out[cross & ~above] = -1
+        return out
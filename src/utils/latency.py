@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import logging
+import math
+import time
+from typing import Callable, Dict, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+_SUB_BITS = 5  # 每个 2 的幂区间分 16 个桶，相对误差 <= 1/16
+_HALF = 1 << (_SUB_BITS - 1)
+
+
+def _bucket(v: int) -> int:
+    b = v.bit_length()
+    if b <= _SUB_BITS:
+        return v
+    shift = b - _SUB_BITS
+    return shift * _HALF + (v >> shift)
+
+
+def _bucket_bounds(idx: int) -> tuple[int, int]:
+    if idx < (1 << _SUB_BITS):
+        return idx, idx + 1
+    shift = idx // _HALF - 1
+    m = idx - shift * _HALF
+    return m << shift, (m + 1) << shift
+
+
+class LatencyHistogram:
+    """
+    Log-bucketed histogram of durations in nanoseconds (HDR-style: 16 linear sub-buckets per
+    power of two, so any percentile is within ~6% of the true value). record() is O(1).
+    """
+
+    __slots__ = ("_counts", "count", "total_ns", "min_ns", "max_ns")
+
+    def __init__(self) -> None:
+        self._counts: List[int] = [0] * ((64 - _SUB_BITS + 2) * _HALF)
+        self.count = 0
+        self.total_ns = 0
+        self.min_ns = 0
+        self.max_ns = 0
+
+    def record(self, ns: int) -> None:
+        if ns < 0:
+            ns = 0
+        self._counts[_bucket(ns)] += 1
+        if self.count == 0 or ns < self.min_ns:
+            self.min_ns = ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+        self.count += 1
+        self.total_ns += ns
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        if other.count == 0:
+            return
+        for i, c in enumerate(other._counts):
+            if c:
+                self._counts[i] += c
+        self.min_ns = other.min_ns if self.count == 0 else min(self.min_ns, other.min_ns)
+        self.max_ns = max(self.max_ns, other.max_ns)
+        self.count += other.count
+        self.total_ns += other.total_ns
+
+    def percentile(self, q: float) -> float:
+        """q in [0, 100]; returns the bucket midpoint (ns), clamped to the observed min/max."""
+        if self.count == 0:
+            return 0.0
+        target = max(math.ceil(q / 100.0 * self.count), 1)
+        seen = 0
+        for idx, c in enumerate(self._counts):
+            if not c:
+                continue
+            seen += c
+            if seen >= target:
+                lo, hi = _bucket_bounds(idx)
+                return float(min(max((lo + hi - 1) / 2.0, self.min_ns), self.max_ns))
+        return float(self.max_ns)
+
+    @property
+    def mean_ns(self) -> float:
+        return self.total_ns / self.count if self.count else 0.0
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "mean_us": self.mean_ns / 1e3,
+            "p50_us": self.percentile(50) / 1e3,
+            "p99_us": self.percentile(99) / 1e3,
+            "p999_us": self.percentile(99.9) / 1e3,
+            "max_us": self.max_ns / 1e3,
+        }
+
+
+class LatencyRecorder:
+    """
+    Per-stage histograms for EventLoop handlers plus end-to-end market -> fill latency.
+    EventLoop(latency=LatencyRecorder()) wraps its core handlers with wrap(); with latency=None the
+    dispatch table holds the bare handlers and nothing is timed.
+    """
+
+    MARKET_TO_FILL = "market_to_fill"
+
+    def __init__(self) -> None:
+        self.stages: Dict[str, LatencyHistogram] = {}
+        self._t_market = 0
+
+    def histogram(self, stage: str) -> LatencyHistogram:
+        hist = self.stages.get(stage)
+        if hist is None:
+            hist = self.stages[stage] = LatencyHistogram()
+        return hist
+
+    def wrap(self, stage: str, fn: Callable[[T], object]) -> Callable[[T], object]:
+        record = self.histogram(stage).record
+        clock = time.perf_counter_ns
+
+        def timed(event: T) -> object:
+            t0 = clock()
+            out = fn(event)
+            record(clock() - t0)
+            return out
+
+        return timed
+
+    def start_market(self, _event: object = None) -> None:
+        if self._t_market == 0:
+            self._t_market = time.perf_counter_ns()
+
+    def end_market(self) -> None:
+        self._t_market = 0
+
+    def on_fill_applied(self, _event: object = None) -> None:
+        if self._t_market:
+            self.histogram(self.MARKET_TO_FILL).record(time.perf_counter_ns() - self._t_market)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        return {stage: hist.summary() for stage, hist in self.stages.items() if hist.count}
+
+    def format_table(self) -> str:
+        lines = [f"{'stage (us)':<28}{'count':>10}{'p50':>10}{'p99':>10}{'p99.9':>10}{'max':>10}"]
+        for stage, s in self.summary().items():
+            lines.append(
+                f"{stage:<28}{s['count']:>10}{s['p50_us']:>10.2f}{s['p99_us']:>10.2f}"
+                f"{s['p999_us']:>10.2f}{s['max_us']:>10.2f}"
+            )
+        return "\n".join(lines)
+
+
+def emit_latency_summary(recorder: Optional[LatencyRecorder], log: logging.Logger) -> None:
+    """Log LATENCY_SUMMARY and print the per-stage table (no-op without a recorder)."""
+    if recorder is None or not recorder.stages:
+        return
+    summary = recorder.summary()
+    log.info("LATENCY_SUMMARY %s", summary, extra={"latency": summary})
+    print(recorder.format_table())
@@ -1,56 +1,232 @@
 from __future__ import annotations
+import atexit
+import json
 import logging
+import logging.handlers
 import os
-from datetime import datetime
-from typing import Optional
+import queue
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Mapping, Optional
 
 _CONFIGURED = False
+_LISTENER: Optional[logging.handlers.QueueListener] = None
+_HANDLERS: List[logging.Handler] = []
+_FILTERS: List["SamplingFilter"] = []
+_SAVED_RECORD_FLAGS: Optional[tuple] = None
+
+# LogRecord 自带的属性；其余的都是 extra=
+_RECORD_ATTRS = frozenset(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
+
+
+class JsonlFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, event, msg, plus every `extra=` field."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        msg = record.getMessage()
+        out = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "event": msg.partition(" ")[0],
+            "msg": msg,
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                out[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            out["exc"] = record.exc_text
+        return json.dumps(out, default=str, ensure_ascii=False)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Thin out high-frequency INFO/DEBUG events, keyed by the first token of the message
+    (e.g. "PAPER_FILL symbol=%s ..." -> "PAPER_FILL").
+    - sample: {"PAPER_FILL": 100} keeps 1 record out of every 100
+    - rate_limit: {"SIGNAL_EMIT": 50.0} keeps at most 50 records per second
+    WARNING and above always pass. Dropped counts are kept in `dropped`.
+    Only %-style templates (records with args) have their key cached, at most `max_keys` of them;
+    pre-formatted messages such as f-strings are split on every call.
+    """
+
+    max_keys = 1024
+
+    def __init__(
+        self,
+        sample: Optional[Mapping[str, int]] = None,
+        rate_limit: Optional[Mapping[str, float]] = None,
+    ) -> None:
+        super().__init__()
+        self.sample = {k: max(int(v), 1) for k, v in (sample or {}).items()}
+        self.rate_limit = {k: float(v) for k, v in (rate_limit or {}).items()}
+        self.dropped: Dict[str, int] = {}
+        self._seen: Dict[str, int] = {}
+        self._window: Dict[str, List[float]] = {}  # event -> [window_start, count]
+        self._keys: Dict[str, str] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        msg = record.msg if isinstance(record.msg, str) else str(record.msg)
+        key = self._keys.get(msg)
+        if key is None:
+            key = msg.partition(" ")[0]
+            # f-string 消息每条都不同，缓存只会无限增长
+            if record.args and len(self._keys) < self.max_keys:
+                self._keys[msg] = key
+
+        every = self.sample.get(key)
+        if every is not None:
+            n = self._seen.get(key, 0)
+            self._seen[key] = n + 1
+            if n % every:
+                self.dropped[key] = self.dropped.get(key, 0) + 1
+                return False
+
+        limit = self.rate_limit.get(key)
+        if limit is not None:
+            now = time.monotonic()
+            w = self._window.get(key)
+            if w is None or now - w[0] >= 1.0:
+                w = self._window[key] = [now, 0.0]
+            if w[1] >= limit:
+                self.dropped[key] = self.dropped.get(key, 0) + 1
+                return False
+            w[1] += 1
+        return True
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Enqueue the record itself: resolve the message now, leave formatting to the writer thread."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
 
 def setup_logging(
     run_id: Optional[str] = None,
     level: str = "INFO",
     log_dir: str = "logs",
+    *,
+    mode: str = "sync",
+    fmt: str = "text",
+    console: bool = True,
+    sample: Optional[Mapping[str, int]] = None,
+    rate_limit: Optional[Mapping[str, float]] = None,
+    fast_records: bool = False,
 ) -> str:
     """
     Configure root logging once.
     - Console handler + File handler
-    - File output: logs/app.<run_id>.log
-    Returns the resolved run_id.
+    - File output: logs/app.<run_id>.log (fmt="jsonl": logs/app.<run_id>.jsonl, extra= fields kept)
+    - mode="async": callers only enqueue; a QueueListener thread formats and writes.
+    - fast_records=True (opt-in): skip the per-record caller/thread/process lookups, which neither
+      formatter prints. These are module-level switches of `logging` (_srcfile, logThreads,
+      logProcesses, logMultiprocessing), so they apply to every logger and handler in the process,
+      third-party ones included, until shutdown_logging() restores them.
+    - sample/rate_limit: see SamplingFilter
+    Returns the resolved run_id. shutdown_logging() (also registered with atexit) flushes.
     """
-    global _CONFIGURED
+    global _CONFIGURED, _LISTENER, _SAVED_RECORD_FLAGS
     if _CONFIGURED:
         return run_id or "unknown"
+    if mode not in ("sync", "async"):
+        raise ValueError(f"unknown logging mode: {mode!r}")
+    if fmt not in ("text", "jsonl"):
+        raise ValueError(f"unknown logging fmt: {fmt!r}")
 
     os.makedirs(log_dir, exist_ok=True)
 
     resolved_run_id = run_id or datetime.now().strftime("%Y%m%d-%H%M%S")
-    file_path = os.path.join(log_dir, f"app.{resolved_run_id}.log")
+    ext = "jsonl" if fmt == "jsonl" else "log"
+    file_path = os.path.join(log_dir, f"app.{resolved_run_id}.{ext}")
 
     lvl = getattr(logging, level.upper(), logging.INFO)
 
     root = logging.getLogger()
     root.setLevel(lvl)
 
-    formatter = logging.Formatter(
+    text_formatter = logging.Formatter(
         fmt="%(asctime)s %(levelname)s %(name)s %(message)s",
         datefmt="%Y-%m-%d %H:%M:%S",
     )
 
+    handlers: List[logging.Handler] = []
     # Console
-    ch = logging.StreamHandler()
-    ch.setLevel(lvl)
-    ch.setFormatter(formatter)
-    root.addHandler(ch)
+    if console:
+        ch = logging.StreamHandler()
+        ch.setLevel(lvl)
+        ch.setFormatter(text_formatter)
+        handlers.append(ch)
 
     # File
     fh = logging.FileHandler(file_path, encoding="utf-8")
     fh.setLevel(lvl)
-    fh.setFormatter(formatter)
-    root.addHandler(fh)
+    fh.setFormatter(JsonlFormatter() if fmt == "jsonl" else text_formatter)
+    handlers.append(fh)
+
+    filt = SamplingFilter(sample, rate_limit) if (sample or rate_limit) else None
+    if filt is not None:
+        _FILTERS.append(filt)
 
-    root.info("LOGGING_READY run_id=%s file=%s", resolved_run_id, file_path)
+    if fast_records:
+        _SAVED_RECORD_FLAGS = (logging._srcfile, logging.logThreads, logging.logProcesses, logging.logMultiprocessing)
+        logging._srcfile = None  # type: ignore[attr-defined]
+        logging.logThreads = logging.logProcesses = logging.logMultiprocessing = False
+    if mode == "async":
+        qh = _QueueHandler(queue.SimpleQueue())
+        if filt is not None:
+            qh.addFilter(filt)
+        root.addHandler(qh)
+        _LISTENER = logging.handlers.QueueListener(qh.queue, *handlers, respect_handler_level=True)
+        _LISTENER.start()
+        _HANDLERS.append(qh)
+    else:
+        for h in handlers:
+            if filt is not None:
+                h.addFilter(filt)
+            root.addHandler(h)
+    _HANDLERS.extend(handlers)
+
+    atexit.register(shutdown_logging)
+    root.info("LOGGING_READY run_id=%s file=%s mode=%s fmt=%s fast_records=%s",
+              resolved_run_id, file_path, mode, fmt, fast_records)
     _CONFIGURED = True
     return resolved_run_id
 
+
+def shutdown_logging() -> None:
+    """Drain the async queue, flush and close handlers installed by setup_logging. Idempotent."""
+    global _CONFIGURED, _LISTENER, _SAVED_RECORD_FLAGS
+    if not _CONFIGURED:
+        return
+    root = logging.getLogger()
+    for filt in _FILTERS:
+        if filt.dropped:
+            root.info("LOG_SAMPLED dropped=%s", filt.dropped, extra={"dropped": dict(filt.dropped)})
+    if _LISTENER is not None:
+        _LISTENER.stop()  # 处理完队列里剩下的记录再返回
+        _LISTENER = None
+    for h in _HANDLERS:
+        root.removeHandler(h)
+        h.flush()
+        h.close()
+    _HANDLERS.clear()
+    _FILTERS.clear()
+    if _SAVED_RECORD_FLAGS is not None:
+        (logging._srcfile, logging.logThreads,  # type: ignore[attr-defined]
+         logging.logProcesses, logging.logMultiprocessing) = _SAVED_RECORD_FLAGS
+        _SAVED_RECORD_FLAGS = None
+    _CONFIGURED = False
+
+
 def get_logger(name: str) -> logging.Logger:
     return logging.getLogger(name)
@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+import pytest
+
+
+def pytest_addoption(parser):
+    parser.addoption("--perf", action="store_true", default=False, help="run @pytest.mark.perf benchmarks")
+    parser.addoption("--perf-tolerance", type=float, default=0.5,
+                     help="allowed bars/s drop below baseline, as a fraction (default 0.5)")
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--perf"):
+        return
+    skip = pytest.mark.skip(reason="perf benchmark; run with --perf")
+    for item in items:
+        if "perf" in item.keywords:
+            item.add_marker(skip)
@@ -0,0 +1,57 @@
+"""Shared bar / config builders for the tests (plain module, not a test file)."""
+from __future__ import annotations
+
+import numpy as np
+
+from src.data.array_handler import ArrayDataHandler
+from src.data.bars import BarArrays
+from src.engine.event_loop import EventLoop
+from src.execution.paper import PaperExecution, PaperExecutionConfig
+from src.modes.backtest import BacktestConfig, BacktestMode
+from src.portfolio.commission import PercentNotionalCommission
+from src.portfolio.performance_portfolio import PerformancePortfolio
+from src.strategy.sma_cross import SMACross
+
+
+def random_bars(n=700, seed=3) -> BarArrays:
+    rng = np.random.default_rng(seed)
+    close = 100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.01, n)))
+    return BarArrays(
+        timestamp_ms=1_700_000_000_000 + np.arange(n, dtype=np.int64) * 60_000,
+        open=close, high=close * 1.01, low=close * 0.99, close=close, volume=np.full(n, 1000.0),
+    )
+
+
+def run_bars(bars: BarArrays, batch_size: int, strategy=None):
+    """SMACross(5, 20) + PerformancePortfolio + PaperExecution backtest over `bars` (symbol TEST)."""
+    loop = EventLoop(
+        data=ArrayDataHandler(bars=bars, symbol="TEST"),
+        strategy=strategy or SMACross(fast=5, slow=20),
+        portfolio=PerformancePortfolio(
+            initial_cash=100_000.0, commission_model=PercentNotionalCommission(rate=0.0003, min_fee=1.0),
+        ),
+        execution=PaperExecution(PaperExecutionConfig(default_commission=0.0)),
+        batch_size=batch_size,
+    )
+    BacktestMode(loop=loop, config=BacktestConfig(flatten_on_end=True)).run()
+    return loop
+
+
+def random_walk_csv(path, n=400, seed=11):
+    rng = np.random.default_rng(seed)
+    close = 100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.01, n)))
+    lines = ["datetime,open,high,low,close,volume"]
+    for i, c in enumerate(close):
+        lines.append(f"{1_700_000_000 + i * 60},{c:.4f},{c * 1.01:.4f},{c * 0.99:.4f},{c:.4f},{1000 + i}")
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return str(path)
+
+
+def sweep_config(csv_path):
+    return {
+        "data": {"csv_path": csv_path, "symbol": "TEST"},
+        "strategy": {"name": "SMACross"},
+        "grid": {"fast": [3, 5], "slow": [5, 20]},
+        "portfolio": {"initial_cash": 50_000, "order_qty": 7, "commission": {"rate": 0.0003, "min_fee": 1.0}},
+        "execution": {"commission": 0.5},
+    }
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from src.backtest.engine import DummyExecution, DummyStrategy
+from src.data.csv_handler import CSVHandler
+from src.data.ring_buffer import BarRingBuffer
+from src.engine.event_loop import EventLoop
+from src.modes.backtest import BacktestConfig, BacktestMode
+from src.portfolio.performance_portfolio import PerformancePortfolio
+from tests.helpers import random_bars, run_bars
+
+
+@pytest.mark.parametrize("batch_size", [1, 7, 64, 10_000])
+def test_batch_run_matches_per_bar(batch_size):
+    bars = random_bars()
+    ref = run_bars(bars, 0)
+    got = run_bars(bars, batch_size)
+
+    assert got.portfolio.report() == ref.portfolio.report()
+    assert got.portfolio.tracker.equity_curve == ref.portfolio.tracker.equity_curve
+    assert got.portfolio.tracker.trades == ref.portfolio.tracker.trades
+    assert got.last_ts_ms == ref.last_ts_ms
+    assert ref.portfolio.report()["trades"] > 4
+
+
+def test_strategy_without_batch_hook_falls_back_to_per_bar():
+    def run(batch_size):
+        loop = EventLoop(
+            data=CSVHandler(csv_path="data/sample_AAPL.csv", symbol="AAPL", columnar=True),
+            strategy=DummyStrategy(),
+            portfolio=PerformancePortfolio(initial_cash=100_000),
+            execution=DummyExecution(commission=1.0),
+            batch_size=batch_size,
+        )
+        BacktestMode(loop=loop, config=BacktestConfig(flatten_on_end=True)).run()
+        return loop.portfolio.report()
+
+    assert run(16) == run(0)
+
+
+def test_ring_buffer_extend_matches_append():
+    bars = random_bars(n=50)
+    a = BarRingBuffer(capacity=8, slack=3)
+    b = BarRingBuffer(capacity=8, slack=3)
+    for i in range(len(bars)):
+        a.append(bars.event_at(i, "X"))
+    for start, stop in [(0, 3), (3, 5), (5, 20), (20, 27), (27, 50)]:
+        b.extend(bars.slice(start, stop), "X")
+
+    assert len(a) == len(b) == 8
+    for x, y in zip(a.window(8), b.window(8)):
+        np.testing.assert_array_equal(x, y)
+    assert b.latest_events(8) == a.latest_events(8)
+    assert b.last() == a.last() and b.last_close() == a.last().close
+
+
+def test_csv_handler_stream_batch_row_and_columnar_agree(tmp_path):
+    path = tmp_path / "bars.csv"
+    path.write_text(
+        "datetime,open,high,low,close,volume\n"
+        + "".join(f"2024-01-02 09:{m:02d}:00,1,2,0.5,{1 + m / 10},100\n" for m in range(30)),
+        encoding="utf-8",
+    )
+    row = CSVHandler(csv_path=str(path), symbol="T")
+    col = CSVHandler(csv_path=str(path), symbol="T", columnar=True)
+    a, b = row.stream_batch(1000), col.stream_batch(1000)
+    assert len(a) == len(b) > 0 and a.timestamp_ms == b.timestamp_ms
+    np.testing.assert_array_equal(a.bars.close, b.bars.close)
+    assert not row.has_next() and not col.has_next()
+    assert row.get_latest_bars("T", 2) == col.get_latest_bars("T", 2)
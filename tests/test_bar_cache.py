@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import os
+
+import numpy as np
+
+from src.data.cache import BarCache
+from src.data.csv_handler import CSVHandler
+
+
+def _write(path, closes):
+    lines = ["datetime,open,high,low,close,volume"]
+    lines += [f"2025-01-01 09:{i:02d}:00,1,2,0.5,{c},10" for i, c in enumerate(closes)]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def _drain(handler):
+    out = []
+    while handler.has_next():
+        out.append(handler.stream_next())
+    return out
+
+
+def test_cache_hit_is_memory_mapped_and_matches_csv(tmp_path) -> None:
+    src = tmp_path / "bars.csv"
+    _write(src, [1.0, 2.0, 3.0])
+    cache = BarCache(cache_dir=str(tmp_path / "cache"))
+
+    first = cache.load(str(src))
+    second = cache.load(str(src))
+
+    assert isinstance(second.close, np.memmap)
+    assert not isinstance(first.close, np.memmap)
+    assert second.close.tolist() == first.close.tolist() == [1.0, 2.0, 3.0]
+    assert second.timestamp_ms.dtype == np.int64
+
+    plain = _drain(CSVHandler(csv_path=str(src), symbol="X"))
+    cached = _drain(CSVHandler(csv_path=str(src), symbol="X", cache_dir=str(tmp_path / "cache")))
+    assert cached == plain
+
+
+def test_cache_invalidates_on_size_and_content_change(tmp_path) -> None:
+    src = tmp_path / "bars.csv"
+    _write(src, [1.0, 2.0])
+    cache = BarCache(cache_dir=str(tmp_path / "cache"))
+    cache.load(str(src))
+
+    # size change
+    _write(src, [1.0, 2.0, 3.0])
+    assert cache.load(str(src)).close.tolist() == [1.0, 2.0, 3.0]
+
+    # same size, different content, mtime restored: only the hash can tell
+    st = os.stat(src)
+    _write(src, [1.0, 2.0, 4.0])
+    os.utime(src, ns=(st.st_atime_ns, st.st_mtime_ns))
+    assert cache.load(str(src)).close.tolist() == [1.0, 2.0, 3.0]
+    assert BarCache(cache_dir=str(tmp_path / "cache"), verify_hash=True).load(str(src)).close.tolist() == [1.0, 2.0, 4.0]
+
+    # touched but unchanged: still a hit after re-hashing
+    os.utime(src, ns=(st.st_atime_ns, st.st_mtime_ns + 10_000_000))
+    assert isinstance(cache.load(str(src)).close, np.memmap)
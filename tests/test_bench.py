@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from src.backtest.bench import compare_to_baseline, run_suite
+from src.data.bars import load_bar_arrays
+from src.data.synthetic import SyntheticSpec, generate_bars, generate_universe, write_universe
+
+BASELINE = Path(__file__).resolve().parents[1] / "benchmarks" / "baseline.json"
+
+
+def test_synthetic_is_deterministic_and_round_trips(tmp_path):
+    spec = SyntheticSpec(bars=500, symbols=3, seed=7)
+    a, b = generate_universe(spec), generate_universe(spec)
+    for name in a:
+        np.testing.assert_array_equal(a[name].close, b[name].close)
+    # 第 i 个 symbol 与 universe 大小无关
+    np.testing.assert_array_equal(generate_bars(SyntheticSpec(bars=500, symbols=1, seed=7), 2).close,
+                                  a["SYN0002"].close)
+    assert not np.array_equal(a["SYN0000"].close, a["SYN0001"].close)
+
+    bars = a["SYN0001"]
+    assert (bars.high >= np.maximum(bars.open, bars.close)).all()
+    assert (bars.low <= np.minimum(bars.open, bars.close)).all()
+
+    paths = write_universe(spec, tmp_path)
+    loaded = load_bar_arrays(paths["SYN0001"])
+    np.testing.assert_array_equal(loaded.timestamp_ms, bars.timestamp_ms)
+    np.testing.assert_allclose(loaded.close, bars.close)
+
+
+def test_run_suite_reports_every_benchmark():
+    report = run_suite(SyntheticSpec(bars=300, symbols=2), repeat=1)
+    assert set(report["results"]) == {"csv_load_rows", "csv_load_columnar", "event_loop", "tracker", "backtest_e2e"}
+    for r in report["results"].values():
+        assert r["bars"] == 600 and r["bars_per_s"] > 0 and r["peak_mb"] > 0
+    json.dumps(report)
+
+
+def test_compare_to_baseline_flags_regressions():
+    spec = {"bars": 1}
+    base = {"spec": spec, "results": {"a": {"bars_per_s": 1000.0}, "b": {"bars_per_s": 1000.0}}}
+    cur = {"spec": spec, "results": {"a": {"bars_per_s": 750.0}, "b": {"bars_per_s": 650.0}}}
+    failures = compare_to_baseline(cur, base, tolerance=0.3)
+    assert len(failures) == 1 and failures[0].startswith("b:")
+    assert compare_to_baseline({"spec": {"bars": 2}, "results": {}}, base)[0].startswith("spec mismatch")
+
+
+@pytest.mark.perf
+def test_throughput_within_baseline_budget(request):
+    baseline = json.loads(BASELINE.read_text(encoding="utf-8"))
+    report = run_suite(SyntheticSpec(**baseline["spec"]), repeat=baseline["meta"].get("repeat", 3))
+    failures = compare_to_baseline(report, baseline, tolerance=request.config.getoption("--perf-tolerance"))
+    assert not failures, "\n".join(failures)
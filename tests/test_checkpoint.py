@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import contextlib
+import io
+import pickle
+
+import numpy as np
+import pytest
+
+from src.backtest import bench
+from src.core.clock import SimulatedClock
+from src.core.events import EventType, MarketEvent
+from src.data.array_handler import ArrayDataHandler
+from src.data.synthetic import SyntheticSpec, generate_bars, write_universe
+from src.engine.checkpoint import (
+    CheckpointConfig, dumps_checkpoint, list_checkpoints, load_checkpoint, loads_checkpoint, save_checkpoint,
+)
+from src.modes.backtest import BacktestConfig, BacktestMode
+from src.modes.dryrun import DryRunConfig, DryRunMode
+from src.utils.latency import LatencyRecorder
+
+
+def _curves(portfolio):
+    eq, tr = portfolio.tracker.equity_arrays(), portfolio.tracker.trade_arrays()
+    return {**{f"eq.{k}": v for k, v in eq.items()}, **{f"tr.{k}": v for k, v in tr.items()}}
+
+
+def _assert_identical(a, b):
+    assert a.keys() == b.keys()
+    for k in a:
+        assert np.array_equal(a[k], b[k]), k
+
+
+def test_resume_from_checkpoint_is_bit_identical(tmp_path):
+    paths = write_universe(SyntheticSpec(bars=2_000, symbols=3), tmp_path / "data")
+    with contextlib.redirect_stdout(io.StringIO()):
+        ref = bench._loop(bench._data_handler(paths))
+        BacktestMode(loop=ref).run()
+
+        cfg = CheckpointConfig(directory=str(tmp_path / "ckpt"), every_bars=1_000, keep=3)
+        BacktestMode(loop=bench._loop(bench._data_handler(paths)), config=BacktestConfig(checkpoint=cfg)).run()
+        files = list_checkpoints(cfg.directory)
+        # 6000 根 bar：1000..6000 六个文件（6000 同时是结束快照），只保留最新 3 个
+        assert [f.name for f in files] == [f"ckpt-{n:012d}.ckpt" for n in (4_000, 5_000, 6_000)]
+
+        # 模拟崩溃：从中间的快照续跑
+        resumed = BacktestMode.resume(files[0])
+        resumed.run()
+
+    _assert_identical(_curves(ref.portfolio), _curves(resumed.loop.portfolio))
+    assert resumed.loop.portfolio.report() == ref.portfolio.report()
+
+
+def test_loop_round_trip_keeps_queue_and_rebinds(tmp_path):
+    loop = bench._loop(ArrayDataHandler(generate_bars(SyntheticSpec(bars=100)), "SYN0000", lookback=16))
+    loop.latency = LatencyRecorder()
+    loop.clock = SimulatedClock()
+    loop.rebind()
+    loop.subscribe(EventType.MARKET, lambda e: None)  # 额外订阅者不入 checkpoint
+    for _ in range(40):
+        loop.queue.put(loop.data.stream_next())
+        loop.drain()
+    pending = MarketEvent(type=EventType.MARKET, timestamp_ms=1, symbol="SYN0000",
+                          open=1.0, high=1.0, low=1.0, close=1.0, volume=1.0)
+    loop.queue.put(pending)
+
+    path = tmp_path / "one.ckpt"
+    save_checkpoint(path, loop, {"note": "x"})
+    restored, meta = load_checkpoint(path)
+
+    assert meta == {"note": "x"}
+    assert loop.queue.get_nowait() == pending  # 存盘不消费原队列
+    assert restored.queue.get_nowait() == pending
+    assert restored.data._i == 40
+    assert [e.close for e in restored.data.get_latest_bars("SYN0000", 16)] == \
+        [e.close for e in loop.data.get_latest_bars("SYN0000", 16)]
+    assert restored._after == {}
+    assert len(restored._dispatch[EventType.MARKET]) == len(loop._dispatch[EventType.MARKET]) - 1
+    assert not list(tmp_path.glob("*.tmp"))
+    with pytest.raises(ValueError, match="magic"):
+        loads_checkpoint(pickle.dumps(loop.portfolio))
+    assert len(dumps_checkpoint(restored)) < 64 * 1024
+
+
+def test_dryrun_warm_starts_from_end_of_backtest(tmp_path):
+    bars = generate_bars(SyntheticSpec(bars=1_500))
+    with contextlib.redirect_stdout(io.StringIO()):
+        ref = bench._loop(ArrayDataHandler(bars, "SYN0000"))
+        DryRunMode(loop=ref, config=DryRunConfig(emit_summary=False)).run()
+
+        cfg = CheckpointConfig(directory=str(tmp_path), on_end=True)
+        history = bench._loop(ArrayDataHandler(bars.slice(0, 1_000), "SYN0000"))
+        BacktestMode(loop=history, config=BacktestConfig(checkpoint=cfg)).run()  # 收口平仓在快照之后
+
+        mode = DryRunMode.warm_start(tmp_path, data=ArrayDataHandler(bars.slice(1_000, 1_500), "SYN0000"),
+                                     config=DryRunConfig(emit_summary=False))
+        mode.run()
+
+    _assert_identical(_curves(ref.portfolio), _curves(mode.loop.portfolio))
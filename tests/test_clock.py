@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import pytest
+
+from src.backtest.engine import DummyDataHandler, DummyExecution, DummyPortfolio, DummyStrategy
+from src.core.clock import ReplayPacer, SimulatedClock
+from src.core.events import EventType
+from src.engine.event_loop import EventLoop
+from src.modes.dryrun import DryRunConfig, DryRunMode
+from src.utils.latency import LatencyRecorder
+
+MINUTE = 60_000
+
+
+def _loop(**kwargs) -> EventLoop:
+    return EventLoop(
+        data=DummyDataHandler(),
+        strategy=DummyStrategy(),
+        portfolio=DummyPortfolio(),
+        execution=kwargs.pop("execution", None) or DummyExecution(commission=1.0, fill_price=100.0),
+        **kwargs,
+    )
+
+
+def test_gateway_ids_follow_simulated_time():
+    fills = []
+    loop = _loop()
+    loop.subscribe(EventType.FILL, fills.append)
+    loop.run_until_data_end()
+    # 默认用订单时间戳：两次运行结果一致
+    assert [f.gateway_order_id for f in fills] == [
+        "gw-cid-1700000000000-1700000000000",
+        "gw-cid-1700000120000-1700000120000",
+    ]
+
+    clock = SimulatedClock()
+    fills.clear()
+    loop = _loop(execution=DummyExecution(fill_price=100.0, clock=clock), clock=clock)
+    loop.subscribe(EventType.FILL, fills.append)
+    loop.run_until_data_end()
+    assert clock.now_ms() == 1700000000000 + 2 * MINUTE
+    assert fills[-1].gateway_order_id.endswith(str(1700000000000 + 2 * MINUTE))
+
+    clock.advance_to(5)  # 不回拨
+    assert clock.now_ms() == 1700000000000 + 2 * MINUTE
+
+
+def test_pacer_sleeps_when_ahead_and_lags_when_processing_is_slow():
+    clock = SimulatedClock()
+    pacer = ReplayPacer(speed=60.0, clock=clock, behind_ms=500.0)  # 1 分钟 bar -> 每根 1 秒
+    for i in range(5):
+        assert pacer.wait(i * MINUTE) == 0
+        clock.sleep(0.25)  # 处理耗时 < bar 间隔：一直跟得上
+    assert pacer.slept_s == pytest.approx(4 * 0.75)
+    assert pacer.late_bars == 0
+
+    slow = ReplayPacer(speed=60.0, clock=clock, behind_ms=500.0)
+    lags = []
+    for i in range(5):
+        lags.append(slow.wait(i * MINUTE))
+        clock.sleep(1.5)  # 每根 bar 比间隔多 0.5 秒，滞后线性累积
+    assert lags == [0, 500_000_000, 1_000_000_000, 1_500_000_000, 2_000_000_000]
+    assert slow.slept_s == 0.0
+    stats = slow.stats()
+    assert stats["late_bars"] == 3
+    assert stats["lag_max_ms"] == pytest.approx(2000.0)
+    assert stats["effective_speed"] == pytest.approx(4 * 60 / 7.5)
+
+
+def test_max_speed_never_waits():
+    clock = SimulatedClock()
+    pacer = ReplayPacer(speed=0.0, clock=clock)
+    for i in range(3):
+        assert pacer.wait(i * MINUTE) == 0
+    assert clock.monotonic_ns() == 0
+    assert pacer.lag.count == 0
+
+
+def test_dryrun_paces_replay_and_records_lag():
+    loop = _loop(latency=LatencyRecorder())
+    mode = DryRunMode(loop=loop, config=DryRunConfig(emit_summary=False, speed=60_000.0))  # 每分钟 bar 1ms
+    mode.run()
+
+    stats = mode.replay_stats()
+    assert stats["bars"] == 3
+    assert stats["wall_elapsed_s"] >= 0.002
+    assert loop.latency.stages[DryRunMode.REPLAY_LAG].count == 2
+    assert isinstance(loop.data, DummyDataHandler)  # 回放结束后恢复原 data handler
+    assert loop.portfolio.position == 0
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import pytest
+
+from src.data.bars import detect_datetime_format, parse_datetimes_to_ms
+from src.data.csv_handler import CSVHandler, _parse_datetime_to_ms
+
+
+def _write_csv(path, stamps, with_volume=True):
+    header = "datetime,open,high,low,close" + (",volume" if with_volume else "")
+    lines = [header]
+    for i, ts in enumerate(stamps):
+        row = f"{ts},{100 + i},{101 + i},{99 + i},{100.5 + i}"
+        if with_volume:
+            row += f",{'' if i == 1 else 1000 + i}"
+        lines.append(row)
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return str(path)
+
+
+def _drain(handler):
+    out = []
+    while handler.has_next():
+        out.append(handler.stream_next())
+    return out
+
+
+@pytest.mark.parametrize(
+    "stamps",
+    [
+        ["2025-01-01 09:30:00", "2025-01-01 09:31:00", "2025-03-30 02:15:00"],
+        ["2025/01/01 09:30:00", "2025/01/01 09:31:00", "2025/01/02 09:30:00"],
+        ["2025-01-01 09:30", "2025-01-01T09:31", "2025-01-01 09:32"],
+        ["1735723800", "1735723860", "1735723920"],
+        ["1735723800000", "1735723860000", "1735723920000"],
+        ["2025-1-1 9:30:00", "2025-1-1 9:31:00", "2025-1-1 9:32:00"],
+    ],
+)
+def test_columnar_mode_matches_row_mode(tmp_path, stamps) -> None:
+    csv_path = _write_csv(tmp_path / "bars.csv", stamps)
+
+    rows = _drain(CSVHandler(csv_path=csv_path, symbol="X"))
+    cols = _drain(CSVHandler(csv_path=csv_path, symbol="X", columnar=True))
+
+    assert cols == rows
+    assert all(type(e.timestamp_ms) is int and type(e.close) is float for e in cols)
+
+
+def test_bulk_datetime_parse_matches_scalar_parser() -> None:
+    values = ["2024-03-10 01:59:00", "2024-03-10 03:00:00", "2024-11-03 01:30:00"]
+    fmt = detect_datetime_format(values[0])
+    assert fmt == "%Y-%m-%d %H:%M:%S"
+    assert parse_datetimes_to_ms(values, fmt).tolist() == [_parse_datetime_to_ms(v) for v in values]
+
+
+def test_columnar_latest_bars_and_missing_volume(tmp_path) -> None:
+    csv_path = _write_csv(tmp_path / "bars.csv", ["2025-01-01 09:30:00", "2025-01-01 09:31:00"], with_volume=False)
+    h = CSVHandler(csv_path=csv_path, symbol="X", columnar=True)
+
+    assert h.get_latest_close("X") is None
+    first = h.stream_next()
+    second = h.stream_next()
+
+    assert not h.has_next()
+    assert first.volume == 0.0
+    assert h.get_latest_bars("X", 5) == [first, second]
+    assert h.get_latest_bars("X", 0) == []
+    assert h.get_latest_close("X") == second.close
+
+
+def test_columnar_empty_csv_raises(tmp_path) -> None:
+    path = tmp_path / "empty.csv"
+    path.write_text("datetime,open,high,low,close,volume\n", encoding="utf-8")
+    with pytest.raises(ValueError, match="CSV is empty"):
+        CSVHandler(csv_path=str(path), symbol="X", columnar=True)
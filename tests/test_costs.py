@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import dataclasses
+
+import numpy as np
+import pytest
+
+from src.core.costs import (
+    CostModel, FixedBpsSlippage, ParticipationSlippage, PercentFee, PerShareFee, SqrtImpact, TieredFee,
+    trade_costs,
+)
+from src.core.events import EventType, MarketEvent, OrderEvent, OrderType, Side
+from src.data.array_handler import ArrayDataHandler
+from src.engine.event_loop import EventLoop
+from src.execution.commission import FixedCommission, RateCommission
+from src.execution.simulated_broker import SimulatedBroker, SimulatedBrokerConfig
+from src.modes.backtest import BacktestMode
+from src.modes.vectorized import VectorizedBacktestMode, VectorizedConfig
+from src.portfolio.commission import PercentNotionalCommission
+from src.portfolio.performance_portfolio import PerformancePortfolio
+from src.strategy.sma_cross import SMACross
+from tests.helpers import random_bars
+
+MODEL = CostModel(
+    fees=(
+        TieredFee(tiers=((0.0, 0.0005), (10_000.0, 0.0003), (100_000.0, 0.0002)), min_fee=1.0),
+        PercentFee(rate=0.001, side=Side.SELL),  # stamp duty
+        PerShareFee(per_share=0.005, max_pct=0.01),
+    ),
+    slippage=(FixedBpsSlippage(bps=2.0), ParticipationSlippage(bps_at_full=50.0), SqrtImpact(coef=0.5, sigma=0.02)),
+)
+
+
+def test_scalar_and_array_paths_agree():
+    rng = np.random.default_rng(0)
+    n = 2_000
+    qty = rng.integers(1, 5_000, n)
+    price = rng.uniform(5.0, 500.0, n)
+    side = np.where(rng.random(n) < 0.5, 1, -1).astype(np.int8)
+    volume = rng.uniform(0.0, 50_000.0, n)
+    volume[::50] = 0.0  # no volume: participation and impact terms vanish
+
+    out = MODEL.apply_arrays(qty, price, side, volume)
+    for i in range(0, n, 37):
+        s = Side.BUY if side[i] > 0 else Side.SELL
+        fill_price, commission = MODEL.apply(int(qty[i]), float(price[i]), s, float(volume[i]))
+        assert out["fill_price"][i] == pytest.approx(fill_price, rel=1e-12)
+        assert out["commission"][i] == pytest.approx(commission, rel=1e-12)
+    assert np.all((out["fill_price"] - price) * side >= 0)  # always adverse
+    assert out["total_cost"] == pytest.approx(out["commission"] + out["slippage_cost"])
+
+
+def test_fee_components():
+    stamp = PercentFee(rate=0.001, side=Side.SELL)
+    assert stamp.calc(100, 10.0, Side.BUY) == 0.0
+    assert stamp.calc(100, 10.0, Side.SELL) == pytest.approx(1.0)
+    np.testing.assert_allclose(stamp.calc_array(np.array([100, 100]), np.array([10.0, 10.0]), np.array([1, -1])),
+                               [0.0, 1.0])
+
+    tiered = TieredFee(tiers=((0.0, 0.001), (10_000.0, 0.0005)))
+    assert tiered.calc(99, 100.0) == pytest.approx(9.9)
+    assert tiered.calc(100, 100.0) == pytest.approx(5.0)
+
+    impact = SqrtImpact(coef=1.0, sigma=0.02)
+    assert impact.slip(2_500, 100.0, volume=10_000) == pytest.approx(100.0 * 0.02 * 0.5)
+    assert impact.slip(2_500, 100.0, volume=10_000, volatility=0.01) == pytest.approx(0.5)
+
+
+def test_legacy_commission_models_share_the_api():
+    # 两种旧调用方式都可用，并且有向量化路径
+    assert FixedCommission(per_trade=1.5).calc(qty=10, price=3.0) == 1.5
+    assert RateCommission(0.001, 5.0).calc(qty=10, price=3.0) == 5.0
+    pct = PercentNotionalCommission(rate=0.0003, min_fee=1.0, max_fee=20.0)
+    assert pct.calc(symbol="X", qty=10_000, price=100.0, side=Side.BUY) == 20.0
+    qty, price = np.array([10, 10_000, 5_000]), np.array([10.0, 100.0, 10.0])
+    expected = [pct.calc(symbol="X", qty=int(q), price=float(p), side=Side.BUY) for q, p in zip(qty, price)]
+    assert pct.calc_array(qty, price, np.ones(3)).tolist() == expected
+
+    trades = {"qty": qty, "price": price, "side": np.array([1, -1, 1])}
+    assert trade_costs(trades, CostModel(fees=(pct,)))["commission"].tolist() == expected
+
+
+def test_vectorized_mode_and_broker_apply_slippage():
+    bars = random_bars()
+    model = CostModel(fees=(PercentFee(rate=0.0003, min_fee=1.0),), slippage=(FixedBpsSlippage(bps=10.0),))
+    res = VectorizedBacktestMode(bars=bars, strategy=SMACross(fast=5, slow=20),
+                                 config=VectorizedConfig(commission_model=model)).compute()
+    close = bars.close[res.fill_index]
+    np.testing.assert_allclose(res.fill_price, close * (1 + res.fill_side * 1e-3))
+
+    broker = SimulatedBroker(SimulatedBrokerConfig(commission_model=model))
+    broker.on_bar(MarketEvent(type=EventType.MARKET, timestamp_ms=0, symbol="X",
+                              open=100.0, high=101.0, low=99.0, close=100.0, volume=1_000.0))
+    mkt = broker.on_order(OrderEvent(type=EventType.ORDER, timestamp_ms=0, symbol="X", client_order_id="m",
+                                     side=Side.SELL, order_type=OrderType.MKT, qty=10))
+    lmt = broker.on_order(OrderEvent(type=EventType.ORDER, timestamp_ms=0, symbol="X", client_order_id="l",
+                                     side=Side.BUY, order_type=OrderType.LMT, qty=10, limit_price=100.0))
+    assert mkt.fill_price == pytest.approx(99.9) and mkt.commission == pytest.approx(1.0)
+    assert lmt.fill_price == 100.0  # limit fills are not slipped
+
+
+@pytest.mark.parametrize("batch_size", [16, 64])
+def test_broker_slippage_uses_the_current_bar_volume_when_batched(batch_size):
+    bars = random_bars()
+    bars = dataclasses.replace(bars, volume=np.random.default_rng(5).uniform(100.0, 10_000.0, len(bars)).round())
+    model = CostModel(fees=(PercentFee(rate=0.0003),), slippage=(ParticipationSlippage(bps_at_full=500.0),))
+
+    def run(batch):
+        loop = EventLoop(
+            data=ArrayDataHandler(bars=bars, symbol="X"),
+            strategy=SMACross(fast=5, slow=20),
+            portfolio=PerformancePortfolio(initial_cash=100_000.0),
+            execution=SimulatedBroker(SimulatedBrokerConfig(commission_model=model)),
+            batch_size=batch,
+        )
+        BacktestMode(loop=loop).run()
+        return loop.portfolio.tracker.trades
+
+    ref, got = run(0), run(batch_size)
+    assert len(ref) > 4
+    assert got == ref
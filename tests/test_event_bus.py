@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import logging
+
+from src.backtest.engine import DummyExecution, DummyStrategy
+from src.core.events import EventType, SignalEvent, SignalType
+from src.data.csv_handler import CSVHandler
+from src.engine.event_loop import EventLoop
+from src.modes.backtest import BacktestConfig, BacktestMode
+from src.portfolio.performance_portfolio import PerformancePortfolio
+
+
+def _loop() -> EventLoop:
+    return EventLoop(
+        data=CSVHandler(csv_path="data/sample_AAPL.csv", symbol="AAPL"),
+        strategy=DummyStrategy(),
+        portfolio=PerformancePortfolio(initial_cash=100_000),
+        execution=DummyExecution(commission=1.0),
+    )
+
+
+def test_subscribers_see_events_in_order() -> None:
+    loop = _loop()
+    seen = []
+    loop.subscribe(EventType.SIGNAL, lambda e: seen.append(("risk", e.type)), first=True)
+    loop.subscribe(EventType.SIGNAL, lambda e: seen.append(("after", e.type)))
+    loop.subscribe(EventType.FILL, lambda e: seen.append(("recorder", e.type)))
+
+    BacktestMode(loop=loop, config=BacktestConfig(flatten_on_end=True)).run()
+
+    assert seen[:3] == [("risk", EventType.SIGNAL), ("after", EventType.SIGNAL), ("recorder", EventType.FILL)]
+    # 订阅者不改变结果
+    summary = loop.portfolio.report()  # type: ignore[attr-defined]
+    assert summary["total_commission"] == 2.0
+
+
+def test_subscriber_return_value_is_queued() -> None:
+    loop = _loop()
+    extra = []
+
+    def echo(event):
+        if event.strategy_id != "echo":
+            return SignalEvent(type=EventType.SIGNAL, timestamp_ms=event.timestamp_ms, symbol=event.symbol,
+                               signal=SignalType.EXIT, strategy_id="echo")
+        extra.append(event)
+        return None
+
+    loop.subscribe(EventType.SIGNAL, echo)
+    loop.run_until_data_end()
+    assert len(extra) == 1 and extra[0].signal == SignalType.EXIT
+
+
+def test_rebind_picks_up_replaced_component() -> None:
+    loop = _loop()
+    loop.execution = DummyExecution(commission=3.0)
+    loop.rebind()
+    BacktestMode(loop=loop, config=BacktestConfig(flatten_on_end=True)).run()
+    assert loop.portfolio.report()["total_commission"] == 6.0  # type: ignore[attr-defined]
+
+
+def test_unknown_event_type_is_warned(caplog) -> None:
+    loop = _loop()
+    loop._dispatch.pop(EventType.FILL)
+    with caplog.at_level(logging.WARNING):
+        loop.run_until_data_end()
+    assert any(r.getMessage() == "UNKNOWN_EVENT" for r in caplog.records)
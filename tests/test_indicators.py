@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from src.core.events import EventType, MarketEvent
+from src.strategy.indicators import (
+    ATR, EMA, RSI, SMA, IndicatorSet, RollingMax, RollingMin, RollingStd, RollingVariance, rolling_mean,
+)
+
+
+def _bars(n=300, seed=3, symbol="X"):
+    rng = np.random.default_rng(seed)
+    close = 100.0 + np.cumsum(rng.normal(0.0, 1.0, n))
+    high = close + rng.uniform(0.0, 1.0, n)
+    low = close - rng.uniform(0.0, 1.0, n)
+    return [
+        MarketEvent(type=EventType.MARKET, timestamp_ms=i, symbol=symbol,
+                    open=float(c), high=float(h), low=float(l), close=float(c), volume=1.0)
+        for i, (c, h, l) in enumerate(zip(close, high, low))
+    ]
+
+
+def _feed(ind, bars):
+    return [ind.update(b) for b in bars]
+
+
+def test_window_indicators_match_brute_force() -> None:
+    bars = _bars()
+    x = np.array([b.close for b in bars])
+    w = 20
+
+    checks = [
+        (SMA(w), lambda s: s.mean()),
+        (RollingVariance(w), lambda s: s.var(ddof=1)),
+        (RollingStd(w, ddof=0), lambda s: s.std()),
+        (RollingMax(w), lambda s: s.max()),
+        (RollingMin(w), lambda s: s.min()),
+    ]
+    for ind, ref in checks:
+        out = _feed(ind, bars)
+        assert out[: w - 1] == [None] * (w - 1)
+        expected = [ref(x[i - w + 1:i + 1]) for i in range(w - 1, len(x))]
+        np.testing.assert_allclose(out[w - 1:], expected, rtol=1e-9, atol=1e-9)
+
+
+def test_sma_matches_vectorized_rolling_mean_exactly() -> None:
+    bars = _bars(n=1000)
+    out = _feed(SMA(7), bars)
+    vec = rolling_mean(np.array([b.close for b in bars]), 7)
+    assert out[6:] == vec[6:].tolist()
+
+
+def test_ema_atr_rsi_match_reference() -> None:
+    bars = _bars()
+    close = [b.close for b in bars]
+    w = 14
+
+    ema = _feed(EMA(w), bars)
+    ref = sum(close[:w]) / w
+    assert ema[w - 1] == pytest.approx(ref)
+    for i in range(w, len(close)):
+        ref += 2.0 / (w + 1) * (close[i] - ref)
+        assert ema[i] == pytest.approx(ref)
+
+    atr = _feed(ATR(w), bars)
+    tr = [bars[0].high - bars[0].low] + [
+        max(b.high - b.low, abs(b.high - p.close), abs(b.low - p.close)) for p, b in zip(bars, bars[1:])
+    ]
+    ref = sum(tr[:w]) / w
+    assert atr[w - 1] == pytest.approx(ref)
+    for i in range(w, len(tr)):
+        ref = (ref * (w - 1) + tr[i]) / w
+        assert atr[i] == pytest.approx(ref)
+
+    rsi = _feed(RSI(w), bars)
+    diff = np.diff(close)
+    gain, loss = np.clip(diff, 0, None), np.clip(-diff, 0, None)
+    ag, al = gain[:w].mean(), loss[:w].mean()
+    assert rsi[w - 1] is None
+    assert rsi[w] == pytest.approx(100 - 100 / (1 + ag / al))
+    for i in range(w, len(diff)):
+        ag = (ag * (w - 1) + gain[i]) / w
+        al = (al * (w - 1) + loss[i]) / w
+        assert rsi[i + 1] == pytest.approx(100 - 100 / (1 + ag / al))
+    assert all(0.0 <= v <= 100.0 for v in rsi if v is not None)
+
+
+def test_indicator_set_updates_each_symbol_once() -> None:
+    inds = IndicatorSet()
+    inds.register_factory("sma", lambda: SMA(2))
+    inds.register("B", "max", RollingMax(3))
+
+    a, b = _bars(n=3, symbol="A"), _bars(n=3, symbol="B", seed=9)
+    for ea, eb in zip(a, b):
+        inds.update(ea)
+        got_b = inds.update(eb)
+
+    assert inds.get("A")["sma"].value == pytest.approx((a[1].close + a[2].close) / 2)
+    assert got_b["sma"].value == pytest.approx((b[1].close + b[2].close) / 2)
+    assert got_b["max"].value == max(e.close for e in b)
+    assert "max" not in inds.get("A")
+    assert sorted(inds.symbols()) == ["A", "B"]
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import numpy as np
+
+from src.core.events import EventType
+from src.data.array_handler import ArrayDataHandler
+from src.engine.event_loop import EventLoop
+from src.execution.paper import PaperExecution, PaperExecutionConfig
+from src.modes.backtest import BacktestConfig, BacktestMode
+from src.portfolio.commission import PercentNotionalCommission
+from src.portfolio.performance_portfolio import PerformancePortfolio
+from src.strategy.sma_cross import SMACross
+from src.utils.latency import LatencyHistogram, LatencyRecorder
+from tests.helpers import random_bars, run_bars
+
+
+def test_histogram_percentiles_within_bucket_error():
+    rng = np.random.default_rng(0)
+    values = rng.lognormal(mean=8.0, sigma=1.5, size=50_000).astype(np.int64)
+    hist = LatencyHistogram()
+    for v in values.tolist():
+        hist.record(v)
+
+    assert hist.count == len(values)
+    assert hist.min_ns == values.min() and hist.max_ns == values.max()
+    for q in (50, 99, 99.9):
+        exact = np.percentile(values, q, method="inverted_cdf")
+        assert abs(hist.percentile(q) - exact) <= exact / 16 + 1
+
+    other = LatencyHistogram()
+    other.record(10**9)
+    hist.merge(other)
+    assert hist.count == len(values) + 1 and hist.max_ns == 10**9
+
+
+def test_event_loop_records_each_stage(capsys):
+    bars = random_bars(n=400)
+    ref = run_bars(bars, 0)
+
+    loop = EventLoop(
+        data=ArrayDataHandler(bars=bars, symbol="TEST"),
+        strategy=SMACross(fast=5, slow=20),
+        portfolio=PerformancePortfolio(
+            initial_cash=100_000.0, commission_model=PercentNotionalCommission(rate=0.0003, min_fee=1.0),
+        ),
+        execution=PaperExecution(PaperExecutionConfig(default_commission=0.0)),
+        latency=LatencyRecorder(),
+    )
+    BacktestMode(loop=loop, config=BacktestConfig(flatten_on_end=True)).run()
+
+    assert loop.portfolio.report() == ref.portfolio.report()
+    stats = loop.latency.summary()
+    trades = ref.portfolio.report()["trades"]
+    assert stats["strategy.on_market"]["count"] == len(bars)
+    assert stats["portfolio.on_fill"]["count"] == trades
+    # 收口平仓的 fill 不算 market_to_fill
+    assert stats["market_to_fill"]["count"] == trades - 1
+    s = stats["market_to_fill"]
+    assert 0 < s["p50_us"] <= s["p99_us"] <= s["p999_us"] <= s["max_us"]
+
+    out = capsys.readouterr().out
+    assert "market_to_fill" in out and "p99.9" in out
+
+
+def test_disabled_latency_leaves_bare_handlers():
+    loop = run_bars(random_bars(n=50), 0)
+    assert loop.latency is None
+    assert loop._dispatch[EventType.SIGNAL] == (loop._on_signal,)
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from src.data.array_handler import ArrayDataHandler
+from src.data.live_feed import SyntheticFeedServer, TcpFeed, TcpFeedConfig
+from src.engine.event_loop import EventLoop
+from src.execution.paper import PaperExecution, PaperExecutionConfig
+from src.modes.backtest import BacktestConfig, BacktestMode
+from src.modes.live import LiveConfig, LiveMode
+from src.portfolio.performance_portfolio import PerformancePortfolio
+from src.strategy.sma_cross import SMACross
+from src.utils.latency import LatencyRecorder
+from tests.helpers import random_bars
+
+
+def _loop(data=None) -> EventLoop:
+    return EventLoop(
+        data=data,  # type: ignore[arg-type]
+        strategy=SMACross(fast=5, slow=20),
+        portfolio=PerformancePortfolio(initial_cash=100_000.0),
+        execution=PaperExecution(PaperExecutionConfig(default_commission=1.0)),
+    )
+
+
+async def _session(server: SyntheticFeedServer, config: LiveConfig, **feed_kwargs) -> LiveMode:
+    async with server:
+        feed = TcpFeed(TcpFeedConfig(port=server.port, backoff_initial_s=0.01, **feed_kwargs))
+        mode = LiveMode(loop=_loop(), feed=feed, config=config)
+        await mode.run_async()
+    return mode
+
+
+@pytest.mark.parametrize("offload", [False, True])
+def test_live_session_matches_backtest(offload):
+    bars = random_bars(400)
+    chunks = []
+    process = LiveMode._process
+
+    def spy(self, chunk):
+        chunks.append(len(chunk))
+        process(self, chunk)
+
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(LiveMode, "_process", spy)
+        mode = asyncio.run(_session(SyntheticFeedServer(bars={"TEST": bars}),
+                                    LiveConfig(offload=offload, inline_chunk=4)))
+    if not offload:
+        assert max(chunks) <= 4  # 在事件循环上一次最多跑 inline_chunk 根
+
+    ref = _loop(ArrayDataHandler(bars=bars, symbol="TEST"))
+    BacktestMode(loop=ref, config=BacktestConfig(flatten_on_end=False)).run()
+
+    stats = mode.stats()
+    assert stats["processed"] == stats["received"] == 400 and stats["dropped"] == 0
+    assert mode.loop.portfolio.tracker.trades == ref.portfolio.tracker.trades
+    assert mode.loop.portfolio.report() == ref.portfolio.report()
+    tick_to_signal = mode.latency.summary()[LiveMode.TICK_TO_SIGNAL]
+    assert tick_to_signal["count"] == stats["signals"] > 0
+
+
+def test_market_to_fill_is_measured_per_bar():
+    server = SyntheticFeedServer(bars={"TEST": random_bars(1_500)})
+
+    async def run() -> LiveMode:
+        async with server:
+            loop = _loop()
+            loop.latency = LatencyRecorder()
+            loop.rebind()
+            mode = LiveMode(loop=loop, feed=TcpFeed(TcpFeedConfig(port=server.port)))
+            await mode.run_async()
+        return mode
+
+    summary = asyncio.run(run()).latency.summary()
+    # market 起点每根 bar 重置：成交发生在 bar 处理完之前，不可能比 tick_to_done 慢
+    m2f, done = summary[LatencyRecorder.MARKET_TO_FILL], summary[LiveMode.TICK_TO_DONE]
+    assert m2f["count"] > 0
+    assert m2f["max_us"] <= done["max_us"] and m2f["p50_us"] <= done["p99_us"]
+
+
+@pytest.mark.parametrize("fault", ["close", "stall"])
+def test_reconnect_resumes_stream(fault):
+    server = SyntheticFeedServer(bars={"TEST": random_bars(300)}, fault_after=120, fault=fault)
+    mode = asyncio.run(_session(server, LiveConfig(), heartbeat_timeout_s=0.2))
+
+    assert mode.feed.reconnects == 1
+    assert mode.processed == 300
+    assert mode.loop.last_ts_ms == int(random_bars(300).timestamp_ms[-1])
+
+
+def test_full_queue_drops_oldest_and_max_messages_stops():
+    mode = LiveMode(loop=_loop(), feed=TcpFeed(), config=LiveConfig(queue_size=2))
+    mode._queue = asyncio.Queue(2)
+    bars = random_bars(3)
+    for i in range(3):
+        mode._on_message(bars.event_at(i, "TEST"), i)
+    assert mode.dropped == 1
+    assert [mode._queue.get_nowait()[1] for _ in range(2)] == [1, 2]
+
+    limited = asyncio.run(_session(SyntheticFeedServer(bars={"TEST": random_bars(500)}), LiveConfig(max_messages=50)))
+    assert limited.processed == 50
+
+
+def test_unreachable_feed_raises_after_retries():
+    feed = TcpFeed(TcpFeedConfig(port=1, max_retries=1, backoff_initial_s=0.01, connect_timeout_s=0.5))
+    mode = LiveMode(loop=_loop(), feed=feed)
+    with pytest.raises(ConnectionError):
+        mode.run()
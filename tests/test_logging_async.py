@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import json
+import logging
+
+import pytest
+
+from src.utils.logging import SamplingFilter, get_logger, setup_logging, shutdown_logging
+
+
+@pytest.fixture
+def clean_logging():
+    yield
+    shutdown_logging()
+
+
+def _read_jsonl(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_async_jsonl_keeps_extra_and_flushes_on_shutdown(tmp_path, clean_logging):
+    run_id = setup_logging(run_id="t1", log_dir=str(tmp_path), mode="async", fmt="jsonl", console=False)
+    log = get_logger("test.async")
+    for i in range(500):
+        log.info("ORDER_EMIT i=%s", i, extra={"symbol": "AAPL", "qty": i})
+    try:
+        raise RuntimeError("boom")
+    except RuntimeError:
+        log.exception("FAILED")
+    shutdown_logging()
+
+    rows = _read_jsonl(tmp_path / f"app.{run_id}.jsonl")
+    orders = [r for r in rows if r["event"] == "ORDER_EMIT"]
+    assert len(orders) == 500
+    assert orders[7] == {**orders[7], "symbol": "AAPL", "qty": 7, "msg": "ORDER_EMIT i=7", "level": "INFO"}
+    failed = [r for r in rows if r["event"] == "FAILED"]
+    assert "RuntimeError: boom" in failed[0]["exc"]
+    # shutdown 后 root 上不再残留我们的 handler
+    assert not any(str(getattr(h, "baseFilename", "")).startswith(str(tmp_path)) for h in logging.getLogger().handlers)
+
+
+def test_record_flags_change_only_with_fast_records(tmp_path, clean_logging):
+    flags = lambda: (logging._srcfile, logging.logThreads, logging.logProcesses, logging.logMultiprocessing)
+    before = flags()
+    setup_logging(run_id="t3", log_dir=str(tmp_path), mode="async", console=False)
+    assert flags() == before  # async 本身不动 logging 的全局开关
+    shutdown_logging()
+
+    setup_logging(run_id="t4", log_dir=str(tmp_path), mode="async", console=False, fast_records=True)
+    assert flags() == (None, False, False, False)
+    shutdown_logging()
+    assert flags() == before
+
+
+def test_sampling_and_rate_limit(tmp_path, clean_logging):
+    setup_logging(
+        run_id="t2", log_dir=str(tmp_path), mode="sync", fmt="jsonl", console=False,
+        sample={"FILL_EMIT": 10}, rate_limit={"SIGNAL_EMIT": 5},
+    )
+    log = get_logger("test.sample")
+    for _ in range(100):
+        log.info("FILL_EMIT symbol=%s", "X")
+        log.info("SIGNAL_EMIT")
+    log.warning("SIGNAL_EMIT late")
+    shutdown_logging()
+
+    rows = _read_jsonl(tmp_path / "app.t2.jsonl")
+    events = [r["event"] for r in rows]
+    assert events.count("FILL_EMIT") == 10
+    assert events.count("SIGNAL_EMIT") == 6  # 5/s + WARNING always passes
+    summary = [r for r in rows if r["event"] == "LOG_SAMPLED"][0]
+    assert summary["dropped"] == {"FILL_EMIT": 90, "SIGNAL_EMIT": 95}
+
+
+def test_sampling_filter_keys_on_first_token():
+    filt = SamplingFilter(sample={"PAPER_FILL": 2})
+    rec = lambda: logging.makeLogRecord({"msg": "PAPER_FILL symbol=%s", "args": ("X",), "levelno": logging.INFO})
+    assert [filt.filter(rec()) for _ in range(4)] == [True, False, True, False]
+    assert filt.dropped == {"PAPER_FILL": 2}
+
+
+def test_sampling_filter_key_cache_is_bounded():
+    filt = SamplingFilter(sample={"PAPER_FILL": 2})
+    for i in range(2000):
+        filt.filter(logging.makeLogRecord({"msg": f"PAPER_FILL id={i}", "levelno": logging.INFO}))
+    assert filt._keys == {} and filt.dropped == {"PAPER_FILL": 1000}
+
+    filt.max_keys = 3
+    for i in range(10):
+        filt.filter(logging.makeLogRecord({"msg": f"EVENT_{i} x=%s", "args": (i,), "levelno": logging.INFO}))
+    assert len(filt._keys) == 3
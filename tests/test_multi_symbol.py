@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import gzip
+from typing import Dict, Optional
+
+import pytest
+
+from src.core.events import FillEvent, OrderEvent, SignalEvent, Side
+from src.data.multi_symbol import MultiSymbolHandler
+from src.engine.event_loop import EventLoop
+from src.execution.paper import PaperExecution, PaperExecutionConfig
+from src.modes.backtest import BacktestConfig, BacktestMode
+
+
+def _write(path, minutes, base=100.0):
+    lines = ["datetime,open,high,low,close,volume"]
+    for k, m in enumerate(minutes):
+        lines.append(f"2025-01-01 09:{m:02d}:00,{base},{base + 1},{base - 1},{base + k},10")
+    text = "\n".join(lines) + "\n"
+    if str(path).endswith(".gz"):
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def _drain(handler):
+    out = []
+    while handler.has_next():
+        out.append(handler.stream_next())
+    return out
+
+
+@pytest.mark.parametrize("max_open_files", [1, 2, 16])
+def test_merge_is_ordered_by_timestamp_then_source_order(tmp_path, max_open_files) -> None:
+    sources = {
+        "AAA": _write(tmp_path / "AAA.csv", [0, 2, 4, 6, 8, 10, 12]),
+        "BBB": _write(tmp_path / "BBB.csv.gz", [1, 2, 3, 20]),
+        "CCC": _write(tmp_path / "CCC.csv", [5]),
+    }
+    h = MultiSymbolHandler(sources=sources, chunk_rows=2, lookback=3, max_open_files=max_open_files)
+    events = _drain(h)
+
+    keys = [(e.timestamp_ms, e.symbol) for e in events]
+    assert len(events) == 12
+    assert [ts for ts, _ in keys] == sorted(ts for ts, _ in keys)
+    # equal timestamps (09:02) keep `sources` order
+    i = next(k for k, (_, s) in enumerate(keys) if s == "BBB" and events[k].close == 101.0)
+    assert keys[i - 1][1] == "AAA" and keys[i - 1][0] == keys[i][0]
+    assert len(h._open) <= max_open_files
+
+    assert [b.close for b in h.get_latest_bars("AAA", 10)] == [104.0, 105.0, 106.0]
+    assert h.get_latest_close("CCC") == 100.0
+    assert h.get_latest_window("BBB", 2).close.tolist() == [102.0, 103.0]
+    assert h.get_latest_bars("ZZZ", 1) == []
+
+
+def test_from_directory_and_out_of_order_source(tmp_path) -> None:
+    _write(tmp_path / "AAA.csv", [0, 1])
+    _write(tmp_path / "BBB.csv", [3, 2])
+    (tmp_path / "notes.txt").write_text("ignored", encoding="utf-8")
+
+    h = MultiSymbolHandler.from_directory(str(tmp_path))
+    assert h.symbols == ("AAA", "BBB")
+    with pytest.raises(ValueError, match="out of order"):
+        _drain(h)
+
+
+def test_reopens_with_more_sources_than_handles(tmp_path) -> None:
+    # HOT has a bar every minute; the cold sources tick at staggered minutes and refill rarely
+    sources = {"HOT": _write(tmp_path / "HOT.csv", range(60))}
+    for k in range(1, 7):
+        name = f"C{k}"
+        suffix = ".csv.gz" if k == 1 else ".csv"
+        sources[name] = _write(tmp_path / f"{name}{suffix}", range(k, 60, 10))
+    h = MultiSymbolHandler(sources=sources, chunk_rows=2, lookback=2, max_open_files=3)
+    events = _drain(h)
+
+    assert len(events) == 60 + 6 * 6
+    readers = dict(zip(h.symbols, h._readers))
+    # least recently used goes first: the busy source only reopens once, after the priming pass
+    assert readers["HOT"].reopens == 1
+    # compressed sources are never suspended, so never re-decompressed from byte 0
+    assert readers["C1"].reopens == 0
+    # plain sources reopen at most once per chunk
+    assert all(readers[f"C{k}"].reopens <= 3 for k in range(2, 7))
+    assert h.reopens == sum(r.reopens for r in readers.values()) > 0
+
+
+def test_compressed_sources_raise_max_open_files(tmp_path, monkeypatch) -> None:
+    sources = {s: _write(tmp_path / f"{s}.csv.gz", [0, 1, 2]) for s in ("AAA", "BBB", "CCC")}
+    h = MultiSymbolHandler(sources=sources, chunk_rows=1, max_open_files=2)
+    assert len(_drain(h)) == 9 and h.reopens == 0
+
+    monkeypatch.setattr("src.data.multi_symbol._fd_soft_limit", lambda: 66)
+    with pytest.raises(ValueError, match="fd limit"):
+        MultiSymbolHandler(sources=sources, max_open_files=2)
+
+
+class _BookPortfolio:
+    """Minimal per-symbol position book: buys 1 unit of every symbol on its first bar."""
+
+    def __init__(self) -> None:
+        self.positions: Dict[str, int] = {}
+
+    @property
+    def position(self) -> int:
+        return sum(self.positions.values())
+
+    def on_signal(self, event: SignalEvent) -> Optional[OrderEvent]:
+        return None
+
+    def on_fill(self, event: FillEvent) -> None:
+        q = event.fill_qty if event.side == Side.BUY else -event.fill_qty
+        self.positions[event.symbol] = self.positions.get(event.symbol, 0) + q
+
+
+class _NoSignal:
+    def on_market(self, event):
+        return None
+
+
+def test_backtest_flattens_every_symbol(tmp_path) -> None:
+    sources = {
+        "AAA": _write(tmp_path / "AAA.csv", [0, 1]),
+        "BBB": _write(tmp_path / "BBB.csv", [0, 2]),
+    }
+    portfolio = _BookPortfolio()
+    portfolio.positions = {"AAA": 3, "BBB": -2}
+    loop = EventLoop(
+        data=MultiSymbolHandler(sources=sources),
+        strategy=_NoSignal(),
+        portfolio=portfolio,
+        execution=PaperExecution(PaperExecutionConfig(default_commission=0.0)),
+    )
+    BacktestMode(loop=loop, config=BacktestConfig(flatten_on_end=True)).run()
+
+    assert portfolio.positions == {"AAA": 0, "BBB": 0}
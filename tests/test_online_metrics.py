@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import math
+
+import numpy as np
+import pytest
+
+from src.backtest.engine import DummyExecution, DummyStrategy
+from src.backtest.metrics import OnlineMetrics
+from src.backtest.performance import PerformanceTracker
+from src.data.csv_handler import CSVHandler
+from src.engine.event_loop import EventLoop
+from src.modes.dryrun import DryRunConfig, DryRunMode
+from src.portfolio.performance_portfolio import PerformancePortfolio
+
+DAY = 86_400_000
+
+
+def _random_run(seed=5, n=500):
+    rng = np.random.default_rng(seed)
+    prices = 100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.01, n)))
+    t = PerformanceTracker(initial_cash=10_000.0, periods_per_year=252)
+    pos = 0
+    for i, p in enumerate(prices.tolist()):
+        t.on_market(i * DAY, p)
+        if i % 25 == 3 and pos == 0:
+            t.on_fill(i * DAY, "X", "BUY", 20, p, 1.0)
+            pos = 20
+        elif i % 25 == 17 and pos:
+            t.on_fill(i * DAY, "X", "SELL", 20, p, 1.0)
+            pos = 0
+    return t, prices
+
+
+def test_streaming_metrics_match_batch_computation():
+    t, prices = _random_run()
+    m = t.metrics()
+
+    eq = t.equity_arrays()
+    bar_marks = np.ones(len(eq["timestamp_ms"]), dtype=bool)
+    # 成交点与同一时刻的 bar 点同 ts，收益只按 bar 点算：取每个 ts 的第一个点
+    bar_marks[1:] = np.diff(eq["timestamp_ms"]) != 0
+    bar_equity = eq["equity"][bar_marks]
+    r = bar_equity[1:] / bar_equity[:-1] - 1.0
+
+    assert m["sharpe"] == pytest.approx(r.mean() / r.std(ddof=1) * math.sqrt(252), rel=1e-9)
+    assert m["volatility"] == pytest.approx(r.std(ddof=1) * math.sqrt(252), rel=1e-9)
+    down = math.sqrt(np.mean(np.minimum(r, 0.0) ** 2))
+    assert m["sortino"] == pytest.approx(r.mean() / down * math.sqrt(252), rel=1e-9)
+
+    positions = eq["position"][bar_marks]
+    assert m["exposure"] == pytest.approx(np.count_nonzero(positions) / len(positions))
+
+    trades = t.trade_arrays()
+    notional = np.abs(trades["qty"] * trades["price"]).sum()
+    assert m["turnover"] == pytest.approx(notional / bar_equity.mean(), rel=1e-12)
+
+    years = (len(prices) - 1) * DAY / (365.25 * DAY)
+    cagr = (t.summary()["final_equity"] / 10_000.0) ** (1 / years) - 1
+    assert m["calmar"] == pytest.approx(cagr / t.max_drawdown, rel=1e-12)
+
+
+def test_chunked_fold_matches_per_mark_fold(monkeypatch):
+    ref = _random_run()[0].metrics()
+    # 每个 mark 都单独折叠 / 折叠边界落在回撤中间
+    for chunk in (1, 7):
+        monkeypatch.setattr(OnlineMetrics, "MARK_CHUNK", chunk)
+        m = _random_run()[0].metrics()
+        for k, v in ref.items():
+            assert m[k] == pytest.approx(v, rel=1e-9), k
+
+
+def test_round_trip_stats_and_drawdown_duration():
+    t = PerformanceTracker(initial_cash=1_000.0)
+    t.on_market(0, 10.0)
+    t.on_fill(0, "X", "BUY", 10, 10.0, 1.0)
+    t.on_market(DAY, 12.0)
+    t.on_fill(DAY, "X", "SELL", 10, 12.0, 1.0)    # +18
+    t.on_fill(DAY, "X", "BUY", 10, 12.0, 0.0)
+    t.on_market(2 * DAY, 11.0)
+    t.on_fill(2 * DAY, "X", "SELL", 20, 11.0, 0.0)  # 反手：-10 平仓，开 10 空
+    t.on_market(3 * DAY, 12.0)
+    t.on_fill(3 * DAY, "X", "BUY", 10, 12.0, 0.0)   # -10
+
+    m = t.metrics()
+    assert m["round_trips"] == 3
+    assert m["win_rate"] == pytest.approx(1 / 3)
+    assert m["profit_factor"] == pytest.approx(18 / 20)
+    # 峰值在第 1 天之后，此后一直在水下
+    assert m["current_drawdown_duration_ms"] == 2 * DAY
+    assert m["max_drawdown_duration_ms"] == 2 * DAY
+
+    # report = summary + metrics, summary unchanged
+    assert t.report() == {**t.summary(), **m}
+
+
+def test_dryrun_logs_intermediate_snapshots(caplog):
+    loop = EventLoop(
+        data=CSVHandler(csv_path="data/sample_AAPL.csv", symbol="AAPL"),
+        strategy=DummyStrategy(),
+        portfolio=PerformancePortfolio(initial_cash=100_000),
+        execution=DummyExecution(commission=1.0),
+    )
+    mode = DryRunMode(loop=loop, config=DryRunConfig(summary_every_bars=1))
+    with caplog.at_level("INFO", logger="mode.dryrun"):
+        mode.run()
+    assert any(r.getMessage().startswith("PERF_SNAPSHOT bars=1") for r in caplog.records)
+    snap = mode.snapshot()
+    assert {"final_equity", "sharpe", "win_rate", "exposure"} <= set(snap)
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import contextlib
+import io
+
+import pytest
+
+from src.backtest import bench
+from src.backtest.engine import DummyDataHandler, DummyExecution, DummyStrategy
+from src.backtest.performance import PerformanceTracker
+from src.data.synthetic import SyntheticSpec, write_universe
+from src.engine.event_loop import EventLoop
+from src.modes.backtest import BacktestMode
+from src.portfolio.commission import PercentNotionalCommission
+from src.portfolio.performance_portfolio import PerformancePortfolio
+from src.portfolio.position_book import PositionBook
+
+
+def test_avg_cost_realized_and_flip():
+    book = PositionBook()
+    a = book.symbol_id("A")
+    assert book.apply_fill(a, 10, 100.0) == 0.0
+    assert book.apply_fill(a, 10, 110.0) == 0.0
+    assert book.avg_cost[a] == pytest.approx(105.0)
+
+    assert book.apply_fill(a, -5, 120.0) == pytest.approx(75.0)
+    assert book.avg_cost[a] == pytest.approx(105.0)
+
+    # 反手：平掉 15 股多头，新开 5 股空头，成本重置为成交价
+    assert book.apply_fill(a, -20, 100.0) == pytest.approx(-75.0)
+    assert book.qty[a] == -5 and book.avg_cost[a] == 100.0
+
+    book.mark(a, 90.0)
+    pos = book.get("A")
+    assert pos.unrealized_pnl == pytest.approx(50.0)
+    assert pos.realized_pnl == pytest.approx(0.0)
+    assert book.market_value == pytest.approx(-450.0)
+    assert book.positions() == {"A": -5}
+
+
+def test_tracker_equity_is_cash_plus_book_value():
+    t = PerformanceTracker(initial_cash=10_000.0)
+    t.on_fill(0, "A", "BUY", 10, 50.0, 0.0)
+    t.on_fill(0, "B", "SELL", 4, 20.0, 0.0)
+    t.on_market(1, 55.0, "A")
+    t.on_market(1, 25.0, "B")
+    t.on_market(1, 999.0, "C")  # never traded: no book entry, no effect on equity
+
+    assert t.position == 6  # net
+    assert t.book.positions() == {"A": 10, "B": -4}
+    assert len(t.book) == 2
+    assert t.summary()["final_equity"] == pytest.approx(10_000.0 + 10 * 5.0 - 4 * 5.0)
+
+    t.on_fill(2, "A", "SELL", 10, 55.0, 0.0)
+    assert t.book.market_value == pytest.approx(-4 * 25.0)
+    assert t.book.realized_pnl == pytest.approx(50.0)
+
+
+def test_zero_price_first_fill_is_marked_at_the_last_close():
+    # DummyExecution 默认 fill_price=0：首笔成交按最近收盘价 mark，而不是 0
+    loop = EventLoop(
+        data=DummyDataHandler(symbol="DEMO"),
+        strategy=DummyStrategy(),
+        portfolio=PerformancePortfolio(commission_model=PercentNotionalCommission(rate=0.0003, min_fee=1.0)),
+        execution=DummyExecution(),
+    )
+    loop.run_until_data_end()
+    first_fill = loop.portfolio.tracker.equity_curve[1]
+    assert (first_fill.equity, first_fill.last_price) == (101_004.0, 100.5)
+
+    t = PerformanceTracker(initial_cash=1_000.0)
+    t.on_market(0, 50.0, "A")
+    t.on_market(0, 70.0, "B")
+    t.on_fill(1, "A", "BUY", 2, 0.0, 0.0)
+    assert t.book.get("A").last_price == 50.0 and t.summary()["final_equity"] == 1_100.0
+
+
+def test_multi_symbol_backtest_matches_per_symbol_runs(tmp_path):
+    paths = write_universe(SyntheticSpec(bars=1_500, symbols=3), tmp_path)
+
+    def run(p):
+        loop = bench._loop(bench._data_handler(p))
+        with contextlib.redirect_stdout(io.StringIO()):
+            BacktestMode(loop=loop).run()
+        return loop.portfolio
+
+    multi = run(paths)
+    singles = [run({s: p}).report() for s, p in paths.items()]
+
+    report = multi.report()
+    assert report["final_position"] == 0 and multi.positions == {}
+    assert report["trades"] == sum(r["trades"] for r in singles)
+    assert report["total_pnl"] == pytest.approx(sum(r["total_pnl"] for r in singles), abs=1e-6)
+    assert sorted(p.symbol for p in multi.position_snapshot()) == sorted(paths)
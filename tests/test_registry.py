@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import contextlib
+import io
+import subprocess
+import sys
+
+import pytest
+
+from src.backtest.engine import build_loop
+from src.core.costs import CostModel, FixedBpsSlippage, TieredFee
+from src.core.registry import COSTS, EXECUTIONS, Registry, build_component, build_cost
+from src.execution.paper import PaperExecution
+from src.modes.backtest import BacktestMode
+from src.portfolio.commission import PercentNotionalCommission
+from src.strategy.buy_and_hold import BuyAndHold
+
+
+def test_engine_imports_only_what_the_config_names():
+    code = (
+        "import sys\n"
+        "import src.backtest.engine as e\n"
+        "heavy = ('yaml', 'numpy', 'src.data.csv_handler', 'src.portfolio.performance_portfolio', 'src.strategy.sma_cross')\n"
+        "print(sorted(m for m in heavy if m in sys.modules))\n"
+        "e.build_loop({'data': {'source': 'demo', 'symbol': 'X'}, 'strategy': {'name': 'BuyAndHold'}})\n"
+        "print(sorted(m for m in heavy + ('src.strategy.buy_and_hold',) if m in sys.modules))\n"
+    )
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout.splitlines()
+    assert out[0] == "[]"
+    assert out[1] == str(sorted(["numpy", "src.portfolio.performance_portfolio", "src.strategy.buy_and_hold"]))
+
+
+def test_build_loop_honors_strategy_portfolio_and_execution_sections():
+    loop = build_loop({
+        "run": {"initial_cash": 5_000},
+        "data": {"source": "demo", "symbol": "DEMO"},
+        "strategy": {"name": "BuyAndHold", "params": {"qty": 20}},
+        "portfolio": {"commission": {"rate": 0.001}},
+        "execution": {"name": "paper", "default_commission": 0.0},
+    })
+    assert isinstance(loop.strategy, BuyAndHold) and isinstance(loop.execution, PaperExecution)
+    assert loop.execution.config.default_commission == 0.0
+    assert loop.portfolio.order_qty == 20 and loop.portfolio.initial_cash == 5_000
+    assert loop.portfolio.commission_model == PercentNotionalCommission(rate=0.001)
+    with contextlib.redirect_stdout(io.StringIO()):
+        BacktestMode(loop=loop).run()
+    report = loop.portfolio.report()
+    assert report["trades"] == 2 and report["final_position"] == 0
+    assert report["total_pnl"] == pytest.approx(20 * (101.0 - 100.5) - 0.001 * 20 * (100.5 + 101.0))
+
+
+def test_registry_errors_custom_entries_and_cost_specs():
+    reg = Registry("widget", {"dict": "collections:OrderedDict", "fromkeys": "collections:OrderedDict.fromkeys"})
+    assert "dict" in reg and reg.build("dict", a=1) == {"a": 1}
+    assert list(reg["fromkeys"]("ab")) == ["a", "b"]
+    with pytest.raises(ValueError, match=r"unknown widget: 'nope' \(known: dict, fromkeys\)"):
+        reg.get("nope")
+    reg.register("nope", list)
+    assert reg.build("nope") == []
+
+    broker = build_component(EXECUTIONS, "simulated", {"max_participation": 0.5})
+    assert broker.config.max_participation == 0.5
+    cost = build_cost({"name": "cost_model",
+                       "fees": [{"name": "tiered", "tiers": [[0, 0.001], [10_000, 0.0005]]}],
+                       "slippage": [{"name": "fixed_bps_slippage", "bps": 2.0}]})
+    assert cost == CostModel(fees=(TieredFee(tiers=((0, 0.001), (10_000, 0.0005))),),
+                             slippage=(FixedBpsSlippage(bps=2.0),))
+    assert "per_share" in COSTS.names()
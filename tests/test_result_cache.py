@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import os
+
+import numpy as np
+
+from src.backtest.result_cache import ResultCache, resolved_config
+from src.engine.sweep import run_sweep
+from tests.helpers import random_walk_csv, sweep_config
+
+
+def test_key_depends_on_data_content_config_and_params(tmp_path):
+    cache = ResultCache(directory=str(tmp_path / "rc"))
+    csv_path = random_walk_csv(tmp_path / "bars.csv")
+    config = sweep_config(csv_path)
+    data = cache.data_fingerprint(config["data"])
+    key = cache.key(data, resolved_config(config), {"fast": 3})
+
+    # 日志/缓存段、路径改名都不影响 key；数据内容、参数、tag 会
+    noisy = {**config, "logging": {"level": "DEBUG"}, "cache": {"directory": "x"}}
+    assert cache.key(data, resolved_config(noisy), {"fast": 3}) == key
+    copy = tmp_path / "copy.csv"
+    copy.write_bytes((tmp_path / "bars.csv").read_bytes())
+    assert cache.data_fingerprint({**config["data"], "csv_path": str(copy)}) == data
+    assert cache.key(data, resolved_config(config), {"fast": 5}) != key
+    assert ResultCache(directory=str(tmp_path / "rc"), tag="v2").key(data, resolved_config(config), {"fast": 3}) != key
+
+    random_walk_csv(tmp_path / "bars.csv", seed=12)
+    os.utime(tmp_path / "bars.csv", ns=(1, 1))
+    assert cache.data_fingerprint(config["data"]) != data
+
+
+def test_hits_misses_bypass_and_lru_eviction(tmp_path):
+    cache = ResultCache(directory=str(tmp_path), max_bytes=10_000)
+    calls = []
+
+    def run(i):
+        calls.append(i)
+        return {"total_pnl": float(i)}, {"equity": np.full(300, float(i))}
+
+    first, hit = cache.get_or_run("a", lambda: run(1), arrays=True)
+    again, hit2 = cache.get_or_run("a", lambda: run(2), arrays=True)
+    assert (hit, hit2) == (False, True) and calls == [1]
+    assert again.report == {"total_pnl": 1.0} and np.array_equal(again.arrays["equity"], first.arrays["equity"])
+
+    cache.bypass = True
+    assert cache.get_or_run("a", lambda: run(3))[1] is False and calls == [1, 3]
+    cache.bypass = False
+    assert cache.get("a").report == {"total_pnl": 3.0}  # 绕过时仍然刷新缓存
+
+    assert not (tmp_path / "a.npz").exists()  # 新结果没带数组，旧数组一并删掉
+
+    # 每条约 2.7 KB，上限 10 KB：写第 4 条时淘汰最久未用的 b
+    os.utime(tmp_path / "a.json")
+    cache.get_or_run("b", lambda: run(4), arrays=True)
+    os.utime(tmp_path / "b.json", (1, 1))
+    for key in "cde":
+        cache.get_or_run(key, lambda: run(5), arrays=True)
+    assert cache.get("b") is None and cache.get("a") is not None and cache.get("e") is not None
+    assert cache.stats["evictions"] >= 1 and cache.size_bytes() <= 10_000
+    s = cache.summary()
+    assert (s["hits"], s["bypassed"]) == (4, 1) and 0 < s["hit_rate"] < 1
+
+
+def test_put_scans_the_directory_only_when_over_budget(tmp_path, monkeypatch):
+    cache = ResultCache(directory=str(tmp_path), max_bytes=50_000)
+    scans = []
+    entries = ResultCache._entries
+    monkeypatch.setattr(ResultCache, "_entries", lambda self: scans.append(1) or entries(self))
+    arrays = {"equity": np.zeros(500)}  # 每条约 4 KB
+    for i in range(10):
+        cache.put(f"k{i}", {"i": i}, arrays)
+    assert len(scans) == 1  # 只在第一次 put 时扫描一次
+    cache.put("k0", {"i": 0}, arrays)  # 覆盖同一个 key 不重复计数
+    assert len(scans) == 1 and cache._bytes == cache.size_bytes()
+
+    for i in range(10, 14):
+        cache.put(f"k{i}", {"i": i}, arrays)
+    # 超过上限才扫描淘汰，一次降到 LOW_WATER 以下
+    assert cache.stats["evictions"] >= 1 and cache._bytes == cache.size_bytes() <= 50_000 * ResultCache.LOW_WATER
+
+
+def test_sweep_reuses_cached_rows(tmp_path):
+    config = {**sweep_config(random_walk_csv(tmp_path / "bars.csv")), "cache": {"directory": str(tmp_path / "rc")}}
+    cold = run_sweep(config, workers=2)
+    warm = run_sweep(config, workers=2)
+    assert cold.cache_hits == 0 and warm.cache_hits == 3  # (5, 5) 报错的组合不缓存
+    strip = lambda r: {k: v for k, v in r.items() if k not in ("elapsed_s", "worker_pid", "cache_hit")}
+    assert [strip(r) for r in warm.rows] == [strip(r) for r in cold.rows]
+    # worker 进程里的 ResultCache.stats 汇总到 SweepResult；命中的行不算进 bars/s
+    assert cold.cache_stats == {"hits": 0, "misses": 4, "bypassed": 0, "writes": 3, "evictions": 0}
+    assert warm.cache_stats["hits"] == 3 and warm.cache_stats["misses"] == 1 and warm.cache_stats["writes"] == 0
+    assert sum(w["runs"] for w in warm.workers) == 1 and sum(w["cache_hits"] for w in warm.workers) == 3
+    assert all("_cache_stats" not in r for r in warm.rows)
+    fresh = run_sweep(config, workers=1, no_cache=True)
+    assert fresh.cache_hits == 0 and fresh.cache_stats["bypassed"] == 4 and fresh.cache_stats["writes"] == 3
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import contextlib
+import io
+import json
+
+import numpy as np
+import pytest
+
+from src.backtest import bench
+from src.backtest.performance import CurveSampling, PerformanceTracker
+from src.backtest.results import ResultsSink, load_results, load_summary
+from src.data.array_handler import ArrayDataHandler
+from src.data.synthetic import SyntheticSpec, generate_bars, write_universe
+from src.engine.checkpoint import CheckpointConfig, list_checkpoints, load_checkpoint
+from src.modes.backtest import BacktestConfig, BacktestMode
+
+
+def _run(loop, **config):
+    with contextlib.redirect_stdout(io.StringIO()):
+        mode = BacktestMode(loop=loop, config=BacktestConfig(**config))
+        mode.run()
+    return mode
+
+
+def test_streamed_results_match_in_memory_run(tmp_path):
+    paths = write_universe(SyntheticSpec(bars=1_500, symbols=2), tmp_path / "data")
+    ref = bench._loop(bench._data_handler(paths))
+    _run(ref)
+
+    loop = bench._loop(bench._data_handler(paths))
+    sink = ResultsSink(tmp_path / "out", row_group=256, format="npz")
+    loop.portfolio.attach_sink(sink)
+    _run(loop)
+    tracker = loop.portfolio.tracker
+    # 已写出的行不再占内存
+    assert len(tracker.equity_arrays()["equity"]) < 256 and len(tracker.trade_arrays()["qty"]) < 256
+    sink.close(summary=tracker.report(), tracker=tracker)
+
+    expected = ref.portfolio.tracker
+    for table, cols in (("equity", expected.equity_arrays()), ("trades", expected.trade_arrays())):
+        got = load_results(tmp_path / "out", table)
+        assert got.keys() == cols.keys()
+        for k, v in cols.items():
+            assert np.array_equal(got[k], v), (table, k)
+
+    assert load_summary(tmp_path / "out") == json.loads(json.dumps(expected.report()))
+    manifest = json.loads((tmp_path / "out" / "manifest.json").read_text())
+    assert manifest["tables"]["equity"]["rows"] == len(expected.equity_arrays()["equity"])
+    assert manifest["tables"]["equity"]["chunks"] == -(-manifest["tables"]["equity"]["rows"] // 256)
+
+    only = load_results(tmp_path / "out", "equity", columns=["timestamp_ms", "equity"])
+    assert list(only) == ["timestamp_ms", "equity"]
+    fills = load_results(tmp_path / "out", "fills", columns=["client_order_id", "qty"])
+    assert len(fills["qty"]) == expected.trade_count and fills["client_order_id"][0].startswith("cid-")
+
+
+def test_eod_point_is_written_on_close(tmp_path):
+    t = PerformanceTracker(initial_cash=1_000.0, sampling=CurveSampling.end_of_day())
+    sink = ResultsSink(tmp_path, row_group=2, format="npz")
+    t.attach_sink(sink)
+    day = 86_400_000
+    for i in range(10):
+        t.on_market(i * day // 2, 100.0 + i)
+    sink.close(tracker=t)
+    eq = load_results(tmp_path, "equity", columns=["timestamp_ms"])
+    assert eq["timestamp_ms"].tolist() == [day // 2, 3 * day // 2, 5 * day // 2, 7 * day // 2, 9 * day // 2]
+
+
+def test_resume_discards_chunks_written_after_the_checkpoint(tmp_path):
+    bars = generate_bars(SyntheticSpec(bars=3_000))
+    ref = bench._loop(ArrayDataHandler(bars, "SYN0000"))
+    _run(ref)
+
+    loop = bench._loop(ArrayDataHandler(bars, "SYN0000"))
+    loop.portfolio.attach_sink(ResultsSink(tmp_path / "out", row_group=200, format="npz"))
+    cfg = CheckpointConfig(directory=str(tmp_path / "ckpt"), every_bars=1_000, keep=10)
+    _run(loop, checkpoint=cfg)
+    # 第一次运行一直写到结束；从 1000 根的快照续跑，之后的 chunk 要先删掉再重写
+    written = len(list((tmp_path / "out").glob("equity-*.npz")))
+    # 只加载（检查 / warm start）不删任何结果
+    load_checkpoint(list_checkpoints(cfg.directory)[0])
+    assert len(list((tmp_path / "out").glob("equity-*.npz"))) == written
+    resumed = BacktestMode.resume(list_checkpoints(cfg.directory)[0])
+    kept = resumed.loop.portfolio.tracker._sink.chunks["equity"]
+    assert 0 < kept < written and len(list((tmp_path / "out").glob("equity-*.npz"))) == kept
+    with contextlib.redirect_stdout(io.StringIO()):
+        resumed.run()
+    tracker = resumed.loop.portfolio.tracker
+    tracker._sink.close(tracker=tracker)
+
+    got = load_results(tmp_path / "out", "equity")
+    for k, v in ref.portfolio.tracker.equity_arrays().items():
+        assert np.array_equal(got[k], v), k
+
+
+def test_parquet_round_trip(tmp_path):
+    pytest.importorskip("pyarrow")
+    sink = ResultsSink(tmp_path, row_group=4, format="parquet")
+    t = PerformanceTracker(initial_cash=1_000.0)
+    t.attach_sink(sink)
+    for i in range(10):
+        t.on_market(i, 100.0 + i)
+    t.on_fill(10, "X", "BUY", 1, 110.0, 0.5)
+    sink.close(tracker=t)
+    eq = load_results(tmp_path, "equity", columns=["equity"])
+    assert len(eq["equity"]) == 11
+    assert load_results(tmp_path, "trades")["symbol"].tolist() == ["X"]
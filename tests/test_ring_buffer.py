@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from src.core.events import EventType, MarketEvent
+from src.data.csv_handler import CSVHandler
+from src.data.ring_buffer import BarRingBuffer
+
+
+def _bar(i: int) -> MarketEvent:
+    return MarketEvent(
+        type=EventType.MARKET, timestamp_ms=1_700_000_000_000 + i * 60_000, symbol="X",
+        open=100.0 + i, high=101.0 + i, low=99.0 + i, close=100.5 + i, volume=1000.0 + i,
+    )
+
+
+@pytest.mark.parametrize("capacity,slack", [(1, None), (5, None), (5, 1), (8, 3)])
+def test_ring_buffer_keeps_latest_capacity_bars(capacity, slack) -> None:
+    ring = BarRingBuffer(capacity=capacity, slack=slack)
+    bars = [_bar(i) for i in range(37)]
+
+    for k, bar in enumerate(bars, start=1):
+        ring.append(bar)
+        expected = bars[max(0, k - capacity):k]
+        assert len(ring) == len(expected)
+        assert ring.latest_events(capacity + 10) == expected
+        assert ring.last() is bar
+        w = ring.window(3)
+        assert w.close.tolist() == [b.close for b in expected[-3:]]
+        assert w.timestamp_ms.dtype == np.int64
+
+
+def test_window_is_zero_copy_and_read_only() -> None:
+    ring = BarRingBuffer(capacity=4)
+    for i in range(6):
+        ring.append(_bar(i))
+
+    w = ring.window(4)
+    assert np.shares_memory(w.close, ring.window(2).close)
+    assert not w.close.flags.writeable
+    with pytest.raises(ValueError):
+        w.close[0] = 0.0
+    assert ring.window(0).close.size == 0
+    assert ring.latest_events(0) == []
+
+
+def test_csv_handler_lookback_bounds_history(tmp_path) -> None:
+    lines = ["datetime,open,high,low,close,volume"]
+    lines += [f"2025-01-01 09:{i:02d}:00,1,2,0.5,{i},10" for i in range(30)]
+    path = tmp_path / "bars.csv"
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    h = CSVHandler(csv_path=str(path), symbol="X", columnar=True, lookback=5)
+    while h.has_next():
+        h.stream_next()
+
+    assert [b.close for b in h.get_latest_bars("X", 200)] == [25.0, 26.0, 27.0, 28.0, 29.0]
+    assert h.get_latest_window("X", 3).close.tolist() == [27.0, 28.0, 29.0]
+    assert h.get_latest_close("X") == 29.0
+    assert h.get_latest_window("OTHER", 3) is None
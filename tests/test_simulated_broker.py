@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import dataclasses
+
+import numpy as np
+import pytest
+
+from src.core.events import (
+    CancelEvent, EventType, FillEvent, MarketEvent, OrderEvent, OrderStatus, OrderStatusEvent,
+    OrderType, Side, TimeInForce,
+)
+from src.data.array_handler import ArrayDataHandler
+from src.engine.event_loop import EventLoop
+from src.execution.simulated_broker import SimulatedBroker, SimulatedBrokerConfig
+from src.modes.backtest import BacktestMode
+from src.portfolio.performance_portfolio import PerformancePortfolio
+from src.strategy.sma_cross import SMACross
+from tests.helpers import random_bars
+
+DAY = 86_400_000
+
+
+def _bar(ts, o, h, l, c, v=1_000.0, symbol="X"):
+    return MarketEvent(type=EventType.MARKET, timestamp_ms=ts, symbol=symbol,
+                       open=o, high=h, low=l, close=c, volume=v)
+
+
+def _order(cid, side, order_type, qty, *, limit=0.0, stop=0.0, tif=TimeInForce.GTC, ts=0):
+    return OrderEvent(type=EventType.ORDER, timestamp_ms=ts, symbol="X", client_order_id=cid, side=side,
+                      order_type=order_type, qty=qty, limit_price=limit, stop_price=stop, tif=tif)
+
+
+def test_limit_orders_rest_and_match_by_price_then_time():
+    broker = SimulatedBroker()
+    broker.on_bar(_bar(0, 100, 101, 99, 100))
+    for cid, px in (("b1", 97.0), ("b2", 98.0), ("b3", 98.0), ("b4", 90.0)):
+        status = broker.on_order(_order(cid, Side.BUY, OrderType.LMT, 10, limit=px))
+        assert isinstance(status, OrderStatusEvent) and status.status == OrderStatus.NEW
+
+    fills = broker.on_bar(_bar(1, 99, 99.5, 97.5, 98))
+    assert [(f.client_order_id, f.fill_price) for f in fills] == [("b2", 98.0), ("b3", 98.0)]
+
+    # 跳空低开：按开盘价成交（价格改善）
+    fills = broker.on_bar(_bar(2, 95, 96, 94, 95))
+    assert [(f.client_order_id, f.fill_price) for f in fills] == [("b1", 95.0)]
+    assert broker.open_orders() == {"b4": 10}
+
+    # marketable on arrival: fills at the last price
+    fill = broker.on_order(_order("s1", Side.SELL, OrderType.LMT, 5, limit=94.0))
+    assert isinstance(fill, FillEvent) and fill.fill_price == 95.0
+
+
+def test_partial_fills_stops_cancel_and_day_expiry():
+    broker = SimulatedBroker(SimulatedBrokerConfig(max_participation=0.1))
+    broker.on_bar(_bar(0, 100, 101, 99, 100, v=1_000))
+    broker.on_order(_order("big", Side.SELL, OrderType.LMT, 250, limit=102.0))
+    broker.on_order(_order("stop", Side.SELL, OrderType.STP, 10, stop=95.0))
+    broker.on_order(_order("day", Side.BUY, OrderType.LMT, 10, limit=50.0, tif=TimeInForce.DAY))
+
+    fills = broker.on_bar(_bar(1, 101, 103, 100, 102, v=1_000))
+    assert [(f.fill_qty, f.status) for f in fills] == [(100, OrderStatus.PARTIALLY_FILLED)]
+    fills = broker.on_bar(_bar(2, 102, 104, 101, 103, v=2_000))
+    assert [(f.fill_qty, f.status) for f in fills] == [(150, OrderStatus.FILLED)]
+
+    # 第二天：DAY 单过期，止损单被跌穿触发
+    out = broker.on_bar(_bar(DAY, 96, 97, 94, 95, v=1_000))
+    assert [(type(e).__name__, e.client_order_id) for e in out] == [
+        ("OrderStatusEvent", "day"), ("FillEvent", "stop"),
+    ]
+    assert out[0].status == OrderStatus.EXPIRED and out[1].fill_price == 95.0
+
+    broker.on_order(_order("c", Side.BUY, OrderType.LMT, 10, limit=80.0))
+    assert broker.cancel("c").status == OrderStatus.CANCELED
+    assert broker.cancel("c").status == OrderStatus.REJECTED
+    assert broker.on_bar(_bar(DAY + 1, 80, 81, 79, 80)) == []
+    assert not broker.has_resting("X")
+
+
+def test_ioc_and_fok():
+    broker = SimulatedBroker(SimulatedBrokerConfig(max_participation=0.01))
+    broker.on_bar(_bar(0, 100, 101, 99, 100, v=1_000))  # 10 shares of liquidity left this bar
+
+    out = broker.on_order(_order("ioc", Side.BUY, OrderType.LMT, 25, limit=101.0, tif=TimeInForce.IOC))
+    assert [(type(e).__name__, getattr(e, "fill_qty", None)) for e in out] == [
+        ("FillEvent", 10), ("OrderStatusEvent", None),
+    ]
+    fok = broker.on_order(_order("fok", Side.BUY, OrderType.LMT, 5, limit=101.0, tif=TimeInForce.FOK))
+    assert fok.status == OrderStatus.REJECTED
+    ioc = broker.on_order(_order("ioc2", Side.BUY, OrderType.LMT, 5, limit=90.0, tif=TimeInForce.IOC))
+    assert ioc.status == OrderStatus.CANCELED
+    assert broker.open_orders() == {}
+
+
+@dataclasses.dataclass
+class _LimitPortfolio(PerformancePortfolio):
+    """Turns the market orders into limits `away` from the last mark (< 0: marketable on arrival)."""
+    away: float = 0.005
+
+    def on_signal(self, event):
+        order = super().on_signal(event)
+        if order is None:
+            return None
+        away = 1.0 - self.away if order.side == Side.BUY else 1.0 + self.away
+        return dataclasses.replace(order, order_type=OrderType.LMT,
+                                   limit_price=round(self.tracker.last_price * away, 4))
+
+
+def _varying_volume(bars):
+    rng = np.random.default_rng(7)
+    return dataclasses.replace(bars, volume=rng.uniform(200.0, 5_000.0, len(bars)).round())
+
+
+@pytest.mark.parametrize("batch_size", [0, 64])
+@pytest.mark.parametrize("away", [0.005, -0.005])
+@pytest.mark.parametrize("max_participation", [0.0, 0.004])
+def test_event_loop_routes_resting_fills(batch_size, away, max_participation):
+    bars = _varying_volume(random_bars())
+
+    def run(batch):
+        loop = EventLoop(
+            data=ArrayDataHandler(bars=bars, symbol="X"),
+            strategy=SMACross(fast=5, slow=20),
+            portfolio=_LimitPortfolio(initial_cash=100_000.0, away=away),
+            execution=SimulatedBroker(SimulatedBrokerConfig(max_participation=max_participation)),
+            batch_size=batch,
+        )
+        BacktestMode(loop=loop).run()
+        return loop.portfolio.tracker
+
+    ref, got = run(0), run(batch_size)
+    assert ref.trade_count > 4
+    if max_participation:
+        assert any(t.qty < 10 for t in ref.trades)  # 有部分成交
+    assert got.trades == ref.trades
+    assert got.equity_curve == ref.equity_curve
+    assert got.position == 0
+
+    cancel = CancelEvent(type=EventType.CANCEL, timestamp_ms=0, symbol="X", client_order_id="none")
+    assert SimulatedBroker().on_cancel(cancel).status == OrderStatus.REJECTED
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import bz2
+import gzip
+import lzma
+
+import pytest
+
+from src.data.csv_handler import CSVHandler
+from src.data.streaming_csv import StreamingCSVHandler
+
+
+def _csv_text(n: int) -> str:
+    lines = ["datetime,open,high,low,close,volume"]
+    for i in range(n):
+        lines.append(f"2025-01-01 {9 + i // 60:02d}:{i % 60:02d}:00,{100 + i},{101 + i},{99 + i},{100.5 + i},{1000 + i}")
+        if i == 10:
+            lines.append("")  # blank lines are skipped like DictReader does
+    return "\n".join(lines) + "\n"
+
+
+def _drain(handler):
+    out = []
+    while handler.has_next():
+        out.append(handler.stream_next())
+    return out
+
+
+@pytest.mark.parametrize("suffix,opener", [("", open), (".gz", gzip.open), (".bz2", bz2.open), (".xz", lzma.open)])
+def test_streaming_matches_in_memory_handler(tmp_path, suffix, opener) -> None:
+    text = _csv_text(100)
+    plain = tmp_path / "bars.csv"
+    plain.write_text(text, encoding="utf-8")
+    path = tmp_path / f"bars.csv{suffix}"
+    if suffix:
+        with opener(path, "wt", encoding="utf-8") as f:
+            f.write(text)
+
+    expected = _drain(CSVHandler(csv_path=str(plain), symbol="X"))
+    handler = StreamingCSVHandler(csv_path=str(path), symbol="X", chunk_rows=7, history=5)
+    got = _drain(handler)
+
+    assert got == expected
+    assert handler.rows_read == 100
+    assert not handler.has_next()
+
+
+def test_streaming_memory_is_bounded_by_chunk_and_history(tmp_path) -> None:
+    path = tmp_path / "bars.csv"
+    path.write_text(_csv_text(50), encoding="utf-8")
+    h = StreamingCSVHandler(csv_path=str(path), symbol="X", chunk_rows=8, history=3)
+
+    seen = []
+    while h.has_next():
+        seen.append(h.stream_next())
+        assert len(h._chunk) <= 8
+        assert len(h._latest_bars) <= 3
+
+    assert h.get_latest_bars("X", 10) == seen[-3:]
+    assert h.get_latest_bars("X", 2) == seen[-2:]
+    assert h.get_latest_close("X") == seen[-1].close
+    assert h.get_latest_bars("OTHER", 2) == []
+
+
+def test_streaming_empty_csv_raises(tmp_path) -> None:
+    path = tmp_path / "empty.csv.gz"
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        f.write("datetime,open,high,low,close,volume\n\n")
+    with pytest.raises(ValueError, match="CSV is empty"):
+        StreamingCSVHandler(csv_path=str(path), symbol="X")
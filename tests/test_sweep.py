@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import contextlib
+import csv
+import io
+
+import numpy as np
+
+from src.core.costs import CostModel, FixedBpsSlippage, TieredFee
+from src.data.array_handler import ArrayDataHandler
+from src.data.bars import load_bar_arrays
+from src.data.shared_bars import SharedBars
+from src.engine.event_loop import EventLoop
+from src.engine.sweep import expand_grid, run_single, run_sweep
+from src.execution.simulated_broker import SimulatedBroker, SimulatedBrokerConfig
+from src.modes.backtest import BacktestConfig, BacktestMode
+from src.portfolio.performance_portfolio import PerformancePortfolio
+from src.strategy.sma_cross import SMACross
+from tests.helpers import random_bars, random_walk_csv, sweep_config
+
+
+def test_expand_grid_order_and_scalars():
+    combos = expand_grid({"fast": [1, 2], "slow": [10, 20], "qty": 5})
+    assert combos == [
+        {"fast": 1, "slow": 10, "qty": 5},
+        {"fast": 1, "slow": 20, "qty": 5},
+        {"fast": 2, "slow": 10, "qty": 5},
+        {"fast": 2, "slow": 20, "qty": 5},
+    ]
+
+
+def test_sweep_matches_sequential_runs(tmp_path):
+    config = sweep_config(random_walk_csv(tmp_path / "bars.csv"))
+    result = run_sweep(config, workers=2)
+
+    assert [r["run_id"] for r in result.rows] == [0, 1, 2, 3]
+    bars = load_bar_arrays(config["data"]["csv_path"])
+    for row in result.rows:
+        params = {"fast": row["fast"], "slow": row["slow"]}
+        if row["error"]:
+            continue
+        expected = run_single(bars, config, params)
+        assert {k: row[k] for k in expected} == expected
+
+    # (5, 5) is rejected by SMACross and recorded instead of failing the sweep
+    bad = [r for r in result.rows if r["fast"] == 5 and r["slow"] == 5]
+    assert len(bad) == 1 and "fast < slow" in bad[0]["error"]
+
+    assert sum(s["runs"] for s in result.workers) == 4
+    assert all(s["bars"] == s["runs"] * 400 for s in result.workers)
+
+    out = tmp_path / "results.csv"
+    result.write_csv(str(out))
+    with open(out, newline="", encoding="utf-8") as f:
+        assert len(list(csv.DictReader(f))) == 4
+
+
+def test_run_single_builds_named_components():
+    bars = random_bars(600, seed=4)
+    params = {"fast": 5, "slow": 20}
+    config = {
+        "data": {"symbol": "TEST"},
+        "strategy": {"name": "SMACross"},
+        "portfolio": {"initial_cash": 100_000.0, "order_qty": 7,
+                      "commission": {"name": "tiered", "tiers": [[0, 0.001], [500, 0.0005]], "min_fee": 0.5}},
+        "execution": {"name": "simulated", "max_participation": 0.0,
+                      "commission_model": {"name": "cost_model", "slippage": [{"name": "fixed_bps_slippage", "bps": 5.0}]}},
+    }
+    got = run_single(bars, config, params)
+
+    loop = EventLoop(
+        data=ArrayDataHandler(bars=bars, symbol="TEST", lookback=1),
+        strategy=SMACross(**params),
+        portfolio=PerformancePortfolio(initial_cash=100_000.0, order_qty=7,
+                                       commission_model=TieredFee(tiers=((0, 0.001), (500, 0.0005)), min_fee=0.5)),
+        execution=SimulatedBroker(SimulatedBrokerConfig(commission_model=CostModel(slippage=(FixedBpsSlippage(bps=5.0),)))),
+    )
+    with contextlib.redirect_stdout(io.StringIO()):
+        BacktestMode(loop=loop, config=BacktestConfig(flatten_on_end=True)).run()
+    assert got == {**loop.portfolio.report(), **loop.portfolio.metrics()}
+    # 不写 name 时仍是纸面成交 + 零佣金
+    paper = run_single(bars, {"data": {"symbol": "TEST"}, "strategy": {"name": "SMACross"}}, params)
+    assert paper["total_commission"] == 0.0 and paper != got
+
+
+def test_shared_bars_attach_is_zero_copy_readonly(tmp_path):
+    bars = load_bar_arrays(random_walk_csv(tmp_path / "bars.csv", n=50))
+    with SharedBars.create(bars) as owner:
+        view = SharedBars.attach(owner.spec)
+        try:
+            np.testing.assert_array_equal(view.bars.close, bars.close)
+            np.testing.assert_array_equal(view.bars.timestamp_ms, bars.timestamp_ms)
+            assert not view.bars.close.flags.writeable
+            owner.bars.close[0] = -1.0
+            assert view.bars.close[0] == -1.0
+        finally:
+            view.close()
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from src.backtest.performance import CurveSampling, EquityPoint, PerformanceTracker
+
+DAY = 86_400_000
+HOUR = 3_600_000
+
+
+def _feed(tracker: PerformanceTracker, n: int = 240) -> PerformanceTracker:
+    """10 days of hourly bars, a round trip every 30 bars."""
+    for i in range(n):
+        ts = i * HOUR
+        price = 100.0 + 5.0 * np.sin(i / 7.0)
+        tracker.on_market(ts, price)
+        if i % 30 == 5:
+            tracker.on_fill(ts, "AAA", "BUY", 10, price, 1.25)
+        elif i % 30 == 20:
+            tracker.on_fill(ts, "AAA", "SELL", 10, price, 0.75)
+    return tracker
+
+
+@pytest.mark.parametrize("sampling", [
+    CurveSampling.every(7), CurveSampling.on_change(), CurveSampling.end_of_day(), CurveSampling.end_of_day(8),
+])
+def test_summary_is_independent_of_sampling(sampling):
+    full = _feed(PerformanceTracker())
+    sampled = _feed(PerformanceTracker(sampling=sampling))
+    assert sampled.summary() == full.summary()
+    assert len(sampled.equity_curve) < len(full.equity_curve)
+
+
+def test_sampling_policies():
+    full = _feed(PerformanceTracker()).equity_arrays()
+    assert len(full["timestamp_ms"]) == 240 + 16
+
+    every = _feed(PerformanceTracker(sampling=CurveSampling.every(10))).equity_arrays()
+    assert len(every["timestamp_ms"]) == 24 + 16  # 每 10 根一个点 + 每笔成交
+
+    eod = _feed(PerformanceTracker(sampling=CurveSampling.end_of_day())).equity_arrays()
+    assert eod["timestamp_ms"].tolist() == [d * DAY + 23 * HOUR for d in range(10)]
+
+    flat = PerformanceTracker(sampling=CurveSampling.on_change())
+    for i in range(50):
+        flat.on_market(i, 100.0)  # 空仓：equity 不变
+    assert len(flat.equity_curve) == 1
+
+
+def test_columns_match_row_views():
+    t = _feed(PerformanceTracker())
+    eq = t.equity_arrays()
+    rows = t.equity_curve
+    assert isinstance(rows[0], EquityPoint)
+    np.testing.assert_array_equal(eq["equity"], [p.equity for p in rows])
+    np.testing.assert_array_equal(eq["position"], [p.position for p in rows])
+
+    tr = t.trade_arrays()
+    trades = t.trades
+    assert len(trades) == 16 and trades[0].side == "BUY" and trades[1].side == "SELL"
+    assert tr["symbol"].tolist() == ["AAA"] * 16
+    assert tr["side"].tolist()[:2] == [1, -1]
+    assert t.summary()["total_commission"] == sum(x.commission for x in trades)
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from src.backtest.parity import check_parity
+from src.data.bars import load_bar_arrays
+from src.modes.vectorized import VectorizedBacktestMode, VectorizedConfig
+from src.portfolio.commission import PercentNotionalCommission
+from src.strategy.sma_cross import SMACross
+
+
+def _random_walk_csv(path, n=600, seed=7):
+    rng = np.random.default_rng(seed)
+    close = 100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.01, n)))
+    lines = ["datetime,open,high,low,close,volume"]
+    for i, c in enumerate(close):
+        lines.append(f"{1_700_000_000 + i * 60},{c:.4f},{c * 1.01:.4f},{c * 0.99:.4f},{c:.4f},{1000 + i}")
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return str(path)
+
+
+@pytest.mark.parametrize(
+    "fast,slow,config",
+    [
+        (5, 20, VectorizedConfig(commission_per_trade=1.0)),
+        (3, 7, VectorizedConfig(order_qty=25)),
+        (10, 50, VectorizedConfig(commission_model=PercentNotionalCommission(rate=0.0003, min_fee=1.0))),
+        (8, 30, VectorizedConfig(flatten_on_end=False, commission_per_trade=2.0)),
+    ],
+)
+def test_event_and_vectorized_engines_agree(tmp_path, fast, slow, config) -> None:
+    csv_path = _random_walk_csv(tmp_path / "rw.csv")
+    report = check_parity(csv_path, "RW", lambda: SMACross(fast=fast, slow=slow), config)
+
+    assert report.ok, report.mismatches
+    assert report.event["trades"] > 2
+
+
+def test_parity_on_sample_data() -> None:
+    report = check_parity("data/sample_AAPL.csv", "AAPL", lambda: SMACross(fast=2, slow=3))
+    assert report.ok, report.mismatches
+
+
+def test_vectorized_equity_curve_has_one_mark_per_bar_and_fill(tmp_path) -> None:
+    bars = load_bar_arrays(_random_walk_csv(tmp_path / "rw.csv", n=200))
+    res = VectorizedBacktestMode(bars=bars, strategy=SMACross(fast=5, slow=20), symbol="RW").compute()
+
+    assert res.equity.shape[0] == len(bars) + res.fill_index.shape[0]
+    assert res.summary["final_position"] == 0
+    assert res.fill_side.tolist()[:2] == [1, -1]
+    assert np.all(np.diff(res.equity_timestamp_ms) >= 0)
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from src.data.synthetic import SyntheticSpec, generate_bars, write_csv
+from src.engine.sweep import expand_grid
+from src.engine.walk_forward import (
+    Fold, _Signals, make_folds, run_walk_forward, score, vectorized_config,
+)
+from src.modes.vectorized import VectorizedBacktestMode
+from src.strategy.sma_cross import SMACross
+
+GRID = {"fast": [5, 10, 40], "slow": [20, 60]}  # (40, 20) 非法，应被跳过
+
+
+def _config(path, **wf):
+    return {
+        "data": {"csv_path": path, "symbol": "SYN0000"},
+        "strategy": {"name": "SMACross", "params": {}},
+        "grid": GRID,
+        "portfolio": {"initial_cash": 50_000, "order_qty": 5, "commission": {"rate": 0.0002, "min_fee": 1.0}},
+        "walk_forward": {"train_bars": 600, "test_bars": 200, "objective": "sharpe", **wf},
+    }
+
+
+def test_make_folds_rolling_and_anchored():
+    assert make_folds(1_000, 500, 200) == [
+        Fold(0, 0, 500, 500, 700),
+        Fold(1, 200, 700, 700, 900),
+        Fold(2, 400, 900, 900, 1_000),  # 最后一个测试窗口截断
+    ]
+    anchored = make_folds(1_000, 500, 200, step_bars=250, anchored=True)
+    assert [(f.train_start, f.train_stop, f.test_stop) for f in anchored] == [(0, 500, 700), (0, 750, 950)]
+    assert make_folds(500, 500, 100) == []
+    with pytest.raises(ValueError):
+        make_folds(100, 0, 10)
+
+
+def test_each_fold_picks_the_best_train_params_and_stitches_out_of_sample(tmp_path):
+    bars = generate_bars(SyntheticSpec(bars=2_000))
+    cfg = _config(write_csv(bars, tmp_path / "syn.csv"))
+    result = run_walk_forward(cfg)
+    assert len(result.folds) == 7 and result.summary["oos_bars"] == 1_400
+
+    def run(params, start, stop):
+        signals = SMACross(**params).generate_signals(bars)[start:stop]  # 全序列预热后的信号
+        return VectorizedBacktestMode(bars.slice(start, stop), _Signals(signals), "SYN0000",
+                                      vectorized_config(cfg)).compute()
+
+    valid = [p for p in expand_grid(GRID) if p["fast"] < p["slow"]]
+    equity = 50_000.0
+    for row, fold in zip(result.folds, make_folds(2_000, 600, 200)):
+        scores = [score(run(p, fold.train_start, fold.train_stop), "sharpe") for p in valid]
+        assert {"fast": row["fast"], "slow": row["slow"]} == valid[int(np.argmax(scores))]
+        assert row["train_sharpe"] == max(scores) and row["skipped_params"] == 1
+        assert row["skip_errors"].startswith("{'fast': 40, 'slow': 20}: require 0 < fast < slow")
+        test = run({"fast": row["fast"], "slow": row["slow"]}, fold.test_start, fold.test_stop)
+        assert row["start_equity"] == equity and row["test_pnl"] == test.summary["total_pnl"]
+        equity += test.summary["total_pnl"]
+
+    assert result.summary["final_equity"] == pytest.approx(equity)
+    assert result.equity[-1] == pytest.approx(equity)
+    assert np.all(np.diff(result.timestamp_ms) >= 0)
+    assert result.timestamp_ms[0] == bars.timestamp_ms[600] and result.timestamp_ms[-1] == bars.timestamp_ms[-1]
+
+
+def test_process_pool_matches_inline_run(tmp_path):
+    path = write_csv(generate_bars(SyntheticSpec(bars=1_500)), tmp_path / "syn.csv")
+    cfg = _config(path, anchored=True, objective="total_return")
+    inline = run_walk_forward(cfg, workers=1)
+    pooled = run_walk_forward(cfg, workers=2)
+    strip = lambda rows: [{k: v for k, v in r.items() if k not in ("elapsed_s", "worker_pid")} for r in rows]
+    assert strip(pooled.folds) == strip(inline.folds)
+    assert np.array_equal(pooled.equity, inline.equity) and pooled.summary == inline.summary
+
+    out = tmp_path / "wf.csv"
+    inline.write_csv(str(out))
+    assert len(out.read_text().splitlines()) == len(inline.folds) + 1
+
+
+def test_calmar_without_drawdown_and_strategy_errors(tmp_path):
+    ts = np.arange(5, dtype=np.int64) * 86_400_000
+    rising = SimpleNamespace(summary={"max_drawdown": 0.0}, equity_timestamp_ms=ts,
+                             equity=np.linspace(100.0, 110.0, 5))
+    assert score(rising, "calmar") == float("inf")
+    flat = SimpleNamespace(summary={"max_drawdown": 0.0}, equity_timestamp_ms=ts, equity=np.full(5, 100.0))
+    assert score(flat, "calmar") == 0.0
+
+    cfg = _config("unused.csv")
+    cfg["strategy"]["name"] = "SMACros"
+    with pytest.raises(ValueError, match="unknown strategy: 'SMACros'"):
+        run_walk_forward(cfg)
+    # 组件名走 registry：成本模型照用，向量化跑不了的 execution 直接报错
+    tiered = {**_config("unused.csv")["portfolio"], "commission": {"name": "tiered", "tiers": [[0, 0.001]]}}
+    assert type(vectorized_config({"portfolio": tiered}).commission_model).__name__ == "TieredFee"
+    with pytest.raises(ValueError, match="execution='simulated'"):
+        vectorized_config({"execution": {"name": "simulated"}})
+    # 合成行情不需要 CSV
+    cfg = _config(None)
+    cfg["data"] = {"synthetic": {"bars": 1_000}, "symbol": "SYN0000"}
+    assert len(run_walk_forward(cfg).folds) == 2